@@ -10,5 +10,19 @@ else
   echo "ℹ️ Skipping test data loading"
 fi
 
-echo "🚀 Starting server..."
-python manage.py runserver 0.0.0.0:8000
+# SERVER=runserver (development, default), uvicorn or gunicorn (ASGI, with WEB_CONCURRENCY worker processes)
+case "${SERVER:-runserver}" in
+  uvicorn)
+    echo "🚀 Starting uvicorn (${WEB_CONCURRENCY:-1} workers)..."
+    exec uvicorn github_monitor.asgi:application --host 0.0.0.0 --port 8000 --workers "${WEB_CONCURRENCY:-1}"
+    ;;
+  gunicorn)
+    echo "🚀 Starting gunicorn with uvicorn workers (${WEB_CONCURRENCY:-2} workers)..."
+    exec gunicorn github_monitor.asgi:application --worker-class uvicorn_worker.UvicornWorker \
+      --bind 0.0.0.0:8000 --workers "${WEB_CONCURRENCY:-2}"
+    ;;
+  *)
+    echo "🚀 Starting server..."
+    exec python manage.py runserver 0.0.0.0:8000
+    ;;
+esac
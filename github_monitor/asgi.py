@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'github_monitor.settings')
 
 application = get_asgi_application()
+
+# Like runserver, serve the admin's and API docs' static files when debugging
+if settings.DEBUG:
+    application = ASGIStaticFilesHandler(application)
@@ -54,6 +54,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'monitor.middleware.QueryProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'github_monitor.urls'
@@ -79,6 +80,10 @@ WSGI_APPLICATION = 'github_monitor.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# Max number of active repositories (0: no limit). Enforced by a database trigger that reads it
+# from the connection's monitor.max_active_repositories setting.
+MAX_ACTIVE_REPOSITORIES = int(os.getenv("MAX_ACTIVE_REPOSITORIES", 5))
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -87,10 +92,46 @@ DATABASES = {
         "PASSWORD": os.getenv("DB_PASSWORD", "github"),
         "HOST": os.getenv("DB_HOST", "localhost"),
         "PORT": os.getenv("DB_PORT", "5432"),
+        "OPTIONS": {
+            "options": f"-c monitor.max_active_repositories={MAX_ACTIVE_REPOSITORIES}",
+        },
+        # Persistent connections: kept for up to DB_CONN_MAX_AGE seconds (0: one per request)
+        # and checked before being reused
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": True,
+    }
+}
+# Threads (and so at most as many database connections) per server process that run the
+# database work of the async stats views
+ASYNC_DB_THREADS = int(os.getenv("ASYNC_DB_THREADS", 8))
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Local memory by default; point CACHE_BACKEND/CACHE_LOCATION at a shared backend (e.g.
+# django.core.cache.backends.redis.RedisCache) so ingest in another process invalidates stats.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", "github-monitor"),
     }
 }
+STATS_CACHE_ALIAS = "default"
+STATS_CACHE_TIMEOUT = int(os.getenv("STATS_CACHE_TIMEOUT", 300))
+
 # GitHub API Token
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+# GitHub API base URL (override to point at a local stub server)
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+# HTTP client: request timeout (seconds), connection pool size and retry/backoff on 5xx
+GITHUB_HTTP_TIMEOUT = float(os.getenv("GITHUB_HTTP_TIMEOUT", 10))
+GITHUB_HTTP_POOL_SIZE = int(os.getenv("GITHUB_HTTP_POOL_SIZE", 10))
+GITHUB_HTTP_RETRIES = int(os.getenv("GITHUB_HTTP_RETRIES", 3))
+GITHUB_HTTP_BACKOFF = float(os.getenv("GITHUB_HTTP_BACKOFF", 0.5))
+# Rate-limit scheduler: calls kept in reserve, quota below which requests are spread until the reset,
+# and the longest wait (seconds) for a reset or Retry-After before a request fails instead
+GITHUB_RATE_LIMIT_RESERVE = int(os.getenv("GITHUB_RATE_LIMIT_RESERVE", 0))
+GITHUB_RATE_LIMIT_BURST = int(os.getenv("GITHUB_RATE_LIMIT_BURST", 100))
+GITHUB_RATE_LIMIT_MAX_WAIT = float(os.getenv("GITHUB_RATE_LIMIT_MAX_WAIT", 60))
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -156,3 +197,22 @@ DEFAULT_EVENT_FETCH_LIMIT = 500
 EVENT_FETCH_LIMIT = int(os.getenv("EVENT_FETCH_LIMIT", DEFAULT_EVENT_FETCH_LIMIT))
 DEFAULT_EVENT_DAYS_LIMIT = 7
 EVENT_DAYS_LIMIT = int(os.getenv("EVENT_FETCH_LIMIT", DEFAULT_EVENT_DAYS_LIMIT))
+# Events older than this are pruned (optionally rolled up per day); keep >= EVENT_DAYS_LIMIT
+EVENT_RETENTION_DAYS = max(int(os.getenv("EVENT_RETENTION_DAYS", 30)), EVENT_DAYS_LIMIT)
+# Optional range partitioning of Event on created_at: "day", "week" or empty (plain table)
+EVENT_PARTITION_INTERVAL = os.getenv("EVENT_PARTITION_INTERVAL", "")
+EVENT_PARTITIONS_AHEAD = int(os.getenv("EVENT_PARTITIONS_AHEAD", 7))
+# Answer stats for the default window from the EventAggregate table maintained at ingest time
+STATS_FROM_AGGREGATES = os.getenv("STATS_FROM_AGGREGATES", "True") == "True"
+# Per-request query profiling (logged to "monitor.profiling"; Server-Timing header with DEBUG)
+QUERY_PROFILING = os.getenv("QUERY_PROFILING", "False") == "True"
+QUERY_PROFILING_SLOWEST = int(os.getenv("QUERY_PROFILING_SLOWEST", 3))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "monitor.profiling": {"handlers": ["console"], "level": os.getenv("QUERY_PROFILING_LOG_LEVEL", "INFO")},
+    },
+}
@@ -18,10 +18,14 @@ from django.contrib import admin
 from django.urls import path, include
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 
+from monitor.views import HealthView, MetricsView
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('monitor.urls')),
+    path('metrics', MetricsView.as_view(), name='metrics'),
+    path('health', HealthView.as_view(), name='health'),
 
     # Schema & Docs
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
@@ -1,6 +1,23 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.db import IntegrityError, transaction
 
-from .models import Repository, Event, EventType
+from .models import Repository, RepositoryPollState, Event, EventType
+from .services.github.api import GitHubAPIClient
+from .services.github.cache import StatsCache
+
+
+class RepositoryPollStateInline(admin.StackedInline):
+    """
+    Read-only view of the GitHub polling state (ETag, poll interval, 304/200 counters).
+    """
+    model = RepositoryPollState
+    can_delete = False
+    readonly_fields = (
+        "etag", "last_event_id", "poll_interval", "last_polled_at", "not_modified_count", "modified_count"
+    )
+
+    def has_add_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(Repository)
@@ -10,31 +27,69 @@ class RepositoryAdmin(admin.ModelAdmin):
     Automatically fetches gh_repo_id from GitHub API if not provided.
     """
 
-    list_display = ("name", "gh_repo_id", "active")
+    list_display = ("name", "gh_repo_id", "active", "not_modified_polls", "modified_polls")
     list_filter = ("active",)
     search_fields = ("name", "gh_repo_id")
     ordering = ("name",)
     readonly_fields = ("gh_repo_id", "slug")
+    list_select_related = ("poll_state",)
+    inlines = (RepositoryPollStateInline,)
+    actions = ("activate_repositories", "deactivate_repositories")
+
+    @admin.display(description="304 polls")
+    def not_modified_polls(self, obj):
+        poll_state = getattr(obj, "poll_state", None)
+        return poll_state.not_modified_count if poll_state else 0
+
+    @admin.display(description="200 polls")
+    def modified_polls(self, obj):
+        poll_state = getattr(obj, "poll_state", None)
+        return poll_state.modified_count if poll_state else 0
+
+    @admin.action(description="Activate selected repositories")
+    def activate_repositories(self, request, queryset):
+        """
+        Activates the selection in one UPDATE; the database rejects it as a whole if it would exceed
+        MAX_ACTIVE_REPOSITORIES.
+        """
+        try:
+            with transaction.atomic():
+                updated = queryset.filter(active=False).update(active=True)
+        except IntegrityError as exc:
+            self.message_user(request, str(exc).splitlines()[0], messages.ERROR)
+            return
+
+        StatsCache.bump()
+        self.message_user(request, f"{updated} repositories activated.", messages.SUCCESS)
+
+    @admin.action(description="Deactivate selected repositories")
+    def deactivate_repositories(self, request, queryset):
+        updated = queryset.filter(active=True).update(active=False)
+        StatsCache.bump()
+        self.message_user(request, f"{updated} repositories deactivated.", messages.SUCCESS)
 
     def save_model(self, request, obj, form, change):
         """
         Autofill gh_repo_id using GitHub API based on 'name' if not set manually.
         """
         if not obj.gh_repo_id:
-            import requests
-            headers = {"Accept": "application/vnd.github+json"}
-            from django.conf import settings
-            token = getattr(settings, 'GITHUB_TOKEN', None)
-            if token:
-                headers["Authorization"] = f"Bearer {token}"
-
-            resp = requests.get(f"https://api.github.com/repos/{obj.name}", headers=headers)
+            resp = GitHubAPIClient.shared().fetch_repo(obj.name)
             if resp.status_code == 200:
                 obj.gh_repo_id = resp.json().get("id")
             else:
                 raise Exception(f"Cannot fetch GitHub repo ID for {obj.name}")
 
         super().save_model(request, obj, form, change)
+        StatsCache.bump()  # the set of active repositories may have changed
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        StatsCache.bump()
+
+    def delete_queryset(self, request, queryset):
+        """The "Delete selected repositories" action."""
+        super().delete_queryset(request, queryset)
+        StatsCache.bump()
 
 
 @admin.register(EventType)
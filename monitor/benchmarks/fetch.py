@@ -0,0 +1,86 @@
+"""Sequential vs threaded vs async fetch_github_events against a local GitHub stub with injected latency."""
+import io
+import time
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test.utils import override_settings
+
+from monitor.benchmarks.github_stub import AsyncGitHubStubServer, GitHubStubServer
+from monitor.benchmarks.stats import lift_active_cap
+from monitor.models import Repository, RepositoryPollState, EventType, Event
+
+STUBS = {"threaded": GitHubStubServer, "aiohttp": AsyncGitHubStubServer}
+
+
+def add_arguments(parser):
+    parser.add_argument("--repos", type=int, default=5, help="Number of repositories to fetch")
+    parser.add_argument("--pages", type=int, default=3, help="Pages (of 100 events) served per repository")
+    parser.add_argument("--latency", type=float, default=100, help="Stub latency per request, in ms")
+    parser.add_argument("--concurrency", type=int, default=5,
+                        help="Parallel repositories (threaded) or requests in flight (async)")
+    parser.add_argument("--stub", choices=sorted(STUBS), default="aiohttp", help="Stub server implementation")
+
+
+def run(repos=5, pages=3, latency=100, concurrency=5, stub="aiohttp"):
+    """
+    Runs fetch_github_events sequentially, with --concurrency worker threads and with --async
+    against the stub; every mode starts from an empty database and must store the same events.
+
+    Worker threads use their own DB connections, so the seeded repositories are committed and
+    removed afterwards; previously active repositories are deactivated for the duration of the run.
+
+    Returns:
+        dict: Wall time, request count and saved events for both modes.
+    """
+    report = {}
+    previously_active = list(Repository.objects.filter(active=True).values_list("pk", flat=True))
+    existing_types = set(EventType.objects.values_list("pk", flat=True))
+
+    try:
+        Repository.objects.filter(pk__in=previously_active).update(active=False)
+        with transaction.atomic():
+            lift_active_cap()
+            bench_repos = [
+                Repository.objects.create(name=f"benchmark/fetch-{i}", gh_repo_id=-(i + 1), active=True)
+                for i in range(repos)
+            ]
+
+        with STUBS[stub](latency=latency / 1000, events_per_repo=pages * 100) as server:
+            with override_settings(GITHUB_API_URL=server.url):
+                stored = {}
+
+                for mode, workers, use_async in (
+                    ("sequential", 1, False), ("concurrent", concurrency, False), ("async", concurrency, True),
+                ):
+                    Event.objects.filter(repo__in=bench_repos).delete()
+                    RepositoryPollState.objects.filter(repo__in=bench_repos).delete()
+                    requests_before = server.requests
+
+                    started = time.perf_counter()
+                    call_command(
+                        "fetch_github_events", concurrency=workers, use_async=use_async, stdout=io.StringIO()
+                    )
+                    elapsed = time.perf_counter() - started
+
+                    stored[mode] = set(
+                        Event.objects.filter(repo__in=bench_repos)
+                        .values_list("repo_id", "gh_event_id", "event_type__event_type", "created_at")
+                    )
+                    report[mode] = {
+                        "concurrency": workers,
+                        "seconds": round(elapsed, 3),
+                        "requests": server.requests - requests_before,
+                        "events_saved": len(stored[mode]),
+                    }
+
+        for mode in ("concurrent", "async"):
+            report[f"{mode}_speedup"] = round(report["sequential"]["seconds"] / report[mode]["seconds"], 2)
+        report["results_match"] = stored["sequential"] == stored["concurrent"] == stored["async"]
+    finally:
+        Event.objects.filter(repo__name__startswith="benchmark/fetch-").delete()
+        Repository.objects.filter(name__startswith="benchmark/fetch-").delete()
+        EventType.objects.exclude(pk__in=existing_types).filter(event__isnull=True).delete()
+        Repository.objects.filter(pk__in=previously_active).update(active=True)
+
+    return report
@@ -0,0 +1,295 @@
+import asyncio
+import hashlib
+import json
+import re
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from aiohttp import web
+from django.utils.timezone import now
+
+
+class GitHubStubServer:
+    """
+    Minimal local stand-in for the GitHub REST API, served from a background thread.
+
+    Serves `/repos/<owner>/<name>`, `/repos/<owner>/<name>/events` and GraphQL `repository` lookups
+    (POST `/graphql`, names listed in <unknown_repos> are not found) with deterministic,
+    newest-first events and an artificial per-request latency. Event pages carry an ETag,
+    X-Poll-Interval and X-RateLimit-* headers and answer 304 to a matching If-None-Match.
+    Like GitHub, they answer 403 once the <rate_limit> quota of the window is used up, and
+    429 with Retry-After when more than <secondary_limit> requests arrive within a second.
+
+    Usage:
+        with GitHubStubServer(latency=0.1, events_per_repo=300) as stub:
+            with override_settings(GITHUB_API_URL=stub.url):
+                ...
+    """
+
+    EVENT_TYPES = ("PushEvent", "PullRequestEvent", "IssuesEvent", "WatchEvent")
+
+    def __init__(self, latency=0.0, events_per_repo=300, event_spacing=timedelta(minutes=5), poll_interval=60,
+                 rate_limit=5000, rate_limit_window=3600, secondary_limit=None, unknown_repos=()):
+        self.latency = latency
+        self.unknown_repos = set(unknown_repos)
+        self.poll_interval = poll_interval
+        self.rate_limit = rate_limit
+        self.rate_limit_window = rate_limit_window
+        self.rate_limit_used = 0
+        self.rate_limit_reset = int(time.time()) + rate_limit_window
+        self.secondary_limit = secondary_limit
+        self.rate_limited = 0  # 403/429 answers served
+        self._recent = []  # arrival times of event requests within the last second
+        self.events_per_repo = events_per_repo
+        self.event_spacing = event_spacing
+        self.started_at = now().replace(microsecond=0)
+        self.requests = 0
+        self.connections = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0  # most requests served at the same time
+        self.published = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def _request_started(self):
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _request_finished(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def publish(self, repo_name, count=1):
+        """Makes <count> newer events appear for a repository."""
+        with self._lock:
+            self.published[repo_name] = self.published.get(repo_name, 0) + count
+
+    def events_for(self, repo_name):
+        """Returns every event the stub holds for a repository, newest first."""
+        seed = self.repo_id(repo_name) % 1_000_000_000  # event ids are unique across repositories
+        total = self.events_per_repo + self.published.get(repo_name, 0)
+        oldest_at = self.started_at - (self.events_per_repo - 1) * self.event_spacing
+        return [
+            {
+                "id": str(10_000_000 + seed * 100_000 + k + 1),
+                "type": self.EVENT_TYPES[(seed + k) % len(self.EVENT_TYPES)],
+                "created_at": (oldest_at + k * self.event_spacing).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "repo": {"name": repo_name},
+            }
+            for k in range(total - 1, -1, -1)
+        ]
+
+    @staticmethod
+    def repo_id(repo_name):
+        """Stable numeric GitHub id of a repository."""
+        return int(hashlib.md5(repo_name.lower().encode()).hexdigest()[:12], 16)
+
+    def handle(self, path, query, headers, payload=None):
+        """
+        Routes one request (<payload> is the decoded JSON body of a POST). Returns (status, headers, body).
+        """
+        if path == "/graphql" and payload is not None:
+            return 200, self._rate_limit_headers(), {"data": self._graphql_repositories(payload)}
+
+        match = re.fullmatch(r"/repos/([^/]+/[^/]+)/events", path)
+        if match:
+            per_page = int(query.get("per_page", ["30"])[0])
+            page = int(query.get("page", ["1"])[0])
+            limited = self._rate_limited()
+            if limited:
+                return limited
+            events = self.events_for(match.group(1))[(page - 1) * per_page:page * per_page]
+
+            etag = f'W/"{hashlib.md5(json.dumps(events).encode()).hexdigest()}"'
+            response_headers = {"ETag": etag, "X-Poll-Interval": str(self.poll_interval)}
+            if headers.get("If-None-Match") == etag:
+                return 304, {**response_headers, **self._rate_limit_headers(charge=False)}, None
+            return 200, {**response_headers, **self._rate_limit_headers()}, events
+
+        match = re.fullmatch(r"/repos/([^/]+/[^/]+)", path)
+        if match:
+            return 200, {}, {"id": self.repo_id(match.group(1)), "full_name": match.group(1)}
+
+        return 404, {}, {"message": "Not Found"}
+
+    def _graphql_repositories(self, payload):
+        """Answers the aliased `alias: repository(owner: $o, name: $n)` fields of a GraphQL query."""
+        variables = payload.get("variables") or {}
+        data = {}
+
+        for alias, owner, name in re.findall(r"(\w+): repository\(owner: \$(\w+), name: \$(\w+)\)", payload["query"]):
+            repo_name = f"{variables[owner]}/{variables[name]}"
+            data[alias] = None if repo_name in self.unknown_repos else {
+                "databaseId": self.repo_id(repo_name), "nameWithOwner": repo_name,
+            }
+
+        return data
+
+    def _rate_limited(self):
+        """
+        Returns GitHub's rate-limit answer if the request exceeds the secondary or primary limit, else None.
+        """
+        with self._lock:
+            arrived = time.time()
+            self._recent = [t for t in self._recent if t > arrived - 1] + [arrived]
+
+            if self.secondary_limit and len(self._recent) > self.secondary_limit:
+                self.rate_limited += 1
+                return 429, {"Retry-After": "1"}, {"message": "You have exceeded a secondary rate limit."}
+
+            if arrived >= self.rate_limit_reset:
+                self.rate_limit_used = 0
+                self.rate_limit_reset = int(arrived) + self.rate_limit_window
+            if self.rate_limit_used >= self.rate_limit:
+                self.rate_limited += 1
+                return 403, {
+                    "X-RateLimit-Limit": str(self.rate_limit),
+                    "X-RateLimit-Remaining": "0",
+                    "X-RateLimit-Used": str(self.rate_limit_used),
+                    "X-RateLimit-Reset": str(self.rate_limit_reset),
+                }, {"message": "API rate limit exceeded."}
+
+        return None
+
+    def _rate_limit_headers(self, charge=True):
+        """
+        Charges one request against the rate limit (304s are free) and returns GitHub's headers.
+        """
+        with self._lock:
+            if time.time() >= self.rate_limit_reset:
+                self.rate_limit_used = 0
+                self.rate_limit_reset = int(time.time()) + self.rate_limit_window
+            if charge:
+                self.rate_limit_used += 1
+
+            return {
+                "X-RateLimit-Limit": str(self.rate_limit),
+                "X-RateLimit-Remaining": str(max(0, self.rate_limit - self.rate_limit_used)),
+                "X-RateLimit-Used": str(self.rate_limit_used),
+                "X-RateLimit-Reset": str(self.rate_limit_reset),
+            }
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like api.github.com
+            disable_nagle_algorithm = True  # headers and body are written separately
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def do_GET(self, payload=None):
+                stub._request_started()
+                try:
+                    if stub.latency:
+                        time.sleep(stub.latency)
+
+                    url = urlparse(self.path)
+                    status, headers, body = stub.handle(url.path, parse_qs(url.query), self.headers, payload)
+                    payload = json.dumps(body).encode() if body is not None else b""
+
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.end_headers()
+                    self.wfile.write(payload)
+                finally:
+                    stub._request_finished()
+
+            def do_POST(self):
+                self.do_GET(json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}"))
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+class AsyncGitHubStubServer(GitHubStubServer):
+    """
+    The same stub served by aiohttp on an event loop in a background thread.
+
+    Latency is an asyncio sleep rather than a blocked thread, so hundreds of concurrent requests
+    cost nothing extra and the client side is what gets measured.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._loop = None
+        self._runner = None
+        self._address = None
+
+    @property
+    def url(self):
+        host, port = self._address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        return self
+
+    def __exit__(self, *exc_info):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_get("/{path:.*}", self._handle_request)
+        app.router.add_post("/{path:.*}", self._handle_request)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self._address = site._server.sockets[0].getsockname()[:2]
+
+    async def _handle_request(self, request):
+        self._request_started()
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+
+            status, headers, body = self.handle(
+                request.path, {name: request.query.getall(name) for name in request.query}, request.headers,
+                await request.json() if request.method == "POST" else None,
+            )
+        finally:
+            self._request_finished()
+        return web.Response(
+            status=status,
+            headers=headers,
+            body=json.dumps(body).encode() if body is not None else None,
+            content_type="application/json",
+        )
@@ -0,0 +1,57 @@
+"""Per-call requests.get vs the pooled keep-alive GitHubAPIClient session, against a local GitHub stub."""
+import statistics
+import time
+
+import requests
+
+from monitor.benchmarks.github_stub import GitHubStubServer
+from monitor.services.github.api import GitHubAPIClient
+
+
+def add_arguments(parser):
+    parser.add_argument("--pages", type=int, default=200, help="Number of event pages to request")
+    parser.add_argument("--latency", type=float, default=0, help="Stub latency per request, in ms")
+
+
+def run(pages=200, latency=0):
+    """
+    Requests <pages> event pages once with a bare requests.get per page (the previous behaviour)
+    and once through a pooled GitHubAPIClient, counting TCP connections accepted by the stub.
+
+    The stub speaks plain HTTP, so the measured saving is TCP setup only; against api.github.com
+    each new connection additionally pays a TLS handshake.
+
+    Returns:
+        dict: Connections opened and per-page latency for both clients.
+    """
+    report = {}
+
+    with GitHubStubServer(latency=latency / 1000, events_per_repo=100) as stub:
+        client = GitHubAPIClient(base_url=stub.url, retries=0)
+        url = f"{stub.url}/repos/benchmark/http/events?per_page=100&page=1"
+
+        clients = {
+            "requests_get": lambda: requests.get(url, headers=GitHubAPIClient.get_headers()),
+            "pooled_session": lambda: client.fetch_repo_events("benchmark/http"),
+        }
+
+        for name, fetch_page in clients.items():
+            connections_before = stub.connections
+            latencies = []
+
+            for _ in range(pages):
+                started = time.perf_counter()
+                fetch_page().json()
+                latencies.append((time.perf_counter() - started) * 1000)
+
+            report[name] = {
+                "pages": pages,
+                "connections": stub.connections - connections_before,
+                "mean_ms": round(statistics.mean(latencies), 3),
+                "p99_ms": round(statistics.quantiles(latencies, n=100)[98], 3),
+            }
+
+        client.close()
+
+    report["saved_ms_per_page"] = round(report["requests_get"]["mean_ms"] - report["pooled_session"]["mean_ms"], 3)
+    return report
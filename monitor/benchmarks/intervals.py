@@ -0,0 +1,105 @@
+"""Per-group datetime path vs the vectorized epoch batch path for interval statistics."""
+import statistics
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+from django.db import transaction
+
+from monitor.benchmarks.stats import RollbackSeed, measure, same_stats, seed_events
+from monitor.services.github.analysis import Analyzer
+
+
+def per_group_stats(groups):
+    """
+    The per-group path extended to the batch statistics: a datetime list per group, converted
+    element by element into a new array.
+    """
+    result = []
+
+    for timestamps in groups:
+        if len(timestamps) < 2:
+            result.append(None)
+            continue
+
+        diffs = np.diff(np.array([dt.timestamp() for dt in timestamps]))
+        result.append((diffs.mean(), np.median(diffs), np.percentile(diffs, 90), diffs.std()))
+
+    return result
+
+
+def timed(func, repeat):
+    """Runs <func> <repeat> times and returns (result, latencies in ms)."""
+    latencies, result = [], None
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return result, latencies
+
+
+def summary(latencies):
+    return {"median_ms": round(statistics.median(latencies), 3), "min_ms": round(min(latencies), 3)}
+
+
+def add_arguments(parser):
+    parser.add_argument("--events", type=int, default=200_000, help="Number of events to seed")
+    parser.add_argument("--repos", type=int, default=5, help="Number of repositories to seed")
+    parser.add_argument("--event-types", type=int, default=10, help="Number of event types to seed")
+    parser.add_argument("--days", type=int, default=7, help="Rolling window in days")
+    parser.add_argument("--limit", type=int, default=5000, help="Max events per (repo, type)")
+    parser.add_argument("--repeat", type=int, default=5, help="Measurements per path")
+
+
+def run(events=200_000, repos=5, event_types=10, days=7, limit=5000, repeat=5, seed=0):
+    """
+    Compares interval statistics computed group by group from datetime lists with one vectorized
+    pass over flat epoch arrays: first the computation alone on identical in-memory windows,
+    then get_stats_per_group() against get_stats_batch() end to end. The seeded dataset is rolled back.
+
+    Returns:
+        dict: Latency summary per path and whether both paths agree.
+    """
+    report = {}
+
+    try:
+        with transaction.atomic():
+            seed_events(repos, event_types, events, days, seed)
+            analyzer = Analyzer(days=days, limit=limit)
+
+            keys, epochs, offsets = analyzer.fetch_epochs()
+            groups = [
+                [datetime.fromtimestamp(us / 1_000_000, tz=timezone.utc) for us in epochs[start:end].tolist()]
+                for start, end in zip(offsets[:-1], offsets[1:])
+            ]
+            report["groups"], report["events"] = len(keys), len(epochs)
+
+            mean_only, latencies = timed(lambda: [analyzer._calculate_average_interval(g) for g in groups], repeat)
+            report["compute_per_group_mean"] = summary(latencies)
+
+            per_group, latencies = timed(lambda: per_group_stats(groups), repeat)
+            report["compute_per_group"] = summary(latencies)
+
+            batch, latencies = timed(lambda: Analyzer.batch_interval_stats(epochs, offsets), repeat)
+            report["compute_batch"] = summary(latencies)
+
+            expected = np.array([row if row else (np.nan,) * 4 for row in per_group], dtype=float)
+            actual = np.column_stack([batch[name] for name in ("mean", "median", "p90", "stddev")])
+            report["compute_match"] = bool(
+                np.allclose(expected, actual, equal_nan=True)
+                and np.allclose(np.array(mean_only, dtype=float), batch["mean"], equal_nan=True)
+            )
+
+            for name, func in (("per_group", analyzer.get_stats_per_group), ("batch", analyzer.get_stats_batch)):
+                result, queries, latencies = measure(func, repeat)
+                report[f"end_to_end_{name}"] = {"queries": queries, **summary(latencies)}
+                report.setdefault("results", []).append(result)
+
+            report["results_match"] = same_stats(*report.pop("results"))
+            raise RollbackSeed
+    except RollbackSeed:
+        pass
+
+    return report
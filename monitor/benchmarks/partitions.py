@@ -0,0 +1,186 @@
+"""Analyzer stats query on a plain vs a range-partitioned Event table, plus the cost of expiring a day."""
+import statistics
+import time
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils.timezone import now
+
+from monitor.benchmarks.stats import RollbackSeed, lift_active_cap
+from monitor.models import Repository, EventType
+from monitor.services.github.analysis import Analyzer
+from monitor.services.github.partitions import EventPartitionService
+
+PLAIN_TABLE = "benchmark_event_plain"
+PARTITIONED_TABLE = "benchmark_event_partitioned"
+
+COLUMNS = """
+    id bigint NOT NULL,
+    repo_id bigint NOT NULL,
+    event_type_id bigint NOT NULL,
+    created_at timestamp with time zone NOT NULL,
+    gh_event_id bigint NULL
+"""
+
+# Rows arrive in time order like ingested events, with a random (repo, type) each.
+FILL_SQL = """
+    INSERT INTO {table}
+    SELECT g,
+           (%(repo_ids)s::bigint[])[1 + floor(random() * %(repos)s)::int],
+           (%(event_type_ids)s::bigint[])[1 + floor(random() * %(event_types)s)::int],
+           %(start)s + (g + random()) * %(step)s * interval '1 second',
+           g
+    FROM generate_series(1, %(events)s) g
+"""
+
+
+def create_tables(cursor, start, end, interval):
+    """
+    Creates a plain and a partitioned copy of the Event layout with the same indexes.
+
+    Returns:
+        list: (partition name, lower bound) pairs, oldest first.
+    """
+    cursor.execute(f"CREATE TABLE {PLAIN_TABLE} ({COLUMNS}, PRIMARY KEY (id))")
+    cursor.execute(
+        f"CREATE TABLE {PARTITIONED_TABLE} ({COLUMNS}, PRIMARY KEY (id, created_at)) PARTITION BY RANGE (created_at)"
+    )
+
+    partitions, lower = [], EventPartitionService.interval_start(start, interval)
+    while lower < end:
+        upper = lower + EventPartitionService.INTERVALS[interval]
+        name = f"{PARTITIONED_TABLE}_p{lower:%Y%m%d}"
+        cursor.execute(
+            f"CREATE TABLE {name} PARTITION OF {PARTITIONED_TABLE} FOR VALUES FROM (%s) TO (%s)", [lower, upper]
+        )
+        partitions.append((name, lower))
+        lower = upper
+
+    return partitions
+
+
+def create_indexes(cursor):
+    for table in (PLAIN_TABLE, PARTITIONED_TABLE):
+        cursor.execute(f"CREATE INDEX ON {table} (repo_id, event_type_id, created_at DESC)")
+        cursor.execute(f"CREATE INDEX ON {table} USING brin (created_at)")
+        cursor.execute(f"ANALYZE {table}")
+
+
+def stats_sql(table):
+    return Analyzer.STATS_SQL.format(
+        event_table=table,
+        repo_table=Repository._meta.db_table,
+        event_type_table=EventType._meta.db_table,
+        repo_filter="r.active",
+    )
+
+
+def measure(cursor, sql, params, repeat):
+    """
+    Runs <sql> <repeat> times and returns (rows, latencies in ms).
+    """
+    latencies, rows = [], None
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return rows, latencies
+
+
+def event_scans(cursor, table, sql, params):
+    """Counts the scans of <table> or its partitions in the plan of <sql>, i.e. what is left after pruning."""
+    cursor.execute(f"EXPLAIN {sql}", params)
+    return sum(1 for (line,) in cursor.fetchall() if "Scan" in line and f" on {table}" in line)
+
+
+def add_arguments(parser):
+    parser.add_argument("--events", type=int, default=10_000_000, help="Number of events to seed")
+    parser.add_argument("--repos", type=int, default=5, help="Number of repositories to seed")
+    parser.add_argument("--event-types", type=int, default=10, help="Number of event types to seed")
+    parser.add_argument("--span-days", type=int, default=90, help="Days of history the events cover")
+    parser.add_argument("--days", type=int, default=7, help="Rolling window in days")
+    parser.add_argument("--limit", type=int, default=500, help="Max events per (repo, type)")
+    parser.add_argument("--interval", choices=sorted(EventPartitionService.INTERVALS), default="day",
+                        help="Partition size")
+    parser.add_argument("--repeat", type=int, default=5, help="Measurements per layout")
+
+
+def run(events=10_000_000, repos=5, event_types=10, span_days=90, days=7, limit=500, interval="day", repeat=5):
+    """
+    Loads the same <events> events (ordered by time over <span_days> days) into a plain table and
+    into one partitioned by <interval>, then times Analyzer.STATS_SQL for a <days>-day window on
+    both and the removal of the oldest day (DELETE vs DETACH + DROP). Everything is rolled back.
+
+    Returns:
+        dict: Load time, stats latency, event table scans and expiry cost per layout.
+    """
+    report = {"events": events, "span_days": span_days, "interval": interval}
+
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            lift_active_cap()
+            Repository.objects.filter(active=True).update(active=False)
+            repo_objs = Repository.objects.bulk_create([
+                Repository(name=f"benchmark/repo-{i}", slug=f"benchmark-repo-{i}", gh_repo_id=-(i + 1), active=True)
+                for i in range(repos)
+            ])
+            type_objs = EventType.objects.bulk_create([
+                EventType(event_type=f"BenchmarkEvent{i}") for i in range(event_types)
+            ])
+
+            end = now()
+            start = end - timedelta(days=span_days)
+            partitions = create_tables(cursor, start, end + timedelta(days=1), interval)
+
+            load_started = time.perf_counter()
+            cursor.execute("SELECT setseed(0.42)")
+            cursor.execute(FILL_SQL.format(table=PLAIN_TABLE), {
+                "repo_ids": [repo.pk for repo in repo_objs],
+                "event_type_ids": [event_type.pk for event_type in type_objs],
+                "repos": repos,
+                "event_types": event_types,
+                "start": start,
+                "step": span_days * 24 * 60 * 60 / events,
+                "events": events,
+            })
+            cursor.execute(f"INSERT INTO {PARTITIONED_TABLE} SELECT * FROM {PLAIN_TABLE}")
+            create_indexes(cursor)
+            report["load_seconds"] = round(time.perf_counter() - load_started, 2)
+            report["partitions"] = len(partitions)
+
+            params = {"cutoff": end - timedelta(days=days), "limit": limit}
+            results = {}
+
+            for name, table in (("plain", PLAIN_TABLE), ("partitioned", PARTITIONED_TABLE)):
+                sql = stats_sql(table)
+                results[name], latencies = measure(cursor, sql, params, repeat)
+                report[name] = {
+                    "event_scans": event_scans(cursor, table, sql, params),
+                    "groups": len(results[name]),
+                    "median_ms": round(statistics.median(latencies), 2),
+                    "min_ms": round(min(latencies), 2),
+                }
+
+            report["results_match"] = results["plain"] == results["partitioned"]
+
+            # Expire the oldest day: row-by-row DELETE vs dropping its partition
+            oldest, upper = partitions[0][0], partitions[0][1] + EventPartitionService.INTERVALS[interval]
+
+            expire_started = time.perf_counter()
+            cursor.execute(f"DELETE FROM {PLAIN_TABLE} WHERE created_at < %s", [upper])
+            report["plain"]["expire_oldest_ms"] = round((time.perf_counter() - expire_started) * 1000, 2)
+            report["plain"]["expired_rows"] = cursor.rowcount
+
+            expire_started = time.perf_counter()
+            cursor.execute(f"ALTER TABLE {PARTITIONED_TABLE} DETACH PARTITION {oldest}")
+            cursor.execute(f"DROP TABLE {oldest}")
+            report["partitioned"]["expire_oldest_ms"] = round((time.perf_counter() - expire_started) * 1000, 2)
+
+            raise RollbackSeed
+    except RollbackSeed:
+        pass
+
+    return report
@@ -0,0 +1,109 @@
+"""Fetching more than one rate-limit window's worth of requests with and without the rate-limit scheduler."""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.test.utils import override_settings
+from django.utils.timezone import now
+
+from monitor.benchmarks.github_stub import GitHubStubServer
+from monitor.benchmarks.stats import lift_active_cap
+from monitor.models import Repository, RepositoryPollState, EventType, Event
+from monitor.services.github.api import GitHubAPIClient
+from monitor.services.github.events import GitHubEventService
+
+
+def add_arguments(parser):
+    parser.add_argument("--repos", type=int, default=10, help="Number of repositories to fetch")
+    parser.add_argument("--pages", type=int, default=3, help="Pages (of 100 events) served per repository")
+    parser.add_argument("--latency", type=float, default=20, help="Stub latency per request, in ms")
+    parser.add_argument("--concurrency", type=int, default=5, help="Parallel repositories")
+    parser.add_argument("--rate-limit", type=int, default=25, help="Stub quota per window")
+    parser.add_argument("--window", type=int, default=5, help="Stub rate-limit window, in seconds")
+    parser.add_argument("--secondary-limit", type=int, default=20, help="Stub max requests per second")
+    parser.add_argument("--burst", type=int, default=10, help="Scheduler: quota left below which requests are spread")
+
+
+def fetch_all(repos, client, concurrency):
+    """
+    Fetches <repos> with <concurrency> threads sharing <client>. Returns the first error, if any.
+    """
+    min_date = now() - timedelta(days=settings.EVENT_DAYS_LIMIT)
+
+    def fetch(repo):
+        try:
+            GitHubEventService.fetch_events_for_repository(
+                repo, 10, min_date, settings.EVENT_FETCH_LIMIT, client=client
+            )
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(fetch, repo) for repo in repos]
+
+    errors = [future.exception() for future in futures if future.exception()]
+    return errors[0] if errors else None
+
+
+def run(repos=10, pages=3, latency=20, concurrency=5, rate_limit=25, window=5, secondary_limit=20, burst=10):
+    """
+    Fetches <repos> repositories, which takes more requests than one <rate_limit> window allows,
+    from a stub that enforces primary and secondary rate limits. "scheduled" paces requests and
+    waits for resets and Retry-After. "unscheduled" neither spreads nor waits (burst 0, max_wait 0)
+    and so runs into the limit mid-run.
+
+    The seeded repositories are committed (worker threads use their own connections) and removed afterwards.
+
+    Returns:
+        dict: Wall time, requests, rate-limited answers, stored events and quota telemetry per mode.
+    """
+    report = {"requests_needed": repos * (pages + 1), "rate_limit": rate_limit, "window_seconds": window}
+    previously_active = list(Repository.objects.filter(active=True).values_list("pk", flat=True))
+    existing_types = set(EventType.objects.values_list("pk", flat=True))
+
+    try:
+        Repository.objects.filter(pk__in=previously_active).update(active=False)
+        with transaction.atomic():
+            lift_active_cap()
+            bench_repos = [
+                Repository.objects.create(name=f"benchmark/ratelimit-{i}", gh_repo_id=-(i + 1), active=True)
+                for i in range(repos)
+            ]
+
+        for mode, scheduler in (
+            ("scheduled", {"rate_limit_burst": burst, "rate_limit_max_wait": window * 2}),
+            ("unscheduled", {"rate_limit_burst": 0, "rate_limit_max_wait": 0}),
+        ):
+            Event.objects.filter(repo__in=bench_repos).delete()
+            RepositoryPollState.objects.filter(repo__in=bench_repos).delete()
+
+            stub = GitHubStubServer(
+                latency=latency / 1000, events_per_repo=pages * 100,
+                rate_limit=rate_limit, rate_limit_window=window, secondary_limit=secondary_limit,
+            )
+            with stub, override_settings(GITHUB_API_URL=stub.url):
+                client = GitHubAPIClient(pool_size=concurrency, **scheduler)
+                started = time.perf_counter()
+                error = fetch_all(bench_repos, client, concurrency)
+                elapsed = time.perf_counter() - started
+                client.close()
+
+            report[mode] = {
+                "seconds": round(elapsed, 3),
+                "requests": stub.requests,
+                "rate_limited_answers": stub.rate_limited,
+                "events_saved": Event.objects.filter(repo__in=bench_repos).count(),
+                "completed": error is None,
+                "error": str(error) if error else None,
+                "quota": client.quota(),
+            }
+    finally:
+        Event.objects.filter(repo__name__startswith="benchmark/ratelimit-").delete()
+        Repository.objects.filter(name__startswith="benchmark/ratelimit-").delete()
+        EventType.objects.exclude(pk__in=existing_types).filter(event__isnull=True).delete()
+        Repository.objects.filter(pk__in=previously_active).update(active=True)
+
+    report["events_expected"] = repos * pages * 100
+    return report
@@ -0,0 +1,314 @@
+"""Analyzer, ingest and /api/stats/ latency on fixed-size datasets (10k, 100k, 1M events), comparable across runs."""
+import json
+import os
+import platform
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import django
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils.timezone import now
+
+from monitor.benchmarks.stats import RollbackSeed, lift_active_cap, measure
+from monitor.executor import DatabaseExecutor
+from monitor.models import Event, Repository
+from monitor.services.github.analysis import Analyzer
+from monitor.services.github.cache import StatsCache
+from monitor.services.github.events import GitHubEventService
+from monitor.services.github.metrics import QueryCounter
+from monitor.services.github.synthetic import SyntheticEventService
+
+# Three consecutive pages of a repository's events in the GitHub REST API format, newest first
+FIXTURE = Path(__file__).parent / "fixtures" / "events_pages.json"
+PREFIX = "benchmark-regression"
+SIZE_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+NOISE_FLOOR_MS = 1.0  # latency changes below this are jitter, whatever their relative size
+
+
+def add_arguments(parser):
+    parser.add_argument("--sizes", default="10k,100k,1m", help="Comma-separated dataset sizes in events")
+    parser.add_argument("--repos", type=int, default=10, help="Repositories per dataset")
+    parser.add_argument("--event-types", type=int, default=10, help="Event types per repository")
+    parser.add_argument("--repeat", type=int, default=20, help="Measurements per Analyzer engine and API endpoint")
+    parser.add_argument("--replays", type=int, default=50, help="Times the page fixture is ingested per dataset")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the datasets")
+    parser.add_argument("--baseline", help="JSON report of an earlier run (--output) to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Relative latency/throughput change tolerated before it counts as a regression")
+
+
+def parse_sizes(sizes):
+    """Parses "10k,100k,1m" into [10000, 100000, 1000000]."""
+    parsed = []
+    for size in sizes.lower().split(","):
+        size = size.strip()
+        factor = SIZE_SUFFIXES.get(size[-1:], 1)
+        parsed.append(int(size[:-1] if factor > 1 else size) * factor)
+    return parsed
+
+
+def percentiles(latencies):
+    """Summarizes latencies in ms as p50, p90, p99 and max."""
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+    return {
+        "p50_ms": round(float(p50), 2),
+        "p90_ms": round(float(p90), 2),
+        "p99_ms": round(float(p99), 2),
+        "max_ms": round(max(latencies), 2),
+    }
+
+
+def seed_dataset(size, repos, event_types, seed):
+    """
+    Loads <size> events (rounded down to whole groups) for <repos> x <event_types> groups over the
+    stats window, active in place of the existing repositories. Returns the number of events.
+    """
+    lift_active_cap()
+    Repository.objects.filter(active=True).update(active=False)
+    result = SyntheticEventService.load(
+        repos, event_types, max(1, size // (repos * event_types)), settings.EVENT_DAYS_LIMIT,
+        prefix=PREFIX, activate=True, seed=seed,
+    )
+    StatsCache._bump()  # the seeded rows are never committed, so no bump was sent
+    return result["events"]
+
+
+def measure_analyzer(repeat):
+    """
+    Times Analyzer.get_stats as the API calls it (materialized aggregates when enabled) and the
+    batch engine reading the events.
+    """
+    report = {}
+    for name, use_aggregates in (("get_stats", None), ("batch", False)):
+        get_stats = lambda: Analyzer(use_aggregates=use_aggregates).get_stats()
+        get_stats()  # warm-up: the first call pays for cold buffers and catalog caches
+        result, queries, latencies = measure(get_stats, repeat)
+        report[name] = {"queries": queries, "groups": len(result), **percentiles(latencies)}
+    return report
+
+
+def fixture_replays(count, first_copy=0):
+    """
+    Returns <count> copies of the fixture pages, oldest copy first, each shifted to follow the
+    previous one, the newest one ending now. Event ids are shifted by copy number (starting at
+    <first_copy>), so passes with different <first_copy> do not collide.
+
+    Returns:
+        tuple: (copies, highest event id per copy).
+    """
+    with open(FIXTURE) as fixture:
+        pages = json.load(fixture)["pages"]
+
+    events = [event for page in pages for event in page]
+    ids = [int(event["id"]) for event in events]
+    times = [GitHubEventService._normalize_datetime(event["created_at"]) for event in events]
+    id_span = max(ids) - min(ids) + 1
+    time_span = max(times) - min(times) + timedelta(seconds=1)
+    end = now().replace(microsecond=0)
+
+    copies, highest = [], []
+    for k in range(count):
+        shift = end - max(times) - (count - 1 - k) * time_span
+        id_shift = (first_copy + k) * id_span
+        copy, index = [], 0
+        for page in pages:
+            copy.append([
+                {
+                    **event,
+                    "id": str(ids[index + i] + id_shift),
+                    "created_at": (times[index + i] + shift).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                }
+                for i, event in enumerate(page)
+            ])
+            index += len(page)
+        copies.append(copy)
+        highest.append(max(ids) + id_shift)
+    return copies, highest
+
+
+def measure_ingest(replays):
+    """
+    Feeds <replays> copies of the page fixture to GitHubEventService._process_events, newest page
+    first as a fetch does, once with the high-water mark of the previous copy (as polling does)
+    and once without (an existence query per page), each into a repository of its own.
+
+    Returns:
+        dict: Throughput and queries per page of both paths, and the queries of an already known page.
+    """
+    marked_repo, unmarked_repo = SyntheticEventService.repositories(2, prefix=f"{PREFIX}-ingest")
+    report = {}
+
+    for name, repo, use_mark in (("high_water_mark", marked_repo, True), ("existence_query", unmarked_repo, False)):
+        copies, highest = fixture_replays(replays, first_copy=0 if use_mark else replays)
+        pages = sum(len(copy) for copy in copies)
+        min_date = GitHubEventService._normalize_datetime(copies[0][-1][-1]["created_at"]) - timedelta(days=1)
+        event_limit = pages * 100
+        counter, mark = QueryCounter(), None
+        with connection.execute_wrapper(counter):
+            started = time.perf_counter()
+            for copy, copy_highest in zip(copies, highest):
+                for page in copy:
+                    GitHubEventService._process_events(page, repo, min_date, event_limit, mark if use_mark else None)
+                mark = copy_highest
+            elapsed = time.perf_counter() - started
+
+        added = Event.objects.filter(repo=repo).count()
+        report[name] = {
+            "pages": pages,
+            "events_added": added,
+            "events_per_second": round(added / elapsed),
+            "ms_per_page": round(elapsed * 1000 / pages, 2),
+            "queries_per_page": round(counter.count / pages, 2),
+        }
+
+        if use_mark:
+            # The newest page once more: its first event is at the high-water mark
+            counter = QueryCounter()
+            with connection.execute_wrapper(counter):
+                GitHubEventService._process_events(copies[-1][0], repo, min_date, event_limit, highest[-1])
+            report["known_page_queries"] = counter.count
+
+    return report
+
+
+def measure_api(repeat):
+    """
+    Requests /api/stats/ and the first seeded repository's /api/stats/<slug>/ <repeat> times each,
+    right after invalidating the stats cache (cold) and again from the cache (warm).
+
+    Returns:
+        dict: Latency percentiles and queries per request, per endpoint and cache state.
+    """
+    slug = Repository.objects.filter(name__startswith=f"{PREFIX}/").order_by("pk").values_list("slug", flat=True)[0]
+    report = {}
+
+    # Inline: the views must see the uncommitted dataset and count their queries on this connection
+    with override_settings(ALLOWED_HOSTS=["*"]), DatabaseExecutor.inline():
+        client = Client()
+        for endpoint, url in (("all", "/api/stats/"), ("repo", f"/api/stats/{slug}/")):
+            client.get(url)  # warm-up
+            latencies = {"cold": [], "warm": []}
+            queries = {}
+            for _ in range(repeat):
+                StatsCache._bump()
+                for state in ("cold", "warm"):
+                    counter = QueryCounter()
+                    with connection.execute_wrapper(counter):
+                        started = time.perf_counter()
+                        response = client.get(url)
+                        latencies[state].append((time.perf_counter() - started) * 1000)
+                    if response.status_code != 200:
+                        raise RuntimeError(f"{url} answered {response.status_code}")
+                    queries[state] = counter.count
+
+            report[endpoint] = {
+                state: {"queries": queries[state], **percentiles(latencies[state])} for state in ("cold", "warm")
+            }
+    return report
+
+
+def flatten(report, prefix=""):
+    """Yields (dotted key, value) for every number of a nested report."""
+    for key, value in report.items():
+        if isinstance(value, dict):
+            yield from flatten(value, f"{prefix}{key}.")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield f"{prefix}{key}", value
+
+
+def compare(report, baseline, tolerance):
+    """
+    Compares the datasets of <report> with those of an earlier <baseline> report. Median and p90
+    latencies and throughput regress when more than <tolerance> (relative) worse, latencies only
+    by more than NOISE_FLOOR_MS, query counts on any increase. p99 and max are too noisy at a few
+    dozen samples and are reported only.
+
+    Returns:
+        tuple: (regressions, improvements), lists of {metric, baseline, current, change}.
+    """
+    previous = dict(flatten(baseline.get("datasets", {})))
+    regressions, improvements = [], []
+
+    for key, value in flatten(report["datasets"]):
+        old, name = previous.get(key), key.rsplit(".", 1)[-1]
+        if old is None:
+            continue
+
+        if name in ("p50_ms", "p90_ms", "ms_per_page"):
+            if abs(value - old) < NOISE_FLOOR_MS:
+                continue
+            worse, better = value > old * (1 + tolerance), value < old * (1 - tolerance)
+        elif name.endswith("_per_second"):
+            worse, better = value < old * (1 - tolerance), value > old * (1 + tolerance)
+        elif "queries" in name:
+            worse, better = value > old, value < old
+        else:
+            continue
+
+        if worse or better:
+            entry = {
+                "metric": key,
+                "baseline": old,
+                "current": value,
+                "change": f"{(value - old) / old:+.1%}" if old else None,
+            }
+            (regressions if worse else improvements).append(entry)
+
+    return regressions, improvements
+
+
+def run(sizes="10k,100k,1m", repos=10, event_types=10, repeat=20, replays=50, seed=0, baseline=None,
+        tolerance=0.25):
+    """
+    For each dataset size, loads a synthetic dataset (see SyntheticEventService) and measures
+    Analyzer.get_stats latency and queries, _process_events throughput on the recorded page
+    fixture, and /api/stats/ latency percentiles. Each dataset is rolled back afterwards.
+
+    Write the report with --output and pass it as --baseline to a later run: metrics that got
+    worse are listed under "regressions" (and fail the command), better ones under "improvements".
+
+    Returns:
+        dict: Environment, settings and the measurements per dataset size.
+    """
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "postgresql": connection.cursor().connection.server_version,
+            "cpus": os.cpu_count(),
+            "started_at": now().isoformat(),
+        },
+        "settings": {
+            "EVENT_DAYS_LIMIT": settings.EVENT_DAYS_LIMIT,
+            "EVENT_FETCH_LIMIT": settings.EVENT_FETCH_LIMIT,
+            "STATS_FROM_AGGREGATES": settings.STATS_FROM_AGGREGATES,
+        },
+        "datasets": {},
+    }
+
+    for size in parse_sizes(sizes):
+        try:
+            with transaction.atomic():
+                started = time.perf_counter()
+                events = seed_dataset(size, repos, event_types, seed)
+                report["datasets"][str(size)] = {
+                    "events": events,
+                    "seed_seconds": round(time.perf_counter() - started, 2),
+                    "analyzer": measure_analyzer(repeat),
+                    "ingest": measure_ingest(replays),
+                    "api": measure_api(repeat),
+                }
+                raise RollbackSeed
+        except RollbackSeed:
+            pass
+
+    if baseline:
+        with open(baseline) as previous:
+            report["regressions"], report["improvements"] = compare(report, json.load(previous), tolerance)
+
+    return report
@@ -0,0 +1,149 @@
+"""Importing, fetching and analyzing hundreds of repositories: per-repository cost at two scales."""
+import io
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils.timezone import now
+
+from monitor.benchmarks.github_stub import GitHubStubServer
+from monitor.benchmarks.stats import RollbackSeed, measure
+from monitor.executor import DatabaseExecutor
+from monitor.models import Repository
+from monitor.services.github.analysis import Analyzer
+from monitor.services.github.api import GitHubAPIClient
+from monitor.services.github.cache import StatsCache
+from monitor.services.github.events import GitHubEventService
+from monitor.services.github.profiling import assert_max_queries
+
+STATS_QUERY_BUDGET = 3  # per stats API request, whatever the number of repositories
+
+
+def add_arguments(parser):
+    parser.add_argument("--repos", type=int, default=500, help="Number of repositories at full scale")
+    parser.add_argument("--sample", type=int, default=50, help="Number of repositories at the small scale")
+    parser.add_argument("--events", type=int, default=100, help="Events served per repository")
+    parser.add_argument("--batch-size", type=int, default=50, help="Repositories per GraphQL query")
+    parser.add_argument("--repeat", type=int, default=3, help="Measurements per stats engine")
+
+
+def measure_scale(stub, names, batch_size, repeat):
+    """
+    Imports and activates <names>, fetches their events and computes stats.
+
+    Returns:
+        dict: Totals and per-repository cost of each step.
+    """
+    report = {}
+    count = len(names)
+
+    with tempfile.NamedTemporaryFile("w", suffix=".txt") as repo_list:
+        repo_list.write("\n".join(names))
+        repo_list.flush()
+
+        requests_before = stub.requests
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            call_command("import_repositories", repo_list.name, activate=True, batch_size=batch_size,
+                         stdout=io.StringIO())
+            elapsed = time.perf_counter() - started
+        report["import"] = {
+            "seconds": round(elapsed, 3),
+            "queries": len(ctx.captured_queries),
+            "graphql_requests": stub.requests - requests_before,
+        }
+
+    client = GitHubAPIClient()
+    min_date = now() - timedelta(days=settings.EVENT_DAYS_LIMIT)
+    requests_before = stub.requests
+    with CaptureQueriesContext(connection) as ctx:
+        started = time.perf_counter()
+        for repo in Repository.objects.filter(active=True):
+            GitHubEventService.fetch_events_for_repository(
+                repo, 10, min_date, settings.EVENT_FETCH_LIMIT, client=client
+            )
+        elapsed = time.perf_counter() - started
+    client.close()
+    report["fetch"] = {
+        "seconds": round(elapsed, 3),
+        "ms_per_repo": round(elapsed * 1000 / count, 2),
+        "queries_per_repo": round(len(ctx.captured_queries) / count, 2),
+        "requests_per_repo": round((stub.requests - requests_before) / count, 2),
+    }
+
+    report["stats"] = {}
+    for engine, options in (
+        ("aggregates", {}), ("window", {"use_aggregates": False}), ("batch", {"metrics": ("median",)}),
+    ):
+        result, queries, latencies = measure(lambda: Analyzer(**options).get_stats(), repeat)
+        report["stats"][engine] = {
+            "groups": len(result),
+            "queries": queries,
+            "median_ms": round(statistics.median(latencies), 2),
+        }
+
+    report["api_query_budget"] = {}
+    slug = Repository.objects.filter(active=True).values_list("slug", flat=True).first()
+    for endpoint, url in (("all", "/api/stats/"), ("repo", f"/api/stats/{slug}/")):
+        StatsCache._bump()  # the seeded rows are never committed, so no bump was sent
+        # Inline: the views must see the uncommitted dataset
+        with override_settings(ALLOWED_HOSTS=["*"]), DatabaseExecutor.inline():
+            try:
+                with assert_max_queries(STATS_QUERY_BUDGET, url) as profile:
+                    response = Client().get(url)
+                within_budget = True
+            except AssertionError:
+                within_budget = False
+        if response.status_code != 200:
+            raise RuntimeError(f"{url} answered {response.status_code}")
+        report["api_query_budget"][endpoint] = {
+            "queries": profile.count, "budget": STATS_QUERY_BUDGET, "within_budget": within_budget,
+        }
+
+    return report
+
+
+def run(repos=500, sample=50, events=100, batch_size=50, repeat=3):
+    """
+    Runs the same workload for <sample> and for <repos> repositories: bulk import through
+    import_repositories (GraphQL id lookups against the stub), one fetch per repository and
+    Analyzer.get_stats() with each engine. Per-repository fetch cost should stay flat between the
+    scales and stats should take a constant number of queries; both stats endpoints are held to
+    STATS_QUERY_BUDGET queries per request. Finally checks that the database
+    rejects activating one repository over MAX_ACTIVE_REPOSITORIES. Everything is rolled back.
+
+    Returns:
+        dict: Import, fetch and stats cost per scale, and whether the cap held.
+    """
+    report = {}
+
+    try:
+        with transaction.atomic(), override_settings(MAX_ACTIVE_REPOSITORIES=repos):
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT set_config('monitor.max_active_repositories', %s, true)", [str(repos)])
+            Repository.objects.filter(active=True).update(active=False)
+
+            with GitHubStubServer(events_per_repo=events) as stub, override_settings(GITHUB_API_URL=stub.url):
+                for count in (sample, repos):
+                    Repository.objects.filter(active=True).update(active=False)
+                    names = [f"benchmark/scale-{count}-{i}" for i in range(count)]
+                    report[f"repos_{count}"] = measure_scale(stub, names, batch_size, repeat)
+
+            try:
+                with transaction.atomic():
+                    Repository.objects.filter(name=f"benchmark/scale-{sample}-0").update(active=True)
+                report["cap_enforced"] = False
+            except IntegrityError:
+                report["cap_enforced"] = True
+
+            raise RollbackSeed
+    except RollbackSeed:
+        pass
+
+    return report
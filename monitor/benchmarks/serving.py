@@ -0,0 +1,214 @@
+"""Requests per second and latency of the stats API under runserver, uvicorn and gunicorn with uvicorn workers."""
+import asyncio
+import importlib.util
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import aiohttp
+from django.conf import settings
+from django.db import transaction
+
+from monitor.benchmarks.regression import percentiles
+from monitor.benchmarks.stats import lift_active_cap
+from monitor.models import EventType, Repository
+from monitor.services.github.synthetic import SyntheticEventService
+
+PREFIX = "benchmark-serving"
+SERVERS = ("runserver", "uvicorn", "gunicorn")
+STARTUP_TIMEOUT = 30  # seconds for a server to answer /health
+
+
+def add_arguments(parser):
+    parser.add_argument("--repos", type=int, default=5, help="Active repositories")
+    parser.add_argument("--event-types", type=int, default=10, help="Event types per repository")
+    parser.add_argument("--events-per-group", type=int, default=500, help="Events per (repository, event type)")
+    parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds of load per server and scenario")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn/gunicorn worker processes")
+    parser.add_argument("--servers", default=",".join(SERVERS), help="Comma-separated servers to compare")
+
+
+def free_port():
+    """Returns a TCP port that is free on 127.0.0.1."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_command(server, port, workers):
+    """Returns the command line that serves the project with <server> on <port>."""
+    if server == "runserver":
+        return [sys.executable, str(settings.BASE_DIR / "manage.py"), "runserver", f"127.0.0.1:{port}", "--noreload"]
+    if server == "uvicorn":
+        return [
+            sys.executable, "-m", "uvicorn", "github_monitor.asgi:application", "--host", "127.0.0.1",
+            "--port", str(port), "--workers", str(workers), "--no-access-log", "--log-level", "warning",
+        ]
+    return [
+        sys.executable, "-m", "gunicorn", "github_monitor.asgi:application", "--bind", f"127.0.0.1:{port}",
+        "--workers", str(workers), "--worker-class", "uvicorn_worker.UvicornWorker", "--log-level", "warning",
+    ]
+
+
+def start_server(server, port, workers, cached):
+    """
+    Starts <server> with DEBUG off. runserver keeps the setup it replaces: one connection per
+    request (DB_CONN_MAX_AGE=0). Without <cached>, every request computes its stats.
+
+    Returns:
+        subprocess.Popen: The server, answering /health.
+    """
+    env = {
+        **os.environ,
+        "DEBUG": "False",
+        "ALLOWED_HOSTS": "127.0.0.1",
+        "QUERY_PROFILING": "False",
+        "DB_CONN_MAX_AGE": "0" if server == "runserver" else str(settings.DATABASES["default"]["CONN_MAX_AGE"]),
+        "STATS_CACHE_TIMEOUT": str(settings.STATS_CACHE_TIMEOUT if cached else 0),
+    }
+    process = subprocess.Popen(
+        server_command(server, port, workers), cwd=settings.BASE_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{server} exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                if response.status == 200:
+                    return process
+        except OSError:
+            time.sleep(0.2)
+
+    stop_server(process)
+    raise RuntimeError(f"{server} did not answer /health within {STARTUP_TIMEOUT}s")
+
+
+def stop_server(process):
+    """Stops a server started by start_server (and its worker processes)."""
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+async def generate_load(base_url, paths, concurrency, duration):
+    """
+    Keeps <concurrency> keep-alive requests in flight for <duration> seconds, cycling through
+    <paths>, after one second of unmeasured warm-up.
+
+    Returns:
+        tuple: (latencies in ms of the 200 answers, other answers and errors, measured seconds).
+    """
+    latencies, errors = [], 0
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=30)
+
+    async with aiohttp.ClientSession(base_url, connector=connector, timeout=timeout) as session:
+        async def client(offset, until, record):
+            nonlocal errors
+            index = offset
+            while time.perf_counter() < until:
+                path = paths[index % len(paths)]
+                index += 1
+                started = time.perf_counter()
+                try:
+                    async with session.get(path) as response:
+                        await response.read()
+                        ok = response.status == 200
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    ok = False
+                if record:
+                    if ok:
+                        latencies.append((time.perf_counter() - started) * 1000)
+                    else:
+                        errors += 1
+
+        for record, seconds in ((False, 1), (True, duration)):
+            started = time.perf_counter()
+            await asyncio.gather(*(client(i, started + seconds, record) for i in range(concurrency)))
+            elapsed = time.perf_counter() - started
+
+    return latencies, errors, elapsed
+
+
+def run(repos=5, event_types=10, events_per_group=500, concurrency=32, duration=10, workers=1,
+        servers=",".join(SERVERS)):
+    """
+    Serves the project with each server in a subprocess and drives /api/stats/ and every
+    /api/stats/<slug>/ with <concurrency> concurrent clients, once from the stats cache and once
+    computing every response ("uncached", which is what the database connections matter for).
+
+    "runserver" is the previous setup (WSGI, a thread and a new database connection per request);
+    uvicorn and gunicorn serve the async views over ASGI with persistent connections. Client and
+    servers share the machine, so compare the servers with each other rather than with production.
+
+    The seeded repositories are committed (the servers use their own connections) and removed
+    afterwards; previously active repositories are deactivated for the duration of the run.
+
+    Returns:
+        dict: Requests per second, latency percentiles and errors per scenario and server.
+    """
+    servers = [server.strip() for server in servers.split(",")]
+    report = {
+        "concurrency": concurrency,
+        "duration_seconds": duration,
+        "workers": workers,
+        "async_db_threads": settings.ASYNC_DB_THREADS,
+        "cpus": os.cpu_count(),
+    }
+    previously_active = list(Repository.objects.filter(active=True).values_list("pk", flat=True))
+    existing_types = set(EventType.objects.values_list("pk", flat=True))
+
+    try:
+        Repository.objects.filter(pk__in=previously_active).update(active=False)
+        with transaction.atomic():
+            lift_active_cap()
+            report["events"] = SyntheticEventService.load(
+                repos, event_types, events_per_group, settings.EVENT_DAYS_LIMIT, prefix=PREFIX, activate=True,
+            )["events"]
+        slugs = Repository.objects.filter(name__startswith=f"{PREFIX}/").values_list("slug", flat=True)
+        paths = ["/api/stats/", *(f"/api/stats/{slug}/" for slug in slugs)]
+
+        for scenario, cached in (("cached", True), ("uncached", False)):
+            report[scenario] = {}
+            for server in servers:
+                module = "uvicorn_worker" if server == "gunicorn" else server
+                if server != "runserver" and importlib.util.find_spec(module) is None:
+                    report[scenario][server] = {"skipped": f"{module} is not installed"}
+                    continue
+
+                port = free_port()
+                process = start_server(server, port, workers, cached)
+                try:
+                    latencies, errors, elapsed = asyncio.run(
+                        generate_load(f"http://127.0.0.1:{port}", paths, concurrency, duration)
+                    )
+                finally:
+                    stop_server(process)
+
+                report[scenario][server] = {
+                    "requests": len(latencies),
+                    "requests_per_second": round(len(latencies) / elapsed, 1),
+                    "errors": errors,
+                    **(percentiles(latencies) if latencies else {}),
+                }
+
+            baseline = report[scenario].get("runserver", {}).get("requests_per_second")
+            for server, result in report[scenario].items():
+                if baseline and server != "runserver" and "requests_per_second" in result:
+                    result["speedup"] = round(result["requests_per_second"] / baseline, 2)
+    finally:
+        SyntheticEventService.clear(PREFIX)
+        EventType.objects.exclude(pk__in=existing_types).filter(event__isnull=True).delete()
+        Repository.objects.filter(pk__in=previously_active).update(active=True)
+
+    return report
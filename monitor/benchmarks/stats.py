@@ -0,0 +1,205 @@
+"""Per-group query loop vs single-query window and batch engines vs materialized aggregates for Analyzer.get_stats."""
+import json
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
+
+from monitor.models import Repository, EventType, Event
+from monitor.services.github.aggregates import EventAggregateService
+from monitor.services.github.analysis import Analyzer
+from monitor.services.github.timeseries import ActivitySeriesService
+
+
+class RollbackSeed(Exception):
+    """Raised to roll back the benchmark dataset once measurements are done."""
+
+
+def lift_active_cap():
+    """Lifts the active-repository cap for the current transaction, so any number of repositories can be seeded."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT set_config('monitor.max_active_repositories', '0', true)")
+
+
+def seed_events(repos, event_types, events, days, seed=0):
+    """
+    Creates a synthetic dataset of <events> events spread uniformly over the last <days> days
+    and rebuilds the event aggregates. Existing repositories are deactivated so only the seeded
+    ones are analyzed.
+    """
+    rng = random.Random(seed)
+    lift_active_cap()
+    Repository.objects.filter(active=True).update(active=False)
+
+    repo_objs = Repository.objects.bulk_create([
+        Repository(name=f"benchmark/repo-{i}", slug=f"benchmark-repo-{i}", gh_repo_id=-(i + 1), active=True)
+        for i in range(repos)
+    ])
+    type_objs = EventType.objects.bulk_create([
+        EventType(event_type=f"BenchmarkEvent{i}") for i in range(event_types)
+    ])
+
+    end = now()
+    span = days * 24 * 60 * 60
+
+    Event.objects.bulk_create(
+        (
+            Event(
+                repo=rng.choice(repo_objs),
+                event_type=rng.choice(type_objs),
+                created_at=end - timedelta(seconds=rng.uniform(0, span)),
+            )
+            for _ in range(events)
+        ),
+        batch_size=10_000,
+    )
+    # Plan against the seeded rows, not the statistics of an emptier table
+    with connection.cursor() as cursor:
+        cursor.execute(f"ANALYZE {Event._meta.db_table}")
+    EventAggregateService.rebuild()
+
+
+def measure(func, repeat):
+    """
+    Runs <func> <repeat> times and returns (result, query count, latencies in ms).
+    """
+    latencies, result, queries = [], None, 0
+
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            result = func()
+            latencies.append((time.perf_counter() - start) * 1000)
+        queries = len(ctx.captured_queries)
+
+    return result, queries, latencies
+
+
+def same_stats(left, right):
+    """Compares two get_stats() results, tolerating float rounding in the averages."""
+    if len(left) != len(right):
+        return False
+
+    key = lambda row: (row["repository"], row["event_type"])
+    for a, b in zip(sorted(left, key=key), sorted(right, key=key)):
+        if key(a) != key(b) or a["event_count"] != b["event_count"]:
+            return False
+        if (a["average_interval_seconds"] is None) != (b["average_interval_seconds"] is None):
+            return False
+        if a["average_interval_seconds"] is not None and \
+                abs(a["average_interval_seconds"] - b["average_interval_seconds"]) > 1e-3:
+            return False
+    return True
+
+
+def compare_windows(windows, limit, repeat):
+    """
+    Runs the batch engine once per window and the multi-window engine once for all of them.
+
+    Returns:
+        dict: Queries and latency of both, and whether every window's stats match.
+    """
+    combined = Analyzer(limit=limit, windows=windows)
+    separate = {
+        label: Analyzer(days=days, limit=limit, use_aggregates=False) for label, days in combined.windows
+    }
+    for analyzer in separate.values():
+        analyzer.end, analyzer.cutoff = combined.end, combined.end - timedelta(days=analyzer.days)
+
+    separate_result, separate_queries, separate_latencies = measure(
+        lambda: {label: analyzer.get_stats_batch() for label, analyzer in separate.items()}, repeat
+    )
+    combined_result, combined_queries, combined_latencies = measure(combined.get_stats_multi_window, repeat)
+
+    match = True
+    for label, rows in separate_result.items():
+        derived = [
+            {**row, **row["windows"][label]} for row in combined_result if row["windows"][label]["event_count"]
+        ]
+        match = match and same_stats(rows, derived)
+
+    return {
+        "separate": {"queries": separate_queries, "median_ms": round(statistics.median(separate_latencies), 2)},
+        "combined": {"queries": combined_queries, "median_ms": round(statistics.median(combined_latencies), 2)},
+        "results_match": match,
+    }
+
+
+def measure_timeseries(days, repeat):
+    """
+    Builds the hourly activity series of every seeded repository over <days> days.
+
+    Returns:
+        dict: Queries, latency and JSON size of the series of all repositories together.
+    """
+    repos = list(Repository.objects.filter(name__startswith="benchmark/repo-"))
+    series, queries, latencies = measure(
+        lambda: [ActivitySeriesService.get_series(repo, timedelta(hours=1), days) for repo in repos], repeat
+    )
+    return {
+        "repos": len(repos),
+        "points": sum(len(columns["event_count"]) for item in series for columns in item["series"].values()),
+        "queries": queries,
+        "median_ms": round(statistics.median(latencies), 2),
+        "json_bytes": len(json.dumps(series, separators=(",", ":"))),
+    }
+
+
+def add_arguments(parser):
+    parser.add_argument("--events", type=int, default=100_000, help="Number of events to seed")
+    parser.add_argument("--repos", type=int, default=5, help="Number of repositories to seed")
+    parser.add_argument("--event-types", type=int, default=10, help="Number of event types to seed")
+    parser.add_argument("--days", type=int, default=7, help="Rolling window in days")
+    parser.add_argument("--limit", type=int, default=500, help="Max events per (repo, type)")
+    parser.add_argument("--repeat", type=int, default=5, help="Measurements per engine")
+    parser.add_argument("--windows", default="1d,7d,30d", help="Windows compared as separate and combined runs")
+
+
+def run(events=100_000, repos=5, event_types=10, days=7, limit=500, repeat=5, seed=0, windows="1d,7d,30d"):
+    """
+    Compares the per-group query loop, the single-query window and batch engines and the materialized
+    aggregates of Analyzer.get_stats. Then compares one batch run per window of <windows> with a
+    single multi-window run, and times the hourly activity series of all seeded repositories.
+    The seeded dataset is rolled back afterwards.
+
+    Returns:
+        dict: Query counts and latency summary per engine.
+    """
+    report = {}
+
+    try:
+        with transaction.atomic():
+            seed_events(repos, event_types, events, days, seed)
+            analyzer = Analyzer(days=days, limit=limit)
+
+            engines = {
+                "per_group": analyzer.get_stats_per_group,
+                "window": analyzer.get_stats_windowed,
+                "batch": analyzer.get_stats_batch,
+                "aggregates": analyzer.get_stats_from_aggregates,
+            }
+            results = {}
+
+            for name, func in engines.items():
+                results[name], queries, latencies = measure(func, repeat)
+                report[name] = {
+                    "queries": queries,
+                    "groups": len(results[name]),
+                    "median_ms": round(statistics.median(latencies), 2),
+                    "min_ms": round(min(latencies), 2),
+                }
+
+            report["results_match"] = all(
+                same_stats(results["per_group"], results[name]) for name in ("window", "batch", "aggregates")
+            )
+            report["windows"] = compare_windows(windows, limit, repeat)
+            report["timeseries"] = measure_timeseries(days, repeat)
+            raise RollbackSeed
+    except RollbackSeed:
+        pass
+
+    return report
@@ -0,0 +1,98 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.http import StreamingHttpResponse
+
+from monitor.services.github.profiling import record_active
+
+_inline = ContextVar("database_executor_inline", default=False)
+
+
+class DatabaseExecutor:
+    """
+    Runs the blocking part of async views (ORM queries, cache lookups) on a bounded pool of
+    ASYNC_DB_THREADS threads, so the event loop never waits on the database and at most that many
+    database connections are open per server process.
+
+    Each pool thread keeps its connection between requests (persistent connections, CONN_MAX_AGE),
+    with Django's request-cycle rules applied around every call: connections past their age or
+    left broken are closed, and with CONN_HEALTH_CHECKS a reused connection is checked before
+    its first query.
+
+    Without this pool, Django runs sync views under ASGI one at a time on a single shared thread.
+
+    Query profiles recording around the call (QueryProfile.record) also count its queries.
+    """
+
+    _executor = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def executor():
+        """Returns the process-wide pool, created on first use (after the server forked its workers)."""
+        if DatabaseExecutor._executor is None:
+            with DatabaseExecutor._lock:
+                if DatabaseExecutor._executor is None:
+                    DatabaseExecutor._executor = ThreadPoolExecutor(
+                        max_workers=settings.ASYNC_DB_THREADS, thread_name_prefix="db"
+                    )
+        return DatabaseExecutor._executor
+
+    @staticmethod
+    def _call(func, args, kwargs):
+        # What request_started and request_finished do for sync views
+        close_old_connections()
+        try:
+            with record_active():
+                return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    @staticmethod
+    async def run(func, *args, **kwargs):
+        """Awaits func(*args, **kwargs), run on a pool thread (or inline, see inline())."""
+        if _inline.get():
+            return await sync_to_async(func)(*args, **kwargs)
+        call = sync_to_async(DatabaseExecutor._call, thread_sensitive=False, executor=DatabaseExecutor.executor())
+        return await call(func, args, kwargs)
+
+    @staticmethod
+    @contextmanager
+    def inline():
+        """
+        Runs the calls made in the enclosed block on the thread of the sync code that awaits them
+        (e.g. a test client request), so they share its connection and open transaction, and its
+        connections are not closed in between.
+        """
+        token = _inline.set(True)
+        try:
+            yield
+        finally:
+            _inline.reset(token)
+
+    @staticmethod
+    def ping():
+        """Runs a trivial query, raising django.db.DatabaseError when the database is unreachable."""
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+
+
+class PooledStreamingHttpResponse(StreamingHttpResponse):
+    """
+    StreamingHttpResponse over a sync iterator that also streams under ASGI. There Django would
+    first read the whole iterator into a list on its shared sync thread; this response pulls one
+    chunk at a time through DatabaseExecutor instead. Under WSGI the iterator is read directly.
+
+    Consecutive chunks may be produced on different pool threads (and connections), so the
+    iterator must not keep query state, such as a server-side cursor, between chunks.
+    """
+
+    async def __aiter__(self):
+        chunks = iter(self.streaming_content)
+        while (chunk := await DatabaseExecutor.run(next, chunks, None)) is not None:
+            yield chunk
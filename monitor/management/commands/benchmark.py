@@ -0,0 +1,54 @@
+import inspect
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from monitor.benchmarks import fetch, http, intervals, partitions, ratelimit, regression, repositories, serving, stats
+
+
+class Command(BaseCommand):
+    """
+    Management command to run performance benchmarks against a throwaway dataset.
+    Each suite seeds its own data and removes it afterwards.
+    """
+
+    help = "Run performance benchmarks (see 'benchmark <suite> --help' for suite options)"
+
+    suites = {
+        "stats": stats,
+        "fetch": fetch,
+        "http": http,
+        "partitions": partitions,
+        "intervals": intervals,
+        "ratelimit": ratelimit,
+        "repositories": repositories,
+        "regression": regression,
+        "serving": serving,
+    }
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest="suite", required=True)
+
+        for name, suite in self.suites.items():
+            suite_parser = subparsers.add_parser(name, help=suite.__doc__)
+            suite.add_arguments(suite_parser)
+            suite_parser.add_argument("--output", help="Also write the JSON report to this file")
+
+    def handle(self, *args, **options):
+        """
+        Entry point for the management command.
+        """
+        suite = self.suites[options["suite"]]
+        arguments = inspect.signature(suite.run).parameters
+
+        self.stdout.write(f"Running '{options['suite']}' benchmark...")
+        report = suite.run(**{name: options[name] for name in arguments if name in options})
+
+        self.stdout.write(json.dumps(report, indent=2))
+
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(report, output, indent=2)
+
+        if report.get("regressions"):
+            raise CommandError(f"{len(report['regressions'])} metrics regressed against the baseline")
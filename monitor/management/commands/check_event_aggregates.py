@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from monitor.services.github.aggregates import EventAggregateService
+
+
+class Command(BaseCommand):
+    """
+    Management command to verify the EventAggregate table against the Event table.
+    Recomputes every (repo, event_type) group from Event and reports differences;
+    with --fix the table is rebuilt from the recomputed values.
+    """
+
+    help = "Check (and optionally rebuild) materialized event aggregates against raw events"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fix", action="store_true", help="Rebuild the aggregate table from Event")
+
+    def handle(self, *args, **options):
+        """
+        Entry point for the management command.
+        """
+        mismatches = EventAggregateService.diff()
+
+        for repo_id, event_type_id, field, stored, expected in mismatches:
+            self.stdout.write(
+                f"✗ repo={repo_id} event_type={event_type_id} {field}: stored={stored} expected={expected}"
+            )
+
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS("✓ Event aggregates are consistent."))
+        elif not options["fix"]:
+            self.stdout.write(self.style.WARNING(f"{len(mismatches)} mismatches found, run with --fix to rebuild."))
+
+        if options["fix"] and mismatches:
+            groups = EventAggregateService.rebuild()
+            self.stdout.write(self.style.SUCCESS(f"✓ Rebuilt aggregates for {groups} groups."))
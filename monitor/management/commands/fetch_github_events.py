@@ -1,44 +1,197 @@
+import time
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import timedelta
 
+from asgiref.sync import async_to_sync
 from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import F
 from django.utils.timezone import now
 
 from monitor.models import Repository
+from monitor.services.github.api import GitHubAPIClient
+from monitor.services.github.async_api import AsyncGitHubAPIClient
+from monitor.services.github.async_events import AsyncGitHubEventService
 from monitor.services.github.events import GitHubEventService as GHService
+from monitor.services.github.profiling import QueryProfile
 
 
 class Command(BaseCommand):
     """
     Management command to fetch recent GitHub events for all active repositories.
     Applies rolling window logic: last N days or last N events per type/repo.
+    With --concurrency N, up to N repositories are fetched in parallel worker threads.
+    With --async, one asyncio event loop keeps up to --concurrency requests in flight instead.
+    Repositories polled longest ago are fetched first; the run ends with the rate-limit quota left.
+    With --profile, it also reports the database queries of the run and the slowest statements.
     """
 
     help = "Fetch GitHub events for active repositories (rolling window: 7 days or 500 events)"
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
         self.page_limit = 10
         self.min_date = now() - timedelta(days=settings.EVENT_DAYS_LIMIT)
         self.event_limit = settings.EVENT_FETCH_LIMIT
+        self.profile = None
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency", type=int, default=1,
+            help="Number of repositories to fetch in parallel (default: 1)",
+        )
+        parser.add_argument(
+            "--async", action="store_true", dest="use_async",
+            help="Fetch on asyncio with --concurrency requests in flight, writing pages as they arrive",
+        )
+        parser.add_argument(
+            "--profile", action="store_true",
+            help="Report query count, database time and the slowest statements of the run",
+        )
 
     def handle(self, *args, **options):
         """
         Entry point for the management command.
         """
-        active_repos = Repository.objects.filter(active=True)
-        if not active_repos.exists():
+        active_repos = list(
+            Repository.objects.filter(active=True)
+            .order_by(F("poll_state__last_polled_at").asc(nulls_first=True), "pk")
+        )
+        if not active_repos:
             self.stdout.write("No active repositories found.")
             return
 
-        for repo in active_repos:
-            self.stdout.write(f"Fetching events for: {repo.name}")
+        if options["profile"]:
+            self.profile = QueryProfile()
+        with self.profile.record() if self.profile else nullcontext():
+            self._fetch(active_repos, max(1, options["concurrency"]), options["use_async"])
+        if self.profile:
+            self._report_profile(len(active_repos))
 
-            result: GHService.EventFetchResult = GHService.fetch_events_for_repository(
-                repo, self.page_limit, self.min_date, self.event_limit
+    def _fetch(self, active_repos, concurrency, use_async):
+        """
+        Fetches <active_repos> sequentially, in <concurrency> threads or on asyncio, and reports the results.
+        """
+        if use_async:
+            self.stdout.write(
+                f"Fetching events for {len(active_repos)} repositories (async, {concurrency} requests in flight)"
             )
+            self.client = AsyncGitHubAPIClient(concurrency=concurrency)
+            started = time.perf_counter()
+            try:
+                results = async_to_sync(self._fetch_async)(active_repos)
+            finally:
+                self._report_quota()
+            self._report_total(results, time.perf_counter() - started)
+            return
 
-            self.stdout.write(
-                f"✓ {result['new_events']} new events saved for {repo.name}, "
-                f"{result['skipped_events']} known events across {result['pages_fetched']} pages"
+        # One pooled keep-alive client for the whole run, with a connection slot per worker
+        self.client = GitHubAPIClient(pool_size=max(concurrency, settings.GITHUB_HTTP_POOL_SIZE))
+        started = time.perf_counter()
+        results = []
+
+        try:
+            if concurrency == 1:
+                for repo in active_repos:
+                    self.stdout.write(f"Fetching events for: {repo.name}")
+                    results.append(self._fetch_repository(repo))
+                    self._report_repository(repo, *results[-1])
+            else:
+                self.stdout.write(
+                    f"Fetching events for {len(active_repos)} repositories ({concurrency} in parallel)"
+                )
+
+                with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                    futures = {
+                        executor.submit(self._fetch_repository_in_thread, repo): repo for repo in active_repos
+                    }
+
+                    for future in as_completed(futures):
+                        results.append(future.result())
+                        self._report_repository(futures[future], *results[-1])
+        finally:
+            self.client.close()
+            self._report_quota()
+
+        self._report_total(results, time.perf_counter() - started)
+
+    def _fetch_repository(self, repo):
+        """
+        Fetches events for one repository. Returns (fetch result, elapsed seconds).
+        """
+        started = time.perf_counter()
+        result: GHService.EventFetchResult = GHService.fetch_events_for_repository(
+            repo, self.page_limit, self.min_date, self.event_limit, client=self.client
+        )
+        return result, time.perf_counter() - started
+
+    async def _fetch_async(self, repos):
+        """
+        Fetches all repositories on the event loop. Returns (fetch result, elapsed seconds) per repository.
+        """
+        results = []
+
+        def collect(repo, result, elapsed):
+            results.append((result, elapsed))
+            self._report_repository(repo, result, elapsed)
+
+        async with self.client:
+            await AsyncGitHubEventService.fetch_events_for_repositories(
+                repos, self.page_limit, self.min_date, self.event_limit, client=self.client, on_result=collect
             )
+        return results
+
+    def _fetch_repository_in_thread(self, repo):
+        """
+        Worker-thread wrapper: Django opens one DB connection per thread, close it when done.
+        """
+        try:
+            with self.profile.record() if self.profile else nullcontext():
+                return self._fetch_repository(repo)
+        finally:
+            connections.close_all()
+
+    def _report_repository(self, repo, result, elapsed):
+        if result["not_modified"]:
+            self.stdout.write(f"✓ {repo.name} not modified since last poll (304) in {elapsed:.2f}s")
+            return
+
+        self.stdout.write(
+            f"✓ {result['new_events']} new events saved for {repo.name}, "
+            f"{result['skipped_events']} known events across {result['pages_fetched']} pages "
+            f"in {elapsed:.2f}s"
+        )
+
+    def _report_quota(self):
+        quota = self.client.quota()
+        if quota["remaining"] is None:
+            return
+
+        self.stdout.write(
+            f"Rate limit: {quota['remaining']}/{quota['limit']} left, resets in {quota['reset_in_seconds']:.0f}s; "
+            f"{quota['delayed_requests']} of {quota['requests']} requests delayed ({quota['waited_seconds']:.1f}s), "
+            f"{quota['rate_limited_responses']} rate-limited responses"
+        )
+
+    def _report_profile(self, repo_count):
+        summary = self.profile.summary()
+        self.stdout.write(
+            f"Database: {summary['queries']} queries ({summary['queries'] / repo_count:.1f} per repository), "
+            f"{summary['db_ms']:.1f} ms"
+        )
+        for statement in summary["slowest"]:
+            self.stdout.write(f"  {statement['ms']:.2f} ms: {' '.join(statement['sql'].split())[:200]}")
+
+    def _report_total(self, results, elapsed):
+        new_events = sum(result["new_events"] for result, _ in results)
+        processed = new_events + sum(result["skipped_events"] for result, _ in results)
+        pages = sum(result["pages_fetched"] for result, _ in results)
+        not_modified = sum(result["not_modified"] for result, _ in results)
+
+        self.stdout.write(
+            f"Done: {len(results)} repositories ({not_modified} not modified), {pages} pages, "
+            f"{processed} events ({new_events} new) in {elapsed:.2f}s — "
+            f"{processed / elapsed if elapsed else 0:.1f} events/s, {pages / elapsed if elapsed else 0:.1f} pages/s"
+        )
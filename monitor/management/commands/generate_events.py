@@ -0,0 +1,65 @@
+from argparse import BooleanOptionalAction
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from monitor.services.github.synthetic import SyntheticEventService
+
+
+class Command(BaseCommand):
+    """
+    Management command to generate a synthetic event dataset of any size, e.g. for benchmarks:
+    <repos> x <event-types> groups of <events-per-group> bursty events each, streamed into the
+    Event table with a binary COPY. The same arguments (and --seed) produce the same dataset.
+    """
+
+    help = "Generate synthetic, bursty events for <prefix>/repo-<i> repositories (COPY-loaded)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repos", type=int, default=10, help="Number of repositories")
+        parser.add_argument("--event-types", type=int, default=5, help="Event types per repository")
+        parser.add_argument("--events-per-group", type=int, default=1000,
+                            help="Events per (repository, event type)")
+        parser.add_argument("--days", type=float, default=7, help="Time span of the events, ending now")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed")
+        parser.add_argument("--burst-size", type=float, default=20, help="Mean events per burst")
+        parser.add_argument("--burst-gap", type=float, default=60, help="Mean seconds between events of a burst")
+        parser.add_argument("--prefix", default="synthetic", help="Repository owner of the generated repositories")
+        parser.add_argument("--activate", action="store_true",
+                            help="Activate the repositories (subject to MAX_ACTIVE_REPOSITORIES)")
+        parser.add_argument("--clear", action="store_true",
+                            help="Delete the <prefix>/ repositories and their events first")
+        parser.add_argument("--defer-indexes", action=BooleanOptionalAction, default=None,
+                            help="Rebuild the Event indexes after loading instead of updating them per row, "
+                                 "locking the table (default: when loading at least half as many rows as it holds)")
+
+    def handle(self, *args, **options):
+        """
+        Entry point for the management command.
+        """
+        for option in ("repos", "event_types", "events_per_group", "days", "burst_size", "burst_gap"):
+            if options[option] <= 0:
+                raise CommandError(f"--{option.replace('_', '-')} must be positive")
+
+        if options["clear"]:
+            deleted = SyntheticEventService.clear(options["prefix"])
+            self.stdout.write(f"✓ {deleted} events of {options['prefix']}/ repositories deleted")
+
+        total = options["repos"] * options["event_types"] * options["events_per_group"]
+        self.stdout.write(f"Generating {total} events...")
+
+        try:
+            result = SyntheticEventService.load(
+                options["repos"], options["event_types"], options["events_per_group"], options["days"],
+                prefix=options["prefix"], activate=options["activate"], burst_size=options["burst_size"],
+                burst_gap=options["burst_gap"], seed=options["seed"], defer_indexes=options["defer_indexes"],
+            )
+        except IntegrityError as exc:
+            raise CommandError(f"Nothing generated: {str(exc).splitlines()[0]}") from None
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {result['events']} events in {result['groups']} groups copied in {result['seconds']}s "
+            f"({result['events_per_second']} events/s"
+            + (", indexes rebuilt after the load" if result["indexes_deferred"] else "")
+            + "), aggregates rebuilt"
+        ))
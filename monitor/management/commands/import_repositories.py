@@ -0,0 +1,55 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from monitor.services.github.errors import GitHubAPIError
+from monitor.services.github.repositories import RepositoryImportService
+
+
+class Command(BaseCommand):
+    """
+    Management command to add repositories in bulk from a file with one "owner/name" (or GitHub URL)
+    per line. GitHub ids are resolved with one GraphQL query per --batch-size repositories.
+    """
+
+    help = "Import repositories from a file (use '-' for stdin), optionally activating them"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File with one 'owner/name' per line ('-' reads stdin)")
+        parser.add_argument("--activate", action="store_true", help="Activate the listed repositories")
+        parser.add_argument("--batch-size", type=int, default=50, help="Repositories per GraphQL query")
+
+    def handle(self, *args, **options):
+        """
+        Entry point for the management command.
+        """
+        if options["path"] == "-":
+            names, invalid = RepositoryImportService.parse_names(sys.stdin)
+        else:
+            with open(options["path"]) as lines:
+                names, invalid = RepositoryImportService.parse_names(lines)
+
+        for line in invalid:
+            self.stderr.write(f"✗ Not a repository name: {line}")
+        if not names:
+            raise CommandError("No repository names found.")
+
+        self.stdout.write(f"Importing {len(names)} repositories...")
+
+        try:
+            result = RepositoryImportService.import_repositories(
+                names, activate=options["activate"], batch_size=max(1, options["batch_size"])
+            )
+        except IntegrityError as exc:
+            raise CommandError(f"Nothing imported: {str(exc).splitlines()[0]}") from None
+        except GitHubAPIError as exc:
+            raise CommandError(f"Nothing imported: {exc}") from None
+
+        for name in result["unresolved"]:
+            self.stderr.write(f"✗ Not found on GitHub: {name}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {result['created']} created, {result['existing']} already present, {result['activated']} activated"
+            + (f", {result['conflicts']} skipped (slug taken)" if result["conflicts"] else "")
+        ))
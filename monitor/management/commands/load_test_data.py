@@ -4,6 +4,7 @@ from datetime import timedelta
 import random
 
 from monitor.models import Repository, EventType, Event
+from monitor.services.github.aggregates import EventAggregateService
 
 
 class Command(BaseCommand):
@@ -47,6 +48,9 @@ class Command(BaseCommand):
             for etype in EventType.objects.all():
                 self._create_random_events(repo, etype)
 
+        # Events were written directly, bring the materialized aggregates up to date
+        EventAggregateService.rebuild()
+
         self.stdout.write(self.style.SUCCESS("✓ Test data loaded."))
 
     @staticmethod
@@ -57,14 +61,11 @@ class Command(BaseCommand):
         now = timezone.now()
         num_events = random.randint(50, 150)
 
-        for _ in range(num_events):
-            delta = timedelta(minutes=random.randint(0, 60 * 24 * 7))
-            created_at = now - delta
-
-            # Ensure uniqueness per (repo, type, timestamp)
-            if not Event.objects.filter(repo=repo, event_type=event_type, created_at=created_at).exists():
-                Event.objects.create(
-                    repo=repo,
-                    event_type=event_type,
-                    created_at=created_at
-                )
+        # Ensure uniqueness per (repo, type, timestamp), then insert them in one batch
+        existing = set(Event.objects.filter(repo=repo, event_type=event_type).values_list("created_at", flat=True))
+        created_ats = {now - timedelta(minutes=random.randint(0, 60 * 24 * 7)) for _ in range(num_events)}
+
+        Event.objects.bulk_create([
+            Event(repo=repo, event_type=event_type, created_at=created_at)
+            for created_at in created_ats - existing
+        ])
@@ -0,0 +1,91 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from monitor.services.github import metrics
+from monitor.services.github.api import GitHubAPIClient
+from monitor.services.github.daemon import PollingDaemon
+from monitor.services.github.partitions import EventPartitionService
+from monitor.services.github.retention import EventRetentionService
+
+
+class Command(BaseCommand):
+    """
+    Management command that keeps polling active repositories in one long-running process.
+    Each repository is scheduled on its own adaptive cadence, expired events are pruned periodically;
+    with --metrics-port it serves Prometheus metrics of its polls and rate-limit quota;
+    SIGTERM/SIGINT stop it gracefully after the poll in progress.
+    """
+
+    help = "Continuously poll GitHub events for active repositories (adaptive per-repository cadence)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--min-interval", type=float, default=60,
+                            help="Shortest polling interval in seconds (GitHub's X-Poll-Interval wins if larger)")
+        parser.add_argument("--max-interval", type=float, default=900,
+                            help="Longest polling interval in seconds for quiet repositories")
+        parser.add_argument("--rate-limit-reserve", type=int, default=50,
+                            help="Pause until the rate-limit reset once this many requests remain")
+        parser.add_argument("--refresh-interval", type=float, default=60,
+                            help="How often to re-read the list of active repositories, in seconds")
+        parser.add_argument("--prune-interval", type=float, default=3600,
+                            help="Prune expired events (and create upcoming partitions) every N seconds (0 disables)")
+        parser.add_argument("--metrics-port", type=int, default=0,
+                            help="Serve Prometheus metrics at http://0.0.0.0:<port>/metrics (0 disables)")
+        parser.add_argument("--max-polls", type=int, default=None,
+                            help="Exit after this many polls (useful for testing)")
+
+    def handle(self, *args, **options):
+        """
+        Entry point for the management command.
+        """
+        client = GitHubAPIClient()
+        metrics.track_quota(client)
+        hooks = []
+        if options["prune_interval"]:
+            hooks.append((options["prune_interval"], self._prune))
+
+        daemon = PollingDaemon(
+            client=client,
+            min_interval=options["min_interval"],
+            max_interval=options["max_interval"],
+            rate_limit_reserve=options["rate_limit_reserve"],
+            refresh_interval=options["refresh_interval"],
+            hooks=hooks,
+            log=self.stdout.write,
+        )
+
+        def shutdown(signum, frame):
+            self.stdout.write(f"Received {signal.Signals(signum).name}, shutting down...")
+            daemon.stop()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+
+        self.stdout.write(
+            f"Polling active repositories (window: {settings.EVENT_DAYS_LIMIT} days / "
+            f"{settings.EVENT_FETCH_LIMIT} events per type)"
+        )
+        server = None
+        if options["metrics_port"]:
+            server = metrics.serve(options["metrics_port"])
+            self.stdout.write(f"Serving metrics on :{options['metrics_port']}/metrics")
+
+        try:
+            daemon.run(max_polls=options["max_polls"])
+        finally:
+            client.close()
+            if server:
+                server.shutdown()
+
+        self.stdout.write(self.style.SUCCESS(f"✓ Stopped after {daemon.polls} polls."))
+
+    def _prune(self):
+        # Partitions for upcoming events are created ahead of time when Event is partitioned
+        for name in EventPartitionService.create_partitions():
+            self.stdout.write(f"✓ Created partition {name}")
+
+        result = EventRetentionService.prune(log=self.stdout.write)
+        if result["pruned"]:
+            self.stdout.write(f"✓ Retention: {result['pruned']} events pruned in {result['seconds']:.2f}s")
@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from monitor.services.github.partitions import EventPartitionService
+from monitor.services.github.retention import EventRetentionService
+
+
+class Command(BaseCommand):
+    """
+    Management command to maintain the partitioned Event table: pre-creates upcoming partitions
+    and drops partitions that expired as a whole. Run it daily (e.g. from cron).
+    """
+
+    help = "Create upcoming Event partitions and drop expired ones (--convert partitions a plain table)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--convert", action="store_true",
+                            help="Convert a plain Event table into a partitioned one first")
+        parser.add_argument("--interval", choices=sorted(EventPartitionService.INTERVALS),
+                            default=settings.EVENT_PARTITION_INTERVAL or None,
+                            help="Partition size (default: EVENT_PARTITION_INTERVAL)")
+        parser.add_argument("--ahead", type=int, default=settings.EVENT_PARTITIONS_AHEAD,
+                            help="Days of partitions to create ahead of now")
+        parser.add_argument("--days", type=int, default=settings.EVENT_RETENTION_DAYS,
+                            help="Retention period in days")
+        parser.add_argument("--no-rollup", action="store_true", help="Drop without writing daily rollups")
+
+    def handle(self, *args, **options):
+        """
+        Entry point for the management command.
+        """
+        if options["days"] < settings.EVENT_DAYS_LIMIT:
+            raise CommandError(f"--days must be at least EVENT_DAYS_LIMIT ({settings.EVENT_DAYS_LIMIT})")
+
+        if options["convert"]:
+            if not options["interval"]:
+                raise CommandError("--convert needs --interval (or EVENT_PARTITION_INTERVAL)")
+            created = EventPartitionService.convert(options["interval"], options["ahead"])
+            self.stdout.write(f"✓ Event table partitioned by {options['interval']}")
+        elif not EventPartitionService.is_partitioned():
+            raise CommandError("Event table is not partitioned (use --convert)")
+        else:
+            created = EventPartitionService.create_partitions(options["interval"], options["ahead"])
+
+        for name in created:
+            self.stdout.write(f"✓ created partition {name}")
+
+        # Whole partitions only (no batches); prune_events also trims the partially expired one
+        result = EventRetentionService.prune(
+            days=options["days"], rollup=not options["no_rollup"], max_batches=0, log=self.stdout.write
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {len(created)} partitions created, {result['pruned']} expired events dropped, "
+            f"{len(EventPartitionService.partitions())} partitions in place"
+        ))
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from monitor.services.github.retention import EventRetentionService
+
+
+class Command(BaseCommand):
+    """
+    Management command to delete expired events in bounded batches.
+    Deleted rows are folded into daily per-(repo, type) rollups unless --no-rollup is given.
+    """
+
+    help = "Prune events older than the retention period (default: EVENT_RETENTION_DAYS)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=settings.EVENT_RETENTION_DAYS,
+                            help="Retention period in days")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Max rows deleted per batch")
+        parser.add_argument("--max-batches", type=int, default=None, help="Stop after this many batches")
+        parser.add_argument("--no-rollup", action="store_true", help="Delete without writing daily rollups")
+
+    def handle(self, *args, **options):
+        """
+        Entry point for the management command.
+        """
+        if options["days"] < settings.EVENT_DAYS_LIMIT:
+            raise CommandError(f"--days must be at least EVENT_DAYS_LIMIT ({settings.EVENT_DAYS_LIMIT})")
+
+        self.stdout.write(f"Pruning events older than {options['days']} days...")
+
+        result = EventRetentionService.prune(
+            days=options["days"],
+            batch_size=options["batch_size"],
+            rollup=not options["no_rollup"],
+            max_batches=options["max_batches"],
+            log=self.stdout.write,
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {result['pruned']} events pruned in {result['batches']} batches ({result['seconds']:.2f}s)"
+        ))
@@ -0,0 +1,43 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from monitor.services.github.profiling import QueryProfile
+
+logger = logging.getLogger("monitor.profiling")
+
+
+class QueryProfilingMiddleware:
+    """
+    Opt-in (QUERY_PROFILING=True) per-request query profiling: logs the query count, total database
+    time and slowest statements of every request to the "monitor.profiling" logger and, with DEBUG,
+    returns them in a Server-Timing header.
+
+    When disabled the middleware removes itself at startup, so it costs nothing. Queries of streamed
+    responses run after the view returns and are not included.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profile = QueryProfile(slowest=settings.QUERY_PROFILING_SLOWEST)
+        started = time.perf_counter()
+        with profile.record():
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        if settings.DEBUG:
+            response["Server-Timing"] = profile.server_timing(elapsed)
+
+        logger.info(
+            "%s %s: %d queries, %.2f ms in the database, %.2f ms total",
+            request.method, request.get_full_path(), profile.count, profile.seconds * 1000, elapsed * 1000,
+        )
+        for ms, sql in profile.slowest():
+            logger.debug("  %.2f ms: %s", ms, sql)
+        return response
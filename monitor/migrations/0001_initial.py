@@ -0,0 +1,54 @@
+# Generated by Django 5.1.7 on 2026-10-17 05:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventType',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(max_length=50, unique=True)),
+            ],
+            options={
+                'verbose_name': 'Event Type',
+                'verbose_name_plural': 'Event Types',
+            },
+        ),
+        migrations.CreateModel(
+            name='Repository',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('slug', models.SlugField(blank=True, max_length=255, unique=True)),
+                ('gh_repo_id', models.BigIntegerField(unique=True)),
+                ('active', models.BooleanField(default=True)),
+            ],
+            options={
+                'verbose_name': 'Repository',
+                'verbose_name_plural': 'Repositories',
+            },
+        ),
+        migrations.CreateModel(
+            name='Event',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+                ('event_type', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='monitor.eventtype')),
+                ('repo', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='monitor.repository')),
+            ],
+            options={
+                'verbose_name': 'Event',
+                'verbose_name_plural': 'Events',
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Adds the (repo, event_type, created_at DESC) unique index used by the analyzer and ingest
+    hot paths. The index is built CONCURRENTLY so the Event table stays writable, which is why
+    this migration is not atomic and the state change is applied separately from the SQL.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ('monitor', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddConstraint(
+                    model_name='event',
+                    constraint=models.UniqueConstraint(
+                        models.F('repo'), models.F('event_type'),
+                        models.OrderBy(models.F('created_at'), descending=True),
+                        name='event_repo_type_created_uniq',
+                    ),
+                ),
+            ],
+            database_operations=[
+                # Drop duplicates left over from before the constraint existed (keep the oldest row).
+                migrations.RunSQL(
+                    sql="""
+                        DELETE FROM monitor_event a
+                        USING monitor_event b
+                        WHERE a.repo_id = b.repo_id
+                          AND a.event_type_id = b.event_type_id
+                          AND a.created_at = b.created_at
+                          AND a.id > b.id
+                    """,
+                    reverse_sql=migrations.RunSQL.noop,
+                ),
+                migrations.RunSQL(
+                    sql="""
+                        CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS event_repo_type_created_uniq
+                        ON monitor_event (repo_id, event_type_id, created_at DESC)
+                    """,
+                    reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS event_repo_type_created_uniq",
+                ),
+            ],
+        ),
+    ]
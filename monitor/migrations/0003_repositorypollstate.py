@@ -0,0 +1,31 @@
+# Generated by Django 5.1.7 on 2026-10-17 06:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0002_event_repo_type_created_uniq'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RepositoryPollState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('etag', models.CharField(blank=True, max_length=255)),
+                ('last_event_id', models.BigIntegerField(blank=True, null=True)),
+                ('poll_interval', models.PositiveIntegerField(blank=True, null=True)),
+                ('last_polled_at', models.DateTimeField(blank=True, null=True)),
+                ('not_modified_count', models.PositiveBigIntegerField(default=0)),
+                ('modified_count', models.PositiveBigIntegerField(default=0)),
+                ('repo', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='poll_state', to='monitor.repository')),
+            ],
+            options={
+                'verbose_name': 'Repository Poll State',
+                'verbose_name_plural': 'Repository Poll States',
+            },
+        ),
+    ]
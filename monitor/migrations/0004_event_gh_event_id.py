@@ -0,0 +1,76 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Identifies events by GitHub's event id instead of (repo, event_type, created_at).
+
+    The timestamp uniqueness is relaxed to a plain index (distinct events can share a second) and a
+    nullable, unique gh_event_id column is added. Rows stored before this migration keep an empty id;
+    ingest falls back to timestamp matching for them until a repository has a recorded high-water mark.
+    Indexes are built CONCURRENTLY, hence the non-atomic migration.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ('monitor', '0003_repositorypollstate'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RemoveConstraint(
+                    model_name='event',
+                    name='event_repo_type_created_uniq',
+                ),
+                migrations.AddField(
+                    model_name='event',
+                    name='gh_event_id',
+                    field=models.BigIntegerField(blank=True, null=True),
+                ),
+                migrations.AddIndex(
+                    model_name='event',
+                    index=models.Index(fields=['repo', 'event_type', '-created_at'], name='event_repo_type_created_idx'),
+                ),
+                migrations.AddConstraint(
+                    model_name='event',
+                    constraint=models.UniqueConstraint(fields=('gh_event_id',), name='event_gh_event_id_uniq'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    sql="""
+                        CREATE INDEX CONCURRENTLY IF NOT EXISTS event_repo_type_created_idx
+                        ON monitor_event (repo_id, event_type_id, created_at DESC)
+                    """,
+                    reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS event_repo_type_created_idx",
+                ),
+                migrations.RunSQL(
+                    sql="DROP INDEX CONCURRENTLY IF EXISTS event_repo_type_created_uniq",
+                    reverse_sql="""
+                        CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS event_repo_type_created_uniq
+                        ON monitor_event (repo_id, event_type_id, created_at DESC)
+                    """,
+                ),
+                migrations.RunSQL(
+                    sql="ALTER TABLE monitor_event ADD COLUMN IF NOT EXISTS gh_event_id bigint NULL",
+                    reverse_sql="ALTER TABLE monitor_event DROP COLUMN IF EXISTS gh_event_id",
+                ),
+                migrations.RunSQL(
+                    sql="""
+                        CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS event_gh_event_id_uniq
+                        ON monitor_event (gh_event_id)
+                    """,
+                    reverse_sql=migrations.RunSQL.noop,
+                ),
+                migrations.RunSQL(
+                    sql="""
+                        ALTER TABLE monitor_event
+                        ADD CONSTRAINT event_gh_event_id_uniq UNIQUE USING INDEX event_gh_event_id_uniq
+                    """,
+                    reverse_sql="ALTER TABLE monitor_event DROP CONSTRAINT IF EXISTS event_gh_event_id_uniq",
+                ),
+            ],
+        ),
+    ]
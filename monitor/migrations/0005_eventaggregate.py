@@ -0,0 +1,76 @@
+# Generated by Django 5.1.7 on 2026-10-17 06:07
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils.timezone import now
+
+# Frozen copy of the rebuild at this schema (EventAggregateService may change later): every group's
+# counters and its default rolling window, which readers recompute once it slides.
+BACKFILL_SQL = """
+    WITH ranked AS (
+        SELECT repo_id, event_type_id, created_at,
+               ROW_NUMBER() OVER (
+                   PARTITION BY repo_id, event_type_id ORDER BY created_at DESC
+               ) AS rn
+        FROM {event_table}
+    )
+    INSERT INTO {aggregate_table} (
+        repo_id, event_type_id, event_count, first_event_at, last_event_at,
+        window_count, window_start, window_end, window_refreshed_at
+    )
+    SELECT repo_id, event_type_id, COUNT(*), MIN(created_at), MAX(created_at),
+           COUNT(*) FILTER (WHERE rn <= %(limit)s AND created_at >= %(cutoff)s),
+           MIN(created_at) FILTER (WHERE rn <= %(limit)s AND created_at >= %(cutoff)s),
+           MAX(created_at) FILTER (WHERE rn <= %(limit)s AND created_at >= %(cutoff)s),
+           %(refreshed_at)s
+    FROM ranked
+    GROUP BY repo_id, event_type_id
+"""
+
+
+def backfill_aggregates(apps, schema_editor):
+    # Stats are read from the aggregates (STATS_FROM_AGGREGATES), so existing events need theirs
+    refreshed_at = now()
+    sql = BACKFILL_SQL.format(
+        event_table=apps.get_model('monitor', 'Event')._meta.db_table,
+        aggregate_table=apps.get_model('monitor', 'EventAggregate')._meta.db_table,
+    )
+    schema_editor.execute(sql, {
+        'cutoff': refreshed_at - timedelta(days=settings.EVENT_DAYS_LIMIT),
+        'limit': settings.EVENT_FETCH_LIMIT,
+        'refreshed_at': refreshed_at,
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0004_event_gh_event_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_count', models.PositiveBigIntegerField(default=0)),
+                ('first_event_at', models.DateTimeField(blank=True, null=True)),
+                ('last_event_at', models.DateTimeField(blank=True, null=True)),
+                ('window_count', models.PositiveIntegerField(default=0)),
+                ('window_start', models.DateTimeField(blank=True, null=True)),
+                ('window_end', models.DateTimeField(blank=True, null=True)),
+                ('window_refreshed_at', models.DateTimeField(blank=True, null=True)),
+                ('event_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='monitor.eventtype')),
+                ('repo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='monitor.repository')),
+            ],
+            options={
+                'verbose_name': 'Event Aggregate',
+                'verbose_name_plural': 'Event Aggregates',
+                'constraints': [models.UniqueConstraint(fields=('repo', 'event_type'), name='event_aggregate_repo_type_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.7 on 2026-10-17 06:11
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False  # the BRIN index on Event is built CONCURRENTLY
+
+    dependencies = [
+        ('monitor', '0005_eventaggregate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('event_count', models.PositiveIntegerField(default=0)),
+                ('first_event_at', models.DateTimeField()),
+                ('last_event_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Event Daily Rollup',
+                'verbose_name_plural': 'Event Daily Rollups',
+                'ordering': ['day'],
+            },
+        ),
+        AddIndexConcurrently(
+            model_name='event',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['created_at'], name='event_created_brin'),
+        ),
+        migrations.AddField(
+            model_name='eventdailyrollup',
+            name='event_type',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='monitor.eventtype'),
+        ),
+        migrations.AddField(
+            model_name='eventdailyrollup',
+            name='repo',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='monitor.repository'),
+        ),
+        migrations.AddConstraint(
+            model_name='eventdailyrollup',
+            constraint=models.UniqueConstraint(fields=('repo', 'event_type', 'day'), name='event_rollup_repo_type_day_uniq'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.db import migrations
+
+from monitor.migrations import _partitioning
+
+PARTITIONS_AHEAD = 7  # days; later ones are created by partition_events and the daemon
+
+
+def partition_events(apps, schema_editor):
+    # The documented opt-in ("set EVENT_PARTITION_INTERVAL before migrating") is the only setting read
+    if settings.EVENT_PARTITION_INTERVAL:
+        table = apps.get_model('monitor', 'Event')._meta.db_table
+        _partitioning.convert(table, settings.EVENT_PARTITION_INTERVAL, PARTITIONS_AHEAD)
+
+
+def unpartition_events(apps, schema_editor):
+    _partitioning.unpartition(apps.get_model('monitor', 'Event'), schema_editor)
+
+
+class Migration(migrations.Migration):
+    """
+    Optionally converts Event into a table range-partitioned on created_at.
+
+    Only runs when EVENT_PARTITION_INTERVAL is set ("day" or "week"); otherwise it is a no-op and
+    the table can be converted later with `manage.py partition_events --convert`. The model state
+    is unchanged: on the partitioned table the primary key and the gh_event_id unique constraint
+    also include created_at, as PostgreSQL requires. Non-atomic, so those keys can be built
+    concurrently before the table is locked. The DDL is in _partitioning, which must not change.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ('monitor', '0006_eventdailyrollup_event_created_brin'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_events, unpartition_events),
+    ]
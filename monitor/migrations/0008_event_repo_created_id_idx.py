@@ -0,0 +1,39 @@
+from django.db import migrations, models
+
+from monitor.migrations import _partitioning
+
+
+def create_index(apps, schema_editor):
+    table = apps.get_model('monitor', 'Event')._meta.db_table
+    _partitioning.create_index(table, 'event_repo_created_id_idx', '(repo_id, created_at, id)')
+
+
+def drop_index(apps, schema_editor):
+    _partitioning.drop_index(apps.get_model('monitor', 'Event')._meta.db_table, 'event_repo_created_id_idx')
+
+
+class Migration(migrations.Migration):
+    """
+    Adds the (repo, created_at, id) index used by keyset pagination of the event export.
+    Built CONCURRENTLY (per partition when Event is partitioned), hence the non-atomic migration.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ('monitor', '0007_event_partitioning'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='event',
+                    index=models.Index(fields=['repo', 'created_at', 'id'], name='event_repo_created_id_idx'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(create_index, drop_index),
+            ],
+        ),
+    ]
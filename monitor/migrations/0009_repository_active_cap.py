@@ -0,0 +1,63 @@
+from django.db import migrations
+
+# Statement-level, so a bulk activation counts once. The advisory lock serializes activations:
+# the count runs on a fresh snapshot after the lock, so concurrent transactions cannot both pass.
+CREATE_SQL = """
+CREATE FUNCTION monitor_repository_active_cap() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    max_active integer := nullif(current_setting('monitor.max_active_repositories', true), '')::integer;
+    active_count integer;
+BEGIN
+    IF coalesce(max_active, 0) <= 0 THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'INSERT' THEN
+        PERFORM 1 FROM new_rows WHERE active LIMIT 1;
+    ELSE
+        PERFORM 1 FROM new_rows n JOIN old_rows o ON o.id = n.id WHERE n.active AND NOT o.active LIMIT 1;
+    END IF;
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+
+    PERFORM pg_advisory_xact_lock(hashtext('monitor_repository_active_cap'));
+    SELECT count(*) INTO active_count FROM monitor_repository WHERE active;
+
+    IF active_count > max_active THEN
+        RAISE EXCEPTION 'Only up to % active repositories are allowed (% would be active).', max_active, active_count
+            USING ERRCODE = 'check_violation';
+    END IF;
+    RETURN NULL;
+END
+$$;
+
+CREATE TRIGGER monitor_repository_active_cap_insert
+    AFTER INSERT ON monitor_repository REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION monitor_repository_active_cap();
+
+CREATE TRIGGER monitor_repository_active_cap_update
+    AFTER UPDATE ON monitor_repository REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION monitor_repository_active_cap();
+"""
+
+DROP_SQL = """
+DROP TRIGGER IF EXISTS monitor_repository_active_cap_update ON monitor_repository;
+DROP TRIGGER IF EXISTS monitor_repository_active_cap_insert ON monitor_repository;
+DROP FUNCTION IF EXISTS monitor_repository_active_cap();
+"""
+
+
+class Migration(migrations.Migration):
+    """
+    Enforces settings.MAX_ACTIVE_REPOSITORIES in the database (passed to every connection as
+    the monitor.max_active_repositories setting; connections without it are not limited).
+    """
+
+    dependencies = [
+        ('monitor', '0008_event_repo_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SQL, DROP_SQL),
+    ]
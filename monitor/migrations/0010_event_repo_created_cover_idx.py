@@ -0,0 +1,49 @@
+from django.db import migrations, models
+
+from monitor.migrations import _partitioning
+
+COLUMNS = '(repo_id, created_at, id)'
+
+
+def create_index(apps, schema_editor):
+    table = apps.get_model('monitor', 'Event')._meta.db_table
+    _partitioning.create_index(table, 'event_repo_created_cover_idx', f'{COLUMNS} INCLUDE (event_type_id, gh_event_id)')
+    _partitioning.drop_index(table, 'event_repo_created_id_idx')
+
+
+def restore_index(apps, schema_editor):
+    table = apps.get_model('monitor', 'Event')._meta.db_table
+    _partitioning.create_index(table, 'event_repo_created_id_idx', COLUMNS)
+    _partitioning.drop_index(table, 'event_repo_created_cover_idx')
+
+
+class Migration(migrations.Migration):
+    """
+    Replaces the export's (repo, created_at, id) index with one that also carries event_type_id
+    and gh_event_id, so the export and the ingest duplicate lookup are index-only scans.
+    The new index is built CONCURRENTLY before the old one is dropped, hence the non-atomic migration.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ('monitor', '0009_repository_active_cap'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RemoveIndex(model_name='event', name='event_repo_created_id_idx'),
+                migrations.AddIndex(
+                    model_name='event',
+                    index=models.Index(
+                        fields=['repo', 'created_at', 'id'], include=['event_type', 'gh_event_id'],
+                        name='event_repo_created_cover_idx',
+                    ),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(create_index, restore_index),
+            ],
+        ),
+    ]
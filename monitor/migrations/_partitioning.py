@@ -0,0 +1,325 @@
+"""
+DDL of the range-partitioned Event layout, used by migrations 0007, 0008 and 0010 and wrapped
+by EventPartitionService.
+
+Migrations replay these functions on every new database for as long as they exist, so the
+functions take everything they act on as arguments (the historical table name or model, the
+interval) and never read the live models or settings, and their behavior must not change.
+A different layout needs new functions and a new migration; live-only behavior belongs in
+EventPartitionService. The leading underscore keeps Django from loading this module as a migration.
+"""
+import re
+from datetime import datetime, time as dt_time, timedelta, timezone
+
+from django.db import connection, transaction
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import now
+
+INTERVALS = {
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+}
+
+# e.g. "FOR VALUES FROM ('2026-10-17 00:00:00+00') TO ('2026-10-18 00:00:00+00')"
+BOUND_RE = re.compile(r"FROM \((?P<lower>.+?)\) TO \((?P<upper>.+?)\)")
+
+
+def default_partition(table):
+    return f"{table}_default"
+
+
+def is_partitioned(table, cursor=None):
+    """Checks whether <table> is currently partitioned."""
+    sql = "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s))"
+
+    if cursor is None:
+        with connection.cursor() as cursor:
+            return is_partitioned(table, cursor)
+
+    cursor.execute(sql, [table])
+    return cursor.fetchone()[0]
+
+
+def interval_start(moment, interval):
+    """Returns the UTC start of the day (or ISO week) containing <moment>."""
+    day = moment.astimezone(timezone.utc).date()
+    if interval == "week":
+        day -= timedelta(days=day.weekday())
+    return datetime.combine(day, dt_time.min, tzinfo=timezone.utc)
+
+
+def partitions(table, cursor=None):
+    """
+    Returns the range partitions of <table> ordered by bound.
+
+    Returns:
+        list: (name, lower, upper) tuples; lower is None for the partition holding all
+        history before conversion. The DEFAULT partition is not included.
+    """
+    sql = """
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(%s)
+    """
+
+    if cursor is None:
+        with connection.cursor() as cursor:
+            return partitions(table, cursor)
+
+    cursor.execute(sql, [table])
+    result = []
+
+    for name, bound in cursor.fetchall():
+        match = BOUND_RE.search(bound)
+        if not match:  # DEFAULT
+            continue
+        lower, upper = (
+            None if value == "MINVALUE" else parse_datetime(value.strip("'"))
+            for value in (match["lower"], match["upper"])
+        )
+        result.append((name, lower, upper))
+
+    return sorted(result, key=lambda part: part[2])
+
+
+def convert(table, interval, ahead):
+    """
+    Converts the plain <table> into one partitioned by <interval> on created_at and pre-creates
+    partitions <ahead> days ahead.
+
+    The existing table becomes the first partition (everything before the first interval boundary),
+    so no rows are copied. Runs in one transaction holding an exclusive lock on the table. Existing
+    indexes are reused, and so are the unique indexes of the primary/unique keys widened by
+    created_at, built without blocking writes before the lock is taken. Inside an outer transaction
+    (where indexes cannot be built concurrently) the keys are built under the lock instead.
+
+    Returns:
+        list: Names of the partitions created ahead.
+    """
+    if interval not in INTERVALS:
+        raise ValueError(f"Unknown partition interval: {interval!r}")
+
+    legacy = f"{table}_legacy"
+
+    prebuilt = {}
+    if not connection.in_atomic_block and not is_partitioned(table):
+        prebuilt = _build_widened_keys(table, legacy)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if is_partitioned(table, cursor):
+            return create_partitions(table, interval, ahead)
+
+        cursor.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+        cursor.execute(f"SELECT MAX(id), MAX(created_at) FROM {table}")
+        max_id, max_created_at = cursor.fetchone()
+
+        # The historical partition ends at the first interval boundary after every stored row
+        boundary = interval_start(max(max_created_at or now(), now()), interval) + INTERVALS[interval]
+
+        # Definitions to recreate on the parent: plain indexes verbatim, keys widened by created_at
+        cursor.execute(
+            """
+            SELECT indexrelid::regclass::text, pg_get_indexdef(indexrelid)
+            FROM pg_index WHERE indrelid = to_regclass(%s) AND NOT indisunique
+            """,
+            [table],
+        )
+        indexes = cursor.fetchall()
+        keys = _keys(table, cursor)
+
+        cursor.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+        for name, _ in indexes:
+            cursor.execute(f"ALTER INDEX {name} RENAME TO {name[:56]}_legacy")
+        for name, contype, _ in keys:
+            cursor.execute(f"ALTER TABLE {legacy} DROP CONSTRAINT {name}")
+            if name in prebuilt:
+                # Only an index backing a constraint can be attached to the parent's key
+                kind = "PRIMARY KEY" if contype == "p" else "UNIQUE"
+                cursor.execute(f"ALTER TABLE {legacy} ADD {kind} USING INDEX {prebuilt[name]}")
+        cursor.execute(f"ALTER TABLE {legacy} ALTER COLUMN id DROP IDENTITY IF EXISTS")
+
+        cursor.execute(f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)")
+        cursor.execute(f"CREATE SEQUENCE {table}_id_seq OWNED BY {table}.id")
+        cursor.execute(f"SELECT setval('{table}_id_seq', %s, %s)", [max_id or 1, max_id is not None])
+        cursor.execute(f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval('{table}_id_seq')")
+
+        for name, contype, columns in keys:
+            columns = columns if "created_at" in columns else [*columns, "created_at"]
+            kind = "PRIMARY KEY" if contype == "p" else "UNIQUE"
+            cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {kind} ({', '.join(columns)})")
+        for _, definition in indexes:
+            cursor.execute(definition)
+        cursor.execute(
+            """
+            SELECT conname, pg_get_constraintdef(oid)
+            FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype = 'f'
+            """,
+            [legacy],
+        )
+        for name, definition in cursor.fetchall():
+            cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+
+        # Attaching reuses the prebuilt unique indexes for the parent's keys
+        cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {legacy} FOR VALUES FROM (MINVALUE) TO (%s)", [boundary])
+        cursor.execute(f"CREATE TABLE {default_partition(table)} PARTITION OF {table} DEFAULT")
+
+        return create_partitions(table, interval, ahead)
+
+
+def _keys(table, cursor):
+    """Returns (name, type, columns) of the primary and unique key constraints of <table>."""
+    cursor.execute(
+        """
+        SELECT conname, contype, ARRAY(
+            SELECT attname FROM unnest(conkey) WITH ORDINALITY k(attnum, n)
+            JOIN pg_attribute a ON a.attrelid = conrelid AND a.attnum = k.attnum
+            ORDER BY n
+        )
+        FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype IN ('p', 'u')
+        """,
+        [table],
+    )
+    return cursor.fetchall()
+
+
+def _build_widened_keys(table, legacy):
+    """
+    Builds CONCURRENTLY, on the plain <table>, a unique index for each primary/unique key widened
+    by created_at, so that attaching the table as a partition need not build them under its
+    exclusive lock. Must run outside a transaction. An invalid leftover of an interrupted build
+    is dropped and rebuilt.
+
+    Returns:
+        dict: Index name per key constraint name.
+    """
+    built = {}
+
+    with connection.cursor() as cursor:
+        for key, _, columns in _keys(table, cursor):
+            if "created_at" in columns:
+                continue
+            name = f"{legacy}_{'_'.join(columns)}_created_at_key"[:63]
+            cursor.execute("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)", [name])
+            row = cursor.fetchone()
+            if row and not row[0]:
+                cursor.execute(f"DROP INDEX CONCURRENTLY {name}")
+            if not row or not row[0]:
+                cursor.execute(f"CREATE UNIQUE INDEX CONCURRENTLY {name} ON {table} ({', '.join(columns)}, created_at)")
+            built[key] = name
+
+    return built
+
+
+def create_partitions(table, interval, ahead):
+    """
+    Pre-creates partitions of <table> up to <ahead> days from now (no-op for a plain table).
+
+    Each partition is created as a standalone table, filled with any matching rows from the
+    DEFAULT partition and attached, which only takes a light lock on the parent.
+
+    Returns:
+        list: Names of the partitions created.
+    """
+    default = default_partition(table)
+    created = []
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if not is_partitioned(table, cursor):
+            return created
+
+        existing = partitions(table, cursor)
+        start = existing[-1][2] if existing else interval_start(now(), interval)
+        horizon = now() + timedelta(days=ahead)
+
+        while start < horizon:
+            end = interval_start(start, interval) + INTERVALS[interval]
+            name = f"{table}_p{start:%Y%m%d}"
+
+            cursor.execute(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)")
+            cursor.execute(
+                f"""
+                WITH moved AS (
+                    DELETE FROM {default} WHERE created_at >= %(start)s AND created_at < %(end)s RETURNING *
+                )
+                INSERT INTO {name} SELECT * FROM moved
+                """,
+                {"start": start, "end": end},
+            )
+            cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)", [start, end])
+
+            created.append(name)
+            start = end
+
+    return created
+
+
+def create_index(table, name, definition):
+    """
+    Builds an index on <table> without blocking writes; must run outside a transaction.
+
+    A plain table gets CREATE INDEX CONCURRENTLY. PostgreSQL cannot build a partitioned index
+    concurrently, so on a partitioned table the index is created ON ONLY the parent and every
+    partition's index is built concurrently and attached.
+
+    Args:
+        table (str): Table name.
+        name (str): Index name.
+        definition (str): Columns and method, e.g. "(repo_id, created_at, id)".
+    """
+    with connection.cursor() as cursor:
+        if not is_partitioned(table, cursor):
+            cursor.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} {definition}")
+            return
+
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY {table} {definition}")
+        cursor.execute("SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = to_regclass(%s)", [name])
+        attached = {child for (child,) in cursor.fetchall()}
+        cursor.execute("SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = to_regclass(%s)", [table])
+
+        for (partition,) in cursor.fetchall():
+            child = f"{partition}_{name}"[-63:]
+            if child in attached:
+                continue
+            cursor.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {child} ON {partition} {definition}")
+            cursor.execute(f"ALTER INDEX {name} ATTACH PARTITION {child}")
+
+
+def drop_index(table, name):
+    """Drops an index created by create_index() (concurrently on a plain table)."""
+    concurrently = "" if is_partitioned(table) else "CONCURRENTLY"
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP INDEX {concurrently} IF EXISTS {name}")
+
+
+def unpartition(model, schema_editor=None):
+    """
+    Copies the partitioned table of <model> back into a plain table built from <model>
+    (the historical model when called from a migration).
+    """
+    table = model._meta.db_table
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if not is_partitioned(table, cursor):
+            return
+
+        cursor.execute(f"ALTER TABLE {table} RENAME TO {table}_partitioned")
+        cursor.execute(f"ALTER SEQUENCE {table}_id_seq RENAME TO {table}_partitioned_id_seq")
+        cursor.execute(
+            "SELECT indexrelid::regclass::text FROM pg_index WHERE indrelid = to_regclass(%s)",
+            [f"{table}_partitioned"],
+        )
+        for (name,) in cursor.fetchall():
+            cursor.execute(f"ALTER INDEX {name} RENAME TO {name[:52]}_partitioned")
+
+        if schema_editor:
+            schema_editor.create_model(model)
+        else:
+            with connection.schema_editor(atomic=False) as editor:
+                editor.create_model(model)
+
+        columns = ", ".join(field.column for field in model._meta.concrete_fields)
+        cursor.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {table}_partitioned")
+        cursor.execute(f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX(id), 1)) FROM {table}", [table])
+        cursor.execute(f"DROP TABLE {table}_partitioned CASCADE")
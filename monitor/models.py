@@ -1,3 +1,5 @@
+from django.conf import settings
+from django.contrib.postgres.indexes import BrinIndex
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils.text import slugify
@@ -16,24 +18,33 @@ class Repository(models.Model):
     gh_repo_id = models.BigIntegerField(unique=True)
     active = models.BooleanField(default=True)
 
+    # Whether the row is active in the database, so clean() can tell an activation without refetching it
+    _stored_active = False
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
         super().save(*args, **kwargs)
+        self._stored_active = self.active
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if "active" in field_names:
+            instance._stored_active = values[field_names.index("active")]
+        return instance
 
     def clean(self):
         """
-        Enforce a maximum of 5 active repositories.
-        This is validated on both creation and activation.
+        Enforce a maximum of settings.MAX_ACTIVE_REPOSITORIES active repositories (0: no limit).
+        Only an activation costs a query; the monitor_repository_active_cap trigger enforces the
+        cap for every write, including bulk updates and concurrent activations.
         """
-        if not self.pk:  # New instance
-            if self.active and Repository.objects.filter(active=True).count() >= 5:
-                raise ValidationError("Only up to 5 active repositories are allowed.")
-        else:  # Instance update
-            previous = Repository.objects.get(pk=self.pk)
-            if not previous.active and self.active:  # Was not active and now is
-                if Repository.objects.filter(active=True).count() >= 5:
-                    raise ValidationError("Only up to 5 active repositories are allowed.")
+        max_active = settings.MAX_ACTIVE_REPOSITORIES
+
+        if max_active and self.active and not self._stored_active:
+            if Repository.objects.filter(active=True).count() >= max_active:
+                raise ValidationError(f"Only up to {max_active} active repositories are allowed.")
 
     def __str__(self):
         return self.name
@@ -43,6 +54,35 @@ class Repository(models.Model):
         verbose_name_plural = 'Repositories'
 
 
+class RepositoryPollState(models.Model):
+    """
+    GitHub polling state of a repository, used for conditional requests.
+
+    Fields:
+    - repo: Repository the state belongs to
+    - etag: ETag of the last successful response for the first events page
+    - last_event_id: GitHub id of the newest event seen
+    - poll_interval: X-Poll-Interval advertised by GitHub, in seconds
+    - last_polled_at: When the repository was last polled
+    - not_modified_count: Number of 304 responses (served from ETag, free of rate limit)
+    - modified_count: Number of 200 responses for the first events page
+    """
+    repo = models.OneToOneField(Repository, on_delete=models.CASCADE, related_name='poll_state')
+    etag = models.CharField(max_length=255, blank=True)
+    last_event_id = models.BigIntegerField(null=True, blank=True)
+    poll_interval = models.PositiveIntegerField(null=True, blank=True)
+    last_polled_at = models.DateTimeField(null=True, blank=True)
+    not_modified_count = models.PositiveBigIntegerField(default=0)
+    modified_count = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Poll state of {self.repo}"
+
+    class Meta:
+        verbose_name = 'Repository Poll State'
+        verbose_name_plural = 'Repository Poll States'
+
+
 class EventType(models.Model):
     """
     Represents a distinct GitHub event type.
@@ -66,10 +106,12 @@ class Event(models.Model):
     - event_type: FK to EventType
     - repo: FK to Repository
     - created_at: Original event timestamp from GitHub
+    - gh_event_id: GitHub's event id (empty for events stored before ids were recorded)
     """
     event_type = models.ForeignKey(EventType, on_delete=models.PROTECT)
     repo = models.ForeignKey(Repository, on_delete=models.PROTECT)
     created_at = models.DateTimeField()  # timestamp from GitHub
+    gh_event_id = models.BigIntegerField(null=True, blank=True)
 
     def __str__(self):
         return f"{self.event_type} at {self.created_at}"
@@ -78,3 +120,86 @@ class Event(models.Model):
         ordering = ['created_at']
         verbose_name = 'Event'
         verbose_name_plural = 'Events'
+        indexes = [
+            # Ordered newest-first and covers every column the analyzer and ingest queries read.
+            models.Index(fields=['repo', 'event_type', '-created_at'], name='event_repo_type_created_idx'),
+            # Tiny block-range index for time-based retention of the append-mostly table.
+            BrinIndex(fields=['created_at'], name='event_created_brin'),
+            # Keyset order of the raw event export: one repository over a time range. Carries the
+            # remaining columns, so the export and the ingest duplicate lookup read only the index.
+            models.Index(
+                fields=['repo', 'created_at', 'id'], include=['event_type', 'gh_event_id'],
+                name='event_repo_created_cover_idx',
+            ),
+        ]
+        constraints = [
+            # An event is identified by its GitHub id; distinct events may share a timestamp.
+            models.UniqueConstraint(fields=['gh_event_id'], name='event_gh_event_id_uniq'),
+        ]
+
+
+class EventAggregate(models.Model):
+    """
+    Materialized statistics of a (repository, event_type) group, maintained at ingest time.
+
+    The window fields describe the default rolling window (EVENT_DAYS_LIMIT days, at most
+    EVENT_FETCH_LIMIT newest events) as of window_refreshed_at. Its average interval is
+    (window_end - window_start) / (window_count - 1).
+
+    Fields:
+    - repo / event_type: the group
+    - event_count: number of stored events
+    - first_event_at / last_event_at: oldest / newest stored event timestamp
+    - window_count: number of events in the rolling window
+    - window_start / window_end: oldest / newest event timestamp in the rolling window
+    - window_refreshed_at: when the window fields were last recomputed
+    """
+    repo = models.ForeignKey(Repository, on_delete=models.CASCADE)
+    event_type = models.ForeignKey(EventType, on_delete=models.CASCADE)
+    event_count = models.PositiveBigIntegerField(default=0)
+    first_event_at = models.DateTimeField(null=True, blank=True)
+    last_event_at = models.DateTimeField(null=True, blank=True)
+    window_count = models.PositiveIntegerField(default=0)
+    window_start = models.DateTimeField(null=True, blank=True)
+    window_end = models.DateTimeField(null=True, blank=True)
+    window_refreshed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.repo} / {self.event_type}: {self.event_count} events"
+
+    class Meta:
+        verbose_name = 'Event Aggregate'
+        verbose_name_plural = 'Event Aggregates'
+        constraints = [
+            models.UniqueConstraint(fields=['repo', 'event_type'], name='event_aggregate_repo_type_uniq'),
+        ]
+
+
+class EventDailyRollup(models.Model):
+    """
+    Daily summary of pruned events per (repository, event_type), written by retention
+    before expired Event rows are deleted.
+
+    Fields:
+    - repo / event_type: the group
+    - day: UTC calendar day of the events
+    - event_count: number of events of that day
+    - first_event_at / last_event_at: oldest / newest event timestamp of that day
+    """
+    repo = models.ForeignKey(Repository, on_delete=models.CASCADE)
+    event_type = models.ForeignKey(EventType, on_delete=models.CASCADE)
+    day = models.DateField()
+    event_count = models.PositiveIntegerField(default=0)
+    first_event_at = models.DateTimeField()
+    last_event_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.repo} / {self.event_type} on {self.day}: {self.event_count} events"
+
+    class Meta:
+        ordering = ['day']
+        verbose_name = 'Event Daily Rollup'
+        verbose_name_plural = 'Event Daily Rollups'
+        constraints = [
+            models.UniqueConstraint(fields=['repo', 'event_type', 'day'], name='event_rollup_repo_type_day_uniq'),
+        ]
@@ -0,0 +1,37 @@
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Newline-delimited JSON (one object per line). Streaming views write their rows themselves;
+    this renders regular responses such as errors.
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        rows = data if isinstance(data, list) else [data]
+        return "".join(json.dumps(row) + "\n" for row in rows).encode(self.charset)
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Comma-separated values. Streaming views write their rows themselves; this renders
+    regular responses such as errors as "field,value" lines.
+    """
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        rows = data.items() if isinstance(data, dict) else enumerate(data)
+        return "".join(f"{key},{json.dumps(value)}\n" for key, value in rows).encode(self.charset)
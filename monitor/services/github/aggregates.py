@@ -0,0 +1,207 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.timezone import now
+
+from monitor.models import Event, EventAggregate
+from monitor.services.github.cache import StatsCache
+
+
+class EventAggregateService:
+    """
+    Maintains the EventAggregate table: per (repository, event_type) counters and the
+    bookkeeping of the default rolling window, so stats can be answered from O(groups) rows.
+    Every change also invalidates the cached stats responses.
+    """
+
+    # Adds a page of new events to the group counters.
+    UPSERT_SQL = """
+        INSERT INTO {table} (repo_id, event_type_id, event_count, first_event_at, last_event_at, window_count)
+        VALUES {values}
+        ON CONFLICT (repo_id, event_type_id) DO UPDATE SET
+            event_count = {table}.event_count + EXCLUDED.event_count,
+            first_event_at = LEAST({table}.first_event_at, EXCLUDED.first_event_at),
+            last_event_at = GREATEST({table}.last_event_at, EXCLUDED.last_event_at)
+    """
+
+    # Recomputes the window of the given groups. The newest-first index bounds the scan
+    # to the rows inside the window.
+    REFRESH_WINDOWS_SQL = """
+        WITH ranked AS (
+            SELECT repo_id, event_type_id, created_at,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY repo_id, event_type_id ORDER BY created_at DESC
+                   ) AS rn
+            FROM {event_table}
+            WHERE repo_id = %(repo_id)s AND event_type_id = ANY(%(event_type_ids)s)
+              AND created_at >= %(cutoff)s
+        ),
+        windows AS (
+            SELECT repo_id, event_type_id, COUNT(*) AS n, MIN(created_at) AS w_start, MAX(created_at) AS w_end
+            FROM ranked
+            WHERE rn <= %(limit)s
+            GROUP BY repo_id, event_type_id
+        )
+        UPDATE {table} a SET
+            window_count = COALESCE(w.n, 0),
+            window_start = w.w_start,
+            window_end = w.w_end,
+            window_refreshed_at = %(refreshed_at)s
+        FROM {table} g
+        LEFT JOIN windows w ON w.repo_id = g.repo_id AND w.event_type_id = g.event_type_id
+        WHERE a.id = g.id AND g.repo_id = %(repo_id)s AND g.event_type_id = ANY(%(event_type_ids)s)
+    """
+
+    # Full recomputation from Event, used to rebuild the table and to check it.
+    COMPUTE_SQL = """
+        WITH ranked AS (
+            SELECT repo_id, event_type_id, created_at,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY repo_id, event_type_id ORDER BY created_at DESC
+                   ) AS rn
+            FROM {event_table}
+        )
+        SELECT repo_id, event_type_id, COUNT(*), MIN(created_at), MAX(created_at),
+               COUNT(*) FILTER (WHERE rn <= %(limit)s AND created_at >= %(cutoff)s),
+               MIN(created_at) FILTER (WHERE rn <= %(limit)s AND created_at >= %(cutoff)s),
+               MAX(created_at) FILTER (WHERE rn <= %(limit)s AND created_at >= %(cutoff)s)
+        FROM ranked
+        GROUP BY repo_id, event_type_id
+    """
+
+    FIELDS = (
+        "event_count", "first_event_at", "last_event_at", "window_count", "window_start", "window_end",
+    )
+
+    @staticmethod
+    def window_params():
+        """Returns the cutoff and limit of the default rolling window."""
+        refreshed_at = now()
+        return {
+            "cutoff": refreshed_at - timedelta(days=settings.EVENT_DAYS_LIMIT),
+            "limit": settings.EVENT_FETCH_LIMIT,
+            "refreshed_at": refreshed_at,
+        }
+
+    @staticmethod
+    def apply_new_events(repo, events):
+        """
+        Folds newly saved events of one repository into their groups: counters are
+        incremented and the rolling windows of the touched groups are refreshed.
+        """
+        if not events:
+            return
+
+        groups = {}
+        for event in events:
+            count, first, last = groups.get(event.event_type_id, (0, event.created_at, event.created_at))
+            groups[event.event_type_id] = (count + 1, min(first, event.created_at), max(last, event.created_at))
+
+        values, params = [], []
+        for event_type_id, (count, first, last) in groups.items():
+            values.append("(%s, %s, %s, %s, %s, 0)")
+            params.extend([repo.pk, event_type_id, count, first, last])
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                EventAggregateService.UPSERT_SQL.format(table=EventAggregate._meta.db_table, values=", ".join(values)),
+                params,
+            )
+            EventAggregateService.refresh_windows(repo, list(groups), cursor=cursor)
+
+        StatsCache.bump()
+
+    @staticmethod
+    def refresh_windows(repo, event_type_ids, cursor=None):
+        """
+        Recomputes the rolling window of the given (repo, event_type) groups.
+        """
+        sql = EventAggregateService.REFRESH_WINDOWS_SQL.format(
+            table=EventAggregate._meta.db_table, event_table=Event._meta.db_table
+        )
+        params = {"repo_id": repo.pk, "event_type_ids": list(event_type_ids), **EventAggregateService.window_params()}
+
+        if cursor:
+            cursor.execute(sql, params)
+        else:
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+
+    @staticmethod
+    def compute():
+        """
+        Computes every group's aggregate from the Event table.
+
+        Returns:
+            dict: Field values keyed by (repo_id, event_type_id).
+        """
+        params = EventAggregateService.window_params()
+
+        with connection.cursor() as cursor:
+            cursor.execute(EventAggregateService.COMPUTE_SQL.format(event_table=Event._meta.db_table), params)
+            return {
+                (repo_id, event_type_id): dict(zip(EventAggregateService.FIELDS, values))
+                for repo_id, event_type_id, *values in cursor.fetchall()
+            }
+
+    @staticmethod
+    def rebuild():
+        """
+        Replaces the whole table with aggregates recomputed from Event.
+
+        Returns:
+            int: Number of groups written.
+        """
+        expected = EventAggregateService.compute()
+        refreshed_at = now()
+
+        with transaction.atomic():
+            EventAggregate.objects.all().delete()
+            EventAggregate.objects.bulk_create(
+                [
+                    EventAggregate(
+                        repo_id=repo_id, event_type_id=event_type_id, window_refreshed_at=refreshed_at, **fields
+                    )
+                    for (repo_id, event_type_id), fields in expected.items()
+                ],
+                batch_size=1000,
+            )
+            StatsCache.bump()
+
+        return len(expected)
+
+    @staticmethod
+    def diff():
+        """
+        Compares the stored aggregates with a fresh computation from Event.
+
+        A stored window that has partly slid out of the rolling window is stale rather than wrong
+        (readers recompute it), so window fields are only compared for windows still in range.
+
+        Returns:
+            list: (repo_id, event_type_id, field, stored value, expected value) tuples.
+        """
+        expected = EventAggregateService.compute()
+        cutoff = EventAggregateService.window_params()["cutoff"]
+        stored = {
+            (row["repo_id"], row["event_type_id"]): row
+            for row in EventAggregate.objects.values("repo_id", "event_type_id", *EventAggregateService.FIELDS)
+        }
+        mismatches = []
+
+        for key in sorted(expected.keys() | stored.keys()):
+            want, have = expected.get(key), stored.get(key)
+
+            if want is None or have is None:
+                mismatches.append((*key, "row", "present" if have else "missing", "present" if want else "missing"))
+                continue
+
+            window_valid = have["window_start"] is not None and have["window_start"] >= cutoff
+            for field in EventAggregateService.FIELDS:
+                if field.startswith("window_") and not window_valid:
+                    continue
+                if have[field] != want[field]:
+                    mismatches.append((*key, field, have[field], want[field]))
+
+        return mismatches
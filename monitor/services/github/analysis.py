@@ -1,9 +1,14 @@
+import re
+from itertools import chain
+
 import numpy as np
+from django.db import connection
 from django.utils.timezone import now
 from datetime import timedelta
 from django.conf import settings
 
-from monitor.models import Repository, Event, EventType
+from monitor.models import Repository, Event, EventAggregate, EventType
+from monitor.services.github.metrics import STATS_GROUPS
 
 
 class Analyzer:
@@ -14,16 +19,474 @@ class Analyzer:
     Values are read from settings (EVENT_FETCH_DAYS and EVENT_FETCH_LIMIT) or passed explicitly.
     """
 
-    def __init__(self, days=None, limit=None):
+    # Opt-in statistics (the `metrics` query parameter), all computed in one batch pass
+    DURATION_METRICS = ("median", "p90", "p99", "min", "max")
+    METRICS = DURATION_METRICS + ("cv", "rate")
+
+    WINDOW_RE = re.compile(r"(\d+)([hdw])")
+    WINDOW_UNITS = {"h": 1 / 24, "d": 1, "w": 7}  # in days
+
+    def __init__(self, days=None, limit=None, use_aggregates=None, metrics=(), rate_window=24, rate_step=None,
+                 windows=()):
         # Use values from settings if not overridden
-        self.days = days or settings.EVENT_DAYS_LIMIT
+        self.windows = self.parse_windows(windows)  # ((label, days), ...); the widest one is read
+        self.days = max(span for _, span in self.windows) if self.windows else days or settings.EVENT_DAYS_LIMIT
         self.limit = limit or settings.EVENT_FETCH_LIMIT
-        self.cutoff = now() - timedelta(days=self.days)
+        self.end = now()
+        self.cutoff = self.end - timedelta(days=self.days)
+        self.metrics = self.parse_metrics(metrics)
+        self.rate_window = rate_window  # hours per events-per-hour sub-window
+        self.rate_step = rate_step or rate_window / 4  # hours between the ends of consecutive sub-windows
+
+        # Materialized aggregates only describe the default rolling window
+        if use_aggregates is None:
+            use_aggregates = settings.STATS_FROM_AGGREGATES
+        self.use_aggregates = (
+            use_aggregates and self.days == settings.EVENT_DAYS_LIMIT and self.limit == settings.EVENT_FETCH_LIMIT
+        )
+
+    # One round trip for every (repository, event_type) group: ROW_NUMBER() keeps the newest
+    # <limit> events of each group inside the window, LAG() turns them into intervals.
+    STATS_SQL = """
+        WITH ranked AS (
+            SELECT e.repo_id, e.event_type_id, e.created_at,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY e.repo_id, e.event_type_id ORDER BY e.created_at DESC
+                   ) AS rn
+            FROM {event_table} e
+            JOIN {repo_table} r ON r.id = e.repo_id
+            WHERE e.created_at >= %(cutoff)s AND {repo_filter}
+        ),
+        intervals AS (
+            SELECT repo_id, event_type_id,
+                   EXTRACT(EPOCH FROM created_at - LAG(created_at) OVER (
+                       PARTITION BY repo_id, event_type_id ORDER BY created_at
+                   )) AS interval_seconds
+            FROM ranked
+            WHERE rn <= %(limit)s
+        )
+        SELECT i.repo_id, i.event_type_id, r.name, r.slug, t.event_type, AVG(i.interval_seconds), COUNT(*)
+        FROM intervals i
+        JOIN {repo_table} r ON r.id = i.repo_id
+        JOIN {event_type_table} t ON t.id = i.event_type_id
+        GROUP BY i.repo_id, i.event_type_id, r.name, r.slug, t.event_type
+        ORDER BY i.repo_id, i.event_type_id
+    """
+
+    # The newest <limit> events of every group inside the window as integer epoch microseconds,
+    # ordered by group and time so that each group is a contiguous slice.
+    EPOCHS_SQL = """
+        SELECT repo_id, event_type_id, epoch_us
+        FROM (
+            SELECT e.repo_id, e.event_type_id,
+                   (EXTRACT(EPOCH FROM e.created_at) * 1000000)::bigint AS epoch_us,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY e.repo_id, e.event_type_id ORDER BY e.created_at DESC
+                   ) AS rn
+            FROM {event_table} e
+            JOIN {repo_table} r ON r.id = e.repo_id
+            WHERE e.created_at >= %(cutoff)s AND {repo_filter}
+        ) ranked
+        WHERE rn <= %(limit)s
+        ORDER BY repo_id, event_type_id, epoch_us
+    """
 
     def get_stats(self, repo: Repository = None):
         """
         Returns a list of stats: average interval (in seconds and human-readable) and event count,
         grouped by repository and event type.
+
+        For the default rolling window the stats are read from the materialized EventAggregate rows;
+        otherwise all groups are computed by a single window-function query. Requested extra
+        metrics need every interval, so they are computed by the batch engine, and so are several
+        windows at once.
+        """
+        if self.windows:
+            stats = self.get_stats_multi_window(repo)
+        elif self.metrics:
+            stats = self.get_stats_batch(repo)
+        elif self.use_aggregates:
+            stats = self.get_stats_from_aggregates(repo)
+        else:
+            stats = self.get_stats_windowed(repo)
+
+        STATS_GROUPS.observe(len(stats))
+        return stats
+
+    def get_stats_windowed(self, repo: Repository = None):
+        """
+        Computes get_stats() from Event with a single window-function query.
+        """
+        return [row for _, row in self._query_windowed(repo)]
+
+    def get_stats_from_aggregates(self, repo: Repository = None):
+        """
+        Computes get_stats() from EventAggregate rows, i.e. O(groups) instead of O(events).
+
+        A group whose stored window has partly slid out of the rolling window since it was last
+        refreshed is recomputed from Event; all such groups share one window-function query.
+        """
+        aggregates = EventAggregate.objects.filter(window_count__gt=0).select_related("repo", "event_type")
+        aggregates = aggregates.filter(repo=repo) if repo else aggregates.filter(repo__active=True)
+
+        rows, stale = [], []
+
+        for aggregate in aggregates:
+            key = (aggregate.repo_id, aggregate.event_type_id)
+
+            if aggregate.window_start < self.cutoff:
+                stale.append(key)
+                continue
+
+            avg_interval = None
+            if aggregate.window_count > 1:
+                span = aggregate.window_end - aggregate.window_start
+                avg_interval = span.total_seconds() / (aggregate.window_count - 1)
+
+            rows.append((key, self._stats_row(
+                aggregate.repo.name, aggregate.repo.slug, aggregate.event_type.event_type,
+                avg_interval, aggregate.window_count,
+            )))
+
+        if stale:
+            rows.extend(self._query_windowed(groups=stale))
+
+        return [row for _, row in sorted(rows, key=lambda item: item[0])]
+
+    def _query_windowed(self, repo: Repository = None, groups=None):
+        """
+        Runs STATS_SQL for active repositories, one repository or explicit (repo_id, event_type_id) groups.
+
+        Returns:
+            list: ((repo_id, event_type_id), stats dict) pairs ordered by group.
+        """
+        sql, params = self._windowed_sql(self.STATS_SQL, repo, groups)
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+
+        return [
+            (
+                (repo_id, event_type_id),
+                self._stats_row(
+                    repo_name, repo_slug, event_type,
+                    float(avg_interval) if avg_interval is not None else None,
+                    event_count,
+                ),
+            )
+            for repo_id, event_type_id, repo_name, repo_slug, event_type, avg_interval, event_count in rows
+        ]
+
+    def _windowed_sql(self, sql, repo: Repository = None, groups=None):
+        """
+        Formats a window query for active repositories, one repository or explicit
+        (repo_id, event_type_id) groups.
+
+        Returns:
+            tuple: (sql, params).
+        """
+        params = {"cutoff": self.cutoff, "limit": self.limit}
+        if groups:
+            repo_filter = (
+                "(e.repo_id, e.event_type_id) IN "
+                "(SELECT * FROM unnest(%(repo_ids)s::bigint[], %(event_type_ids)s::bigint[]))"
+            )
+            params["repo_ids"] = [repo_id for repo_id, _ in groups]
+            params["event_type_ids"] = [event_type_id for _, event_type_id in groups]
+        elif repo:
+            repo_filter = "e.repo_id = %(repo_id)s"
+            params["repo_id"] = repo.pk
+        else:
+            repo_filter = "r.active"
+
+        sql = sql.format(
+            event_table=Event._meta.db_table,
+            repo_table=Repository._meta.db_table,
+            event_type_table=EventType._meta.db_table,
+            repo_filter=repo_filter,
+        )
+        return sql, params
+
+    def get_stats_batch(self, repo: Repository = None):
+        """
+        Computes get_stats() from raw epoch timestamps with one vectorized pass over all groups.
+        """
+        keys, epochs, offsets = self.fetch_epochs(repo)
+        if not len(keys):
+            return []
+
+        return [
+            {**group, **fields}
+            for group, fields in zip(self._group_rows(keys), self._interval_fields(epochs, offsets, self.days))
+        ]
+
+    def get_stats_multi_window(self, repo: Repository = None):
+        """
+        Computes get_stats() for every window in <windows> from one read of the widest window.
+
+        Each group's epochs are sorted, so a narrower window is a suffix of every group slice. The
+        newest <limit> events of a narrower window are among the newest <limit> of the widest one,
+        so the suffixes give the same result as a separate query per window.
+
+        Returns:
+            list: One row per group with repository, repository_slug, event_type and "windows",
+            the stats fields (event_count, average interval, requested metrics) per window label.
+            Groups without events in a narrower window report event_count 0 there.
+        """
+        keys, epochs, offsets = self.fetch_epochs(repo)
+        if not len(keys):
+            return []
+
+        rows = [{**group, "windows": {}} for group in self._group_rows(keys)]
+        end_us = int(self.end.timestamp() * 1_000_000)
+
+        for label, days in self.windows:
+            if days == self.days:
+                window_epochs, window_offsets = epochs, offsets
+            else:
+                inside = epochs >= end_us - int(days * 86_400_000_000)
+                window_epochs = epochs[inside]
+                window_offsets = np.concatenate(([0], np.cumsum(inside)))[offsets]
+
+            for row, fields in zip(rows, self._interval_fields(window_epochs, window_offsets, days)):
+                row["windows"][label] = fields
+
+        return rows
+
+    def _group_rows(self, keys):
+        """Returns the repository and event type fields of every (repo_id, event_type_id) key."""
+        repos = Repository.objects.in_bulk(set(keys[:, 0].tolist()))
+        event_types = EventType.objects.in_bulk(set(keys[:, 1].tolist()))
+
+        return [
+            {
+                "repository": repos[repo_id].name,
+                "repository_slug": repos[repo_id].slug,
+                "event_type": event_types[event_type_id].event_type,
+            }
+            for repo_id, event_type_id in keys.tolist()
+        ]
+
+    def _interval_fields(self, epochs, offsets, days):
+        """
+        Returns the stats fields of every group (average interval, event count and the requested
+        metrics) from one batch pass over a <days>-day window.
+        """
+        stats = self.batch_interval_stats(epochs, offsets)
+        if "rate" in self.metrics:
+            stats["rate"] = self._event_rates(epochs, offsets, days)
+
+        rows = []
+        for index in range(len(offsets) - 1):
+            average = self._float(stats["mean"][index])
+            row = {
+                "average_interval_seconds": average,
+                "human_readable_interval": self._format_duration(average),
+                "event_count": int(stats["count"][index]),
+            }
+            for name in self.metrics:
+                if name in self.DURATION_METRICS:
+                    value = self._float(stats[name][index])
+                    row[f"{name}_interval_seconds"] = value
+                    row[f"human_readable_{name}_interval"] = self._format_duration(value)
+                elif name == "cv":
+                    row["interval_cv"] = self._float(stats["cv"][index])
+                elif name == "rate":
+                    row["events_per_hour"] = [round(value, 3) for value in stats["rate"][index].tolist()]
+            rows.append(row)
+
+        return rows
+
+    @staticmethod
+    def parse_metrics(metrics):
+        """
+        Normalizes a comma-separated string (or iterable) of metric names.
+
+        Raises:
+            ValueError: If a metric is unknown.
+        """
+        if isinstance(metrics, str):
+            metrics = metrics.split(",")
+        metrics = tuple(dict.fromkeys(name.strip() for name in metrics if name.strip()))
+
+        unknown = [name for name in metrics if name not in Analyzer.METRICS]
+        if unknown:
+            raise ValueError(f"Unknown metrics: {', '.join(unknown)} (available: {', '.join(Analyzer.METRICS)})")
+        return metrics
+
+    @staticmethod
+    def parse_windows(windows):
+        """
+        Normalizes a comma-separated string (or iterable) of windows such as "1d,7d,30d"
+        (units: h, d, w).
+
+        Returns:
+            tuple: (label, days) pairs in the given order, without duplicates.
+
+        Raises:
+            ValueError: If a window is malformed or empty.
+        """
+        if isinstance(windows, str):
+            windows = windows.split(",")
+
+        parsed = {}
+        for label in (label.strip() for label in windows):
+            if not label:
+                continue
+            match = Analyzer.WINDOW_RE.fullmatch(label)
+            if not match or not int(match.group(1)):
+                raise ValueError(f"Invalid window: {label} (expected e.g. 12h, 7d or 2w)")
+            parsed.setdefault(label, int(match.group(1)) * Analyzer.WINDOW_UNITS[match.group(2)])
+
+        return tuple(parsed.items())
+
+    def _event_rates(self, epochs, offsets, days):
+        """
+        Events per hour of every group in sliding <rate_window>-hour sub-windows of the last <days>
+        days: the newest ends now, each earlier one <rate_step> hours before the next, as long as
+        it fits in the window (a sub-window wider than the window is cut to it). A burst is thus
+        fully inside some sub-window rather than split between two.
+
+        Returns:
+            np.ndarray: (groups, sub-windows) array, oldest sub-window first.
+        """
+        hour_us = 3600 * 1_000_000
+        window_us, step_us = int(self.rate_window * hour_us), int(self.rate_step * hour_us)
+        range_us = int(days * 24 * hour_us)
+        groups = len(offsets) - 1
+
+        count = (range_us - window_us) // step_us + 1 if window_us <= range_us else 1
+        ends = range_us - np.arange(count)[::-1] * step_us  # microseconds since the start of the window
+        starts = np.maximum(ends - window_us, 0)
+
+        # Each sub-window is (start, end]; events from the last instant count as newest. Group ids are
+        # packed in front of the times, which stay sorted within each group, so one searchsorted
+        # finds the sub-window bounds of every group.
+        start_us = int(self.end.timestamp() * 1_000_000) - range_us
+        span = range_us + 1
+        keys = np.repeat(np.arange(groups, dtype=np.int64) * span, np.diff(offsets))
+        keys += np.clip(epochs, start_us, start_us + range_us) - start_us
+        base = (np.arange(groups, dtype=np.int64) * span)[:, None]
+        counts = np.searchsorted(keys, base + ends, side="right") - np.searchsorted(keys, base + starts, side="right")
+
+        return counts / ((ends - starts) / hour_us)
+
+    @staticmethod
+    def _float(value):
+        """Converts a NumPy scalar to a JSON-safe float (None for NaN)."""
+        return None if np.isnan(value) else float(value)
+
+    def fetch_epochs(self, repo: Repository = None, groups=None):
+        """
+        Reads every group's window as one flat array, without building datetime objects.
+
+        Returns:
+            tuple: (keys, epochs, offsets) where keys is an int64 (groups, 2) array of
+            (repo_id, event_type_id), epochs the int64 epoch microseconds of all groups in order and
+            offsets the (groups + 1) slice boundaries: group i is epochs[offsets[i]:offsets[i + 1]].
+        """
+        sql, params = self._windowed_sql(self.EPOCHS_SQL, repo, groups)
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = np.fromiter(chain.from_iterable(cursor.fetchall()), dtype=np.int64).reshape(-1, 3)
+
+        group_ids, epochs = rows[:, :2], rows[:, 2]
+        starts = np.flatnonzero((group_ids[1:] != group_ids[:-1]).any(axis=1)) + 1
+        offsets = np.concatenate(([0], starts, [len(epochs)])) if len(epochs) else np.zeros(1, dtype=np.int64)
+
+        return group_ids[offsets[:-1]], epochs, offsets
+
+    @staticmethod
+    def batch_interval_stats(epochs, offsets):
+        """
+        Computes interval statistics of many groups at once.
+
+        Args:
+            epochs (np.ndarray): int64 epoch microseconds, sorted within each group.
+            offsets (np.ndarray): Group slice boundaries (see fetch_epochs).
+
+        Returns:
+            dict: Arrays indexed by group: "count" (events), in seconds "mean", "median", "p90",
+            "p99", "min", "max" and "stddev" (population) of the intervals, and "cv" (stddev / mean);
+            NaN for groups with fewer than 2 events.
+        """
+        counts = np.diff(offsets)
+        sizes = np.maximum(counts - 1, 0)  # intervals per group
+        groups = len(counts)
+
+        # Drop the differences that span two groups
+        keep = np.ones(max(len(epochs) - 1, 0), dtype=bool)
+        boundaries = offsets[1:-1]
+        keep[boundaries[(boundaries > 0) & (boundaries < len(epochs))] - 1] = False
+        diffs = np.diff(epochs)[keep]  # microseconds, non-negative within a group
+        intervals = diffs / 1_000_000
+
+        group_of = np.repeat(np.arange(groups), sizes)
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1])) if groups else sizes
+        has_data = sizes > 0
+
+        mean = np.full(groups, np.nan)
+        stddev = np.full(groups, np.nan)
+        if intervals.size:
+            sums = np.add.reduceat(intervals, starts[has_data])
+            mean[has_data] = sums / sizes[has_data]
+            squares = np.add.reduceat((intervals - mean[group_of]) ** 2, starts[has_data])
+            stddev[has_data] = np.sqrt(squares / sizes[has_data])
+
+        # Sort each group's intervals within its slice: a single integer sort on (group, interval)
+        # packed into one int64, unless the group ids do not fit next to the largest interval
+        bits = int(diffs.max()).bit_length() if diffs.size else 0
+        if groups < 1 << (63 - bits):
+            ordered = (np.sort((group_of.astype(np.int64) << bits) | diffs) & ((1 << bits) - 1)) / 1_000_000
+        else:
+            ordered = intervals[np.lexsort((intervals, group_of))]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cv = np.where(mean > 0, stddev / mean, np.nan)
+
+        return {
+            "count": counts,
+            "mean": mean,
+            "median": Analyzer._group_percentile(ordered, starts, sizes, 0.5),
+            "p90": Analyzer._group_percentile(ordered, starts, sizes, 0.9),
+            "p99": Analyzer._group_percentile(ordered, starts, sizes, 0.99),
+            "min": Analyzer._group_percentile(ordered, starts, sizes, 0),
+            "max": Analyzer._group_percentile(ordered, starts, sizes, 1),
+            "stddev": stddev,
+            "cv": cv,
+        }
+
+    @staticmethod
+    def _group_percentile(ordered, starts, sizes, q):
+        """Linear-interpolated percentile (as numpy.percentile) of every sorted group slice."""
+        result = np.full(len(sizes), np.nan)
+        has_data = sizes > 0
+
+        position = (sizes[has_data] - 1) * q
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+        base = starts[has_data]
+
+        low_values, high_values = ordered[base + lower], ordered[base + upper]
+        result[has_data] = low_values + (high_values - low_values) * (position - lower)
+        return result
+
+    def _stats_row(self, repo_name, repo_slug, event_type, avg_interval, event_count):
+        return {
+            "repository": repo_name,
+            "repository_slug": repo_slug,
+            "event_type": event_type,
+            "average_interval_seconds": avg_interval,
+            "human_readable_interval": self._format_duration(avg_interval),
+            "event_count": event_count,
+        }
+
+    def get_stats_per_group(self, repo: Repository = None):
+        """
+        Reference implementation of get_stats() that issues separate queries per repository
+        and per (repository, event_type) group. Kept for benchmarking and cross-checking.
         """
         results = []
 
@@ -44,7 +507,11 @@ class Analyzer:
                 )
 
                 # Maintain chronological order for interval calculation
-                events = Event.objects.filter(id__in=events.values_list("id", flat=True)).order_by("created_at")
+                events = (
+                    Event.objects
+                    .filter(id__in=events.values_list("id", flat=True), created_at__gte=self.cutoff)
+                    .order_by("created_at")
+                )
                 timestamps = list(events.values_list("created_at", flat=True))
 
                 avg_interval = self._calculate_average_interval(timestamps)
@@ -76,11 +543,15 @@ class Analyzer:
     def _format_duration(seconds: float) -> str:
         """
         Converts a duration in seconds into a concise human-readable string.
-        Example: "1 hour, 5 minutes", "13 seconds", etc.
+        Example: "1 hour, 5 minutes", "13 seconds", "250 milliseconds", etc.
         """
-        if seconds is None:
+        if seconds is None or np.isnan(seconds):
             return "N/A"
 
+        # Bursts (minimum and low-percentile intervals) can be shorter than a second
+        if 0 < seconds < 1:
+            return f"{round(seconds * 1000)} milliseconds"
+
         seconds = int(seconds)
 
         intervals = (
@@ -1,25 +1,149 @@
+import threading
+import time
+
 import requests
 from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from monitor.services.github import metrics
+from monitor.services.github.errors import RateLimitExceeded
+from monitor.services.github.ratelimit import RateLimitScheduler
 
 
 class GitHubAPIClient:
     """
-    Stateless GitHub API client
+    GitHub API client backed by a pooled, keep-alive requests.Session.
+
+    Default headers, connection pool, timeouts and retry/backoff are configured once per client
+    instead of on every call. The underlying urllib3 pool is thread-safe, so one instance can be
+    shared by concurrent fetches; use GitHubAPIClient.shared() for the process-wide client.
+
+    Every request takes a slot from the client's RateLimitScheduler, which paces requests against
+    the reported quota. A 403/429 rate-limit answer is retried once the reset or Retry-After time
+    has passed, or raises RateLimitExceeded if that is more than rate_limit_max_wait seconds away.
     """
 
+    RETRY_STATUSES = (500, 502, 503, 504)
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, token=None, base_url=None, timeout=None, pool_size=None, retries=None, backoff=None,
+                 rate_limit_reserve=None, rate_limit_burst=None, rate_limit_max_wait=None):
+        self.base_url = base_url
+        self.retries = retries if retries is not None else settings.GITHUB_HTTP_RETRIES
+        self.scheduler = RateLimitScheduler(
+            reserve=rate_limit_reserve if rate_limit_reserve is not None else settings.GITHUB_RATE_LIMIT_RESERVE,
+            burst=rate_limit_burst if rate_limit_burst is not None else settings.GITHUB_RATE_LIMIT_BURST,
+            max_wait=rate_limit_max_wait if rate_limit_max_wait is not None else settings.GITHUB_RATE_LIMIT_MAX_WAIT,
+        )
+        self.timeout = timeout if timeout is not None else settings.GITHUB_HTTP_TIMEOUT
+        self.session = requests.Session()
+        self.session.headers.update(self.get_headers(token))
+
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size or settings.GITHUB_HTTP_POOL_SIZE,
+            max_retries=Retry(
+                total=self.retries,
+                backoff_factor=backoff if backoff is not None else settings.GITHUB_HTTP_BACKOFF,
+                status_forcelist=self.RETRY_STATUSES,
+                allowed_methods=frozenset({"GET"}),
+                raise_on_status=False,
+                respect_retry_after_header=False,  # 429 + Retry-After is the scheduler's business
+            ),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @classmethod
+    def shared(cls):
+        """
+        Returns the process-wide client, creating it on first use.
+        """
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._shared = cls()
+        return cls._shared
+
     @staticmethod
-    def get_headers():
-        headers = {"Accept": "application/vnd.github+json"}
-        token = getattr(settings, 'GITHUB_TOKEN', None)
+    def get_headers(token=None):
+        headers = {
+            "Accept": "application/vnd.github+json",
+            "Accept-Encoding": "gzip",
+            "Connection": "keep-alive",
+        }
+        token = token or getattr(settings, 'GITHUB_TOKEN', None)
 
         if token:
             headers["Authorization"] = f"Bearer {token}"
         return headers
 
-    @classmethod
-    def fetch_repo_events(cls, repo_name: str, page: int = 1):
+    @property
+    def rate_limit_remaining(self):
+        """Calls left in the current rate-limit window, as last reported by GitHub (None before the first call)."""
+        return self.scheduler.remaining
+
+    @property
+    def rate_limit_reset(self):
+        """Epoch time of the next rate-limit reset, as last reported by GitHub."""
+        return self.scheduler.reset
+
+    def quota(self):
+        """Returns rate-limit telemetry (see RateLimitScheduler.snapshot)."""
+        return self.scheduler.snapshot()
+
+    def get(self, path, etag=None, priority=0, **params):
         """
-        Fetches one page of events for a given repository.
+        Performs a GET request against the API, relative to the configured base URL.
+        With an etag, the request is conditional and GitHub answers 304 if nothing changed.
+        Waiting requests with a lower priority are sent first.
+
+        Raises:
+            RateLimitExceeded: If GitHub's rate limit blocks the request for longer than rate_limit_max_wait.
+        """
+        headers = {"If-None-Match": etag} if etag else None
+        return self._request("GET", path, priority, params=params or None, headers=headers)
+
+    def graphql(self, query, variables=None):
+        """
+        Runs a GraphQL query (requires a token). GraphQL has its own rate limit (points per hour),
+        so use a separate client for it rather than one that also serves REST requests.
+
+        Returns:
+            requests.Response: The response; its JSON carries "data" and, for failed fields, "errors".
         """
-        url = f"https://api.github.com/repos/{repo_name}/events?per_page=100&page={page}"
-        return requests.get(url, headers=cls.get_headers())
+        return self._request("POST", "/graphql", json={"query": query, "variables": variables or {}})
+
+    def _request(self, method, path, priority=0, **kwargs):
+        base_url = self.base_url or settings.GITHUB_API_URL
+
+        for _ in range(self.retries + 1):
+            self.scheduler.acquire(priority)
+            started = time.perf_counter()
+            response = self.session.request(method, f"{base_url}{path}", timeout=self.timeout, **kwargs)
+            metrics.GITHUB_REQUEST_SECONDS.observe(time.perf_counter() - started, str(response.status_code))
+            retry_at = self.scheduler.update(
+                response.status_code, response.headers, response.text if response.status_code in (403, 429) else ""
+            )
+            if retry_at is None:
+                return response
+
+        raise RateLimitExceeded(retry_at, response.status_code)
+
+    def fetch_repo_events(self, repo_name: str, page: int = 1, etag: str = None, priority=0):
+        """
+        Fetches one page of events for a given repository, conditionally if an ETag is given.
+        """
+        return self.get(f"/repos/{repo_name}/events", etag=etag, priority=priority, per_page=100, page=page)
+
+    def fetch_repo(self, repo_name: str):
+        """
+        Fetches repository metadata (including its numeric id).
+        """
+        return self.get(f"/repos/{repo_name}")
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,141 @@
+import asyncio
+import time
+
+import aiohttp
+from django.conf import settings
+from multidict import CIMultiDict
+
+from monitor.services.github import metrics
+from monitor.services.github.api import GitHubAPIClient
+from monitor.services.github.errors import RateLimitExceeded
+from monitor.services.github.ratelimit import RateLimitScheduler
+
+
+class GitHubResponse:
+    """
+    A fully read API response with the parts of requests.Response the event service uses
+    (status_code, headers, json()), so the same processing code serves both clients.
+    """
+
+    def __init__(self, status_code, headers, data):
+        self.status_code = status_code
+        self.headers = headers
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class AsyncGitHubAPIClient:
+    """
+    asyncio GitHub API client backed by one keep-alive aiohttp session.
+
+    At most <concurrency> requests are in flight at any time, whichever repositories they belong to.
+    All requests take their slot from one RateLimitScheduler, like the synchronous client, and
+    sleep on the event loop until it is due. 5xx answers and connection errors are retried with
+    exponential backoff, rate-limit answers once the reset or Retry-After time has passed.
+
+    Use as an async context manager, or call close() when done.
+    """
+
+    RETRY_STATUSES = GitHubAPIClient.RETRY_STATUSES
+
+    def __init__(self, token=None, base_url=None, timeout=None, concurrency=None, retries=None, backoff=None,
+                 rate_limit_reserve=None, rate_limit_burst=None, rate_limit_max_wait=None):
+        self.base_url = base_url
+        self.timeout = timeout if timeout is not None else settings.GITHUB_HTTP_TIMEOUT
+        self.concurrency = concurrency or settings.GITHUB_HTTP_POOL_SIZE
+        self.retries = retries if retries is not None else settings.GITHUB_HTTP_RETRIES
+        self.backoff = backoff if backoff is not None else settings.GITHUB_HTTP_BACKOFF
+        self.scheduler = RateLimitScheduler(
+            reserve=rate_limit_reserve if rate_limit_reserve is not None else settings.GITHUB_RATE_LIMIT_RESERVE,
+            burst=rate_limit_burst if rate_limit_burst is not None else settings.GITHUB_RATE_LIMIT_BURST,
+            max_wait=rate_limit_max_wait if rate_limit_max_wait is not None else settings.GITHUB_RATE_LIMIT_MAX_WAIT,
+        )
+        self.headers = GitHubAPIClient.get_headers(token)
+        self.session = None
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _session(self):
+        # Created lazily, inside the running event loop
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=aiohttp.TCPConnector(limit=self.concurrency),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self.session
+
+    @property
+    def rate_limit_remaining(self):
+        return self.scheduler.remaining
+
+    @property
+    def rate_limit_reset(self):
+        return self.scheduler.reset
+
+    def quota(self):
+        """Returns rate-limit telemetry (see RateLimitScheduler.snapshot)."""
+        return self.scheduler.snapshot()
+
+    async def get(self, path, etag=None, **params):
+        """
+        Performs a GET request against the API, relative to the configured base URL.
+        With an etag, the request is conditional and GitHub answers 304 if nothing changed.
+
+        Returns:
+            GitHubResponse: Status, headers and decoded JSON body.
+
+        Raises:
+            RateLimitExceeded: If GitHub's rate limit blocks the request for longer than rate_limit_max_wait.
+        """
+        base_url = self.base_url or settings.GITHUB_API_URL
+        headers = {"If-None-Match": etag} if etag else None
+
+        for attempt in range(self.retries + 1):
+            await asyncio.sleep(self.scheduler.reserve_slot())
+            try:
+                async with self._semaphore:
+                    started = time.perf_counter()
+                    async with self._session().get(f"{base_url}{path}", params=params or None,
+                                                   headers=headers) as response:
+                        data = await response.json(content_type=None) if response.status != 304 else None
+                        result = GitHubResponse(response.status, CIMultiDict(response.headers), data)
+                    metrics.GITHUB_REQUEST_SECONDS.observe(time.perf_counter() - started, str(result.status_code))
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt == self.retries:
+                    raise
+            else:
+                message = result.json().get("message", "") if isinstance(result.json(), dict) else ""
+                retry_at = self.scheduler.update(result.status_code, result.headers, message)
+                if retry_at is not None:
+                    if attempt == self.retries:
+                        raise RateLimitExceeded(retry_at, result.status_code)
+                    continue  # the next slot is not handed out before retry_at
+                if result.status_code not in self.RETRY_STATUSES or attempt == self.retries:
+                    return result
+
+            await asyncio.sleep(self.backoff * 2 ** attempt)
+
+    async def fetch_repo_events(self, repo_name: str, page: int = 1, etag: str = None):
+        """
+        Fetches one page of events for a given repository, conditionally if an ETag is given.
+        """
+        return await self.get(f"/repos/{repo_name}/events", etag=etag, per_page=100, page=page)
+
+    async def fetch_repo(self, repo_name: str):
+        """
+        Fetches repository metadata (including its numeric id).
+        """
+        return await self.get(f"/repos/{repo_name}")
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
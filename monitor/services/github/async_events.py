@@ -0,0 +1,200 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+from asgiref.sync import sync_to_async
+
+from monitor.models import RepositoryPollState
+from monitor.services.github.async_api import AsyncGitHubAPIClient
+from monitor.services.github.errors import GitHubAPIError
+from monitor.services.github.events import GitHubEventService
+
+
+class _RepositoryFetch:
+    """Progress of one repository through the fetch pipeline."""
+
+    def __init__(self, repo, poll_state):
+        self.repo = repo
+        self.poll_state = poll_state
+        self.started = time.perf_counter()
+        self.new_events = 0
+        self.skipped_events = 0
+        self.pages_fetched = 0
+        self.first_page = None
+        self.stopped_at = None  # page on which the writer decided to stop
+        self.result = None
+
+
+class AsyncGitHubEventService:
+    """
+    asyncio counterpart of GitHubEventService.fetch_events_for_repository for many repositories.
+
+    Repositories are fetched concurrently, within the request concurrency of the client, while
+    a single writer stores the parsed pages. Pages reach it through a bounded queue, so
+    requests keep running while a page is being written, and fetchers wait when the writer
+    falls behind. Each page is written by GitHubEventService._process_events, in order per
+    repository, so the stored events and the EventFetchResult match the synchronous path.
+
+    A repository's pages are requested one after another. Stops decided by the page alone
+    (short or empty page, high-water mark, min_date) end paging at once. Stops that need the
+    database (event_limit, only known events) reach the fetcher after the page is written,
+    so at most one extra page is requested and then dropped.
+    """
+
+    @staticmethod
+    async def fetch_events_for_repositories(repos, page_limit, min_date, event_limit, client=None, queue_size=20,
+                                            on_result=None):
+        """
+        Fetches events from GitHub for several repositories within given limits.
+
+        Args:
+            repos (list): Repository instances to fetch events for.
+            page_limit (int): Maximum pages to fetch per repository.
+            min_date (datetime): Earliest datetime to accept events from.
+            event_limit (int): Max number of events to store per (repo, event type).
+            client (AsyncGitHubAPIClient): API client to use (default: a new client, closed afterwards).
+            queue_size (int): Max parsed pages waiting for the writer.
+            on_result (callable): Called with (repo, EventFetchResult, elapsed seconds) as each repository completes.
+
+        Returns:
+            dict: EventFetchResult per repository id.
+        """
+        own_client = client is None
+        client = client or AsyncGitHubAPIClient()
+        poll_states = await sync_to_async(AsyncGitHubEventService._poll_states)(repos)
+        fetches = [_RepositoryFetch(repo, poll_states[repo.pk]) for repo in repos]
+        # Repositories polled longest ago start first and so get the earliest rate-limit slots
+        fetches.sort(key=lambda fetch: fetch.poll_state.last_polled_at or datetime.min.replace(tzinfo=timezone.utc))
+        queue = asyncio.Queue(maxsize=queue_size)
+
+        try:
+            async with asyncio.TaskGroup() as group:
+                group.create_task(AsyncGitHubEventService._write_pages(queue, min_date, event_limit, on_result))
+
+                async with asyncio.TaskGroup() as fetchers:
+                    for fetch in fetches:
+                        fetchers.create_task(
+                            AsyncGitHubEventService._fetch_pages(client, queue, fetch, page_limit, min_date)
+                        )
+                await queue.put(None)
+        except BaseExceptionGroup as group:
+            # Surface the first failure like the synchronous command does
+            error = group
+            while isinstance(error, BaseExceptionGroup):
+                error = error.exceptions[0]
+            raise error from None
+        finally:
+            if own_client:
+                await client.close()
+
+        return {fetch.repo.pk: fetch.result for fetch in fetches}
+
+    @staticmethod
+    def _poll_states(repos):
+        """Returns the poll state per repository id, creating missing ones."""
+        RepositoryPollState.objects.bulk_create(
+            [RepositoryPollState(repo=repo) for repo in repos], ignore_conflicts=True
+        )
+        return {state.repo_id: state for state in RepositoryPollState.objects.filter(repo__in=repos)}
+
+    @staticmethod
+    async def _fetch_pages(client, queue, fetch, page_limit, min_date):
+        """
+        Requests the pages of one repository and queues them for the writer, followed by an
+        end-of-repository marker (page None).
+        """
+        poll_state, page = fetch.poll_state, 1
+
+        while page <= page_limit and fetch.stopped_at is None:
+            response = await client.fetch_repo_events(
+                fetch.repo.name, page, etag=poll_state.etag if page == 1 else None
+            )
+
+            if page == 1 and response.status_code == 304:
+                await sync_to_async(GitHubEventService._record_poll)(poll_state, response, modified=False)
+                fetch.result = {
+                    "new_events": 0,
+                    "skipped_events": 0,
+                    "pages_fetched": 1,
+                    "not_modified": 1,
+                }
+                break
+            if response.status_code in {422, 404}:
+                break
+            if response.status_code != 200:
+                raise GitHubAPIError(response.status_code)
+
+            events_data = response.json()
+            if page == 1:
+                fetch.first_page = (response, events_data)
+            if not events_data:
+                break
+
+            await queue.put((fetch, page, events_data))
+
+            if len(events_data) < 100 or AsyncGitHubEventService._page_stops(
+                events_data, min_date, poll_state.last_event_id
+            ):
+                break
+
+            page += 1
+
+        fetch.pages_fetched = page
+        await queue.put((fetch, None, None))
+
+    @staticmethod
+    def _page_stops(events_data, min_date, high_water_mark):
+        """
+        Whether _process_events will stop on this page for reasons visible in the page itself:
+        an event at or below the high-water mark, or one older than min_date.
+        """
+        for event_json in events_data:
+            if GitHubEventService._event_data_invalid(event_json):
+                continue
+
+            event_id = GitHubEventService._event_id(event_json)
+            if high_water_mark is not None and event_id is not None and event_id <= high_water_mark:
+                return True
+            if GitHubEventService._normalize_datetime(event_json["created_at"]) < min_date:
+                return True
+
+        return False
+
+    @staticmethod
+    async def _write_pages(queue, min_date, event_limit, on_result):
+        """
+        Stores queued pages until the final None, completing each repository at its end marker.
+        """
+        process_events = sync_to_async(GitHubEventService._process_events)
+        record_poll = sync_to_async(GitHubEventService._record_poll)
+
+        while (item := await queue.get()) is not None:
+            fetch, page, events_data = item
+
+            if page is None:
+                if fetch.result is None:
+                    # Only remember the ETag once the whole fetch succeeded, so a failed run is retried in full
+                    if fetch.first_page:
+                        await record_poll(fetch.poll_state, *fetch.first_page, modified=True)
+                    fetch.result = {
+                        "new_events": fetch.new_events,
+                        "skipped_events": fetch.skipped_events,
+                        "pages_fetched": fetch.stopped_at or fetch.pages_fetched,
+                        "not_modified": 0,
+                    }
+                GitHubEventService._observe_fetch(fetch.repo, fetch.result)
+                if on_result:
+                    on_result(fetch.repo, fetch.result, time.perf_counter() - fetch.started)
+                continue
+
+            if fetch.stopped_at is not None:
+                continue  # requested before the stop was known
+
+            should_stop, added, skipped = await process_events(
+                events_data, fetch.repo, min_date, event_limit, high_water_mark=fetch.poll_state.last_event_id
+            )
+            fetch.new_events += added
+            fetch.skipped_events += skipped
+
+            if should_stop:
+                fetch.stopped_at = page
@@ -0,0 +1,97 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from monitor.services.github import metrics
+
+
+class StatsCache:
+    """
+    Caches stats API payloads per (repository slug, days, limit) in Django's cache framework.
+
+    Entries are keyed by a global data version which the ingest path bumps whenever it saves new
+    events, so stale entries are never read again and simply expire. The version also yields the
+    ETag and Last-Modified headers of the stats endpoints.
+
+    Note: invalidation only reaches other processes (e.g. the web server when fetch_github_events
+    runs from cron) with a shared backend such as Redis, Memcached or the database cache. With the
+    default local-memory backend entries still expire after STATS_CACHE_TIMEOUT seconds.
+    """
+
+    VERSION_KEY = "monitor:stats:version"
+    MODIFIED_KEY = "monitor:stats:modified"
+
+    class Entry:
+        """A cached stats payload with its validators."""
+
+        def __init__(self, stats, etag, last_modified):
+            self.stats = stats
+            self.etag = etag
+            self.last_modified = last_modified
+
+    @staticmethod
+    def _cache():
+        return caches[settings.STATS_CACHE_ALIAS]
+
+    @staticmethod
+    def version():
+        """
+        Returns (data version, unix time of the last bump), initializing both on first use.
+        """
+        cache = StatsCache._cache()
+        values = cache.get_many([StatsCache.VERSION_KEY, StatsCache.MODIFIED_KEY])
+
+        if StatsCache.VERSION_KEY not in values:
+            cache.add(StatsCache.VERSION_KEY, 1, timeout=None)
+            cache.add(StatsCache.MODIFIED_KEY, int(time.time()), timeout=None)
+            values = cache.get_many([StatsCache.VERSION_KEY, StatsCache.MODIFIED_KEY])
+
+        return values.get(StatsCache.VERSION_KEY, 1), values.get(StatsCache.MODIFIED_KEY, int(time.time()))
+
+    @staticmethod
+    def bump():
+        """
+        Invalidates every cached stats payload. Deferred until the current transaction commits,
+        so readers never cache data that is about to be rolled back or not yet visible.
+        """
+        transaction.on_commit(StatsCache._bump)
+
+    @staticmethod
+    def _bump():
+        cache = StatsCache._cache()
+        try:
+            cache.incr(StatsCache.VERSION_KEY)
+        except ValueError:  # not initialized (or evicted) yet
+            cache.add(StatsCache.VERSION_KEY, 1, timeout=None)
+        cache.set(StatsCache.MODIFIED_KEY, int(time.time()), timeout=None)
+
+    @staticmethod
+    def get_or_compute(slug, days, limit, compute, variant="") -> Entry:
+        """
+        Returns the cached stats for (slug, days, limit), computing and storing them on a miss.
+
+        Args:
+            slug (str): Repository slug, or None for all active repositories.
+            days (int): Rolling window in days.
+            limit (int): Max events per (repo, type).
+            compute (callable): Produces the stats payload on a cache miss.
+            variant (str): Any further option shaping the payload (e.g. requested metrics).
+        """
+        version, last_modified = StatsCache.version()
+        key = f"monitor:stats:v{version}:{slug or '*'}:{days}:{limit}"
+        if variant:
+            key += f":{variant}"
+        etag = '"%s"' % hashlib.md5(key.encode()).hexdigest()
+
+        stats = StatsCache._cache().get(key)
+        if stats is None:
+            metrics.STATS_CACHE.inc("miss")
+            stats = compute()
+            StatsCache._cache().set(key, stats, timeout=settings.STATS_CACHE_TIMEOUT)
+        else:
+            metrics.STATS_CACHE.inc("hit")
+
+        return StatsCache.Entry(stats, etag, last_modified)
@@ -0,0 +1,190 @@
+import heapq
+import itertools
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils.timezone import now
+
+from monitor.models import Repository, RepositoryPollState
+from monitor.services.github.api import GitHubAPIClient
+from monitor.services.github.errors import RateLimitExceeded
+from monitor.services.github.events import GitHubEventService
+
+
+class PollingDaemon:
+    """
+    Polls every active repository in one long-running process, each on its own adaptive cadence.
+    Optional hooks (interval in seconds, callable) run periodic maintenance between polls.
+
+    A repository's interval never drops below GitHub's X-Poll-Interval (or min_interval). It halves
+    after a poll that found new events and grows by half after a quiet poll (304 or nothing new),
+    up to max_interval. Polls pause until the rate-limit reset once the shared quota reported in
+    X-RateLimit-Remaining drops to the configured reserve.
+    """
+
+    def __init__(self, client=None, page_limit=10, min_interval=60, max_interval=900,
+                 rate_limit_reserve=50, refresh_interval=60, hooks=(), log=print, clock=time.monotonic):
+        self.client = client or GitHubAPIClient.shared()
+        self.page_limit = page_limit
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.rate_limit_reserve = rate_limit_reserve
+        self.refresh_interval = refresh_interval
+        self.hooks = [[0, interval, hook] for interval, hook in hooks]  # [next run, interval, callable]
+        self.log = log
+        self.clock = clock
+
+        self.repos = {}  # repo id -> Repository
+        self.intervals = {}  # repo id -> current polling interval (seconds)
+        self.schedule = []  # heap of (due time, repo id, ticket)
+        self.scheduled = {}  # repo id -> ticket of its live schedule entry; other entries are stale
+        self._tickets = itertools.count()
+        self.polls = 0
+        self._next_refresh = 0
+        self._stop = threading.Event()
+
+    def stop(self):
+        """Asks the daemon to exit after the current poll (safe to call from a signal handler)."""
+        self._stop.set()
+
+    @property
+    def stopped(self):
+        return self._stop.is_set()
+
+    def run(self, max_polls=None):
+        """
+        Runs the scheduling loop until stop() is called or <max_polls> polls were made.
+        """
+        while not self.stopped and (max_polls is None or self.polls < max_polls):
+            close_old_connections()
+
+            if self.clock() >= self._next_refresh:
+                self.refresh_repositories()
+
+            self._run_due_hooks()
+            wake_up = min([self._next_refresh] + [next_run for next_run, _, _ in self.hooks])
+
+            if not self.schedule:
+                self._sleep(wake_up - self.clock())
+                continue
+
+            due, repo_id, ticket = self.schedule[0]
+            if due > self.clock():
+                self._sleep(min(due, wake_up) - self.clock())
+                continue
+
+            heapq.heappop(self.schedule)
+            repo = self.repos.get(repo_id)
+            # Deactivated since it was scheduled, or deactivated and reactivated (a newer entry exists)
+            if repo is None or self.scheduled.get(repo_id) != ticket:
+                continue
+
+            self._wait_for_rate_limit()
+            if self.stopped:
+                break
+
+            self._poll(repo)
+
+        close_old_connections()
+
+    def refresh_repositories(self):
+        """
+        Picks up repositories activated or deactivated since the last refresh.
+        """
+        active = {repo.pk: repo for repo in Repository.objects.filter(active=True)}
+        added = active.keys() - self.repos.keys()
+        # One query for all new repositories' X-Poll-Interval, not one each
+        poll_intervals = dict(
+            RepositoryPollState.objects.filter(repo_id__in=added).values_list("repo_id", "poll_interval")
+        ) if added else {}
+
+        for repo_id in added:
+            self.intervals[repo_id] = max(self.min_interval, poll_intervals.get(repo_id) or 0)
+            self._schedule(repo_id, self.clock())
+
+        for repo_id in self.repos.keys() - active.keys():
+            self.intervals.pop(repo_id, None)
+            self.scheduled.pop(repo_id, None)
+
+        self.repos = active
+        self._next_refresh = self.clock() + self.refresh_interval
+
+    def _run_due_hooks(self):
+        """
+        Runs periodic maintenance callables (e.g. retention) between polls.
+        """
+        for entry in self.hooks:
+            next_run, interval, hook = entry
+            if self.clock() < next_run:
+                continue
+
+            try:
+                hook()
+            except Exception as exc:
+                self.log(f"✗ {getattr(hook, '__name__', hook)} failed: {exc}")
+            entry[0] = self.clock() + interval
+
+    def _poll(self, repo):
+        min_date = now() - timedelta(days=settings.EVENT_DAYS_LIMIT)
+        started = time.perf_counter()
+
+        try:
+            result = GitHubEventService.fetch_events_for_repository(
+                repo, self.page_limit, min_date, settings.EVENT_FETCH_LIMIT, client=self.client
+            )
+        except RateLimitExceeded as exc:
+            # Nothing can be polled before the limit lifts; come back exactly then
+            interval = max(self._floor(repo.pk), exc.retry_at - time.time())
+            self.log(f"✗ {repo.name}: {exc} (retrying in {interval:.0f}s)")
+        except Exception as exc:
+            # Keep the other repositories going, retry this one after a longer pause
+            interval = min(self.max_interval, self.intervals[repo.pk] * 2)
+            self.log(f"✗ {repo.name}: {exc} (retrying in {interval:.0f}s)")
+        else:
+            interval = self._next_interval(repo.pk, busy=result["new_events"] > 0)
+            if result["not_modified"]:
+                self.log(f"✓ {repo.name} not modified (304), next poll in {interval:.0f}s")
+            else:
+                self.log(
+                    f"✓ {result['new_events']} new events saved for {repo.name} "
+                    f"in {time.perf_counter() - started:.2f}s, next poll in {interval:.0f}s"
+                )
+
+        self.polls += 1
+        self.intervals[repo.pk] = interval
+        self._schedule(repo.pk, self.clock() + interval)
+
+    def _schedule(self, repo_id, due):
+        """Schedules the next poll of a repository, replacing any entry it still has in the heap."""
+        ticket = next(self._tickets)
+        self.scheduled[repo_id] = ticket
+        heapq.heappush(self.schedule, (due, repo_id, ticket))
+
+    def _next_interval(self, repo_id, busy):
+        floor = self._floor(repo_id)
+        current = self.intervals.get(repo_id, floor)
+        interval = current / 2 if busy else current * 1.5
+        return max(floor, min(self.max_interval, interval))
+
+    def _floor(self, repo_id):
+        """The shortest allowed interval: min_interval, but never below GitHub's X-Poll-Interval."""
+        poll_interval = (
+            RepositoryPollState.objects.filter(repo_id=repo_id).values_list("poll_interval", flat=True).first()
+        )
+        return max(self.min_interval, poll_interval or 0)
+
+    def _wait_for_rate_limit(self):
+        remaining, reset = self.client.rate_limit_remaining, self.client.rate_limit_reset
+
+        if remaining is not None and remaining <= self.rate_limit_reserve:
+            wait = reset - time.time()
+            if wait > 0:
+                self.log(f"Rate limit reserve reached ({remaining} left), pausing {wait:.0f}s until reset")
+                self._sleep(wait)
+
+    def _sleep(self, seconds):
+        if seconds > 0:
+            self._stop.wait(seconds)
@@ -0,0 +1,22 @@
+import time
+
+
+class GitHubAPIError(Exception):
+    """
+    GitHub answered with an unexpected status code.
+    """
+
+    def __init__(self, status_code, message=None):
+        self.status_code = status_code
+        super().__init__(message or f"GitHub API error ({status_code})")
+
+
+class RateLimitExceeded(GitHubAPIError):
+    """
+    GitHub's primary or secondary rate limit blocks requests until <retry_at> (epoch seconds),
+    further away than the client is willing to wait.
+    """
+
+    def __init__(self, retry_at, status_code=None):
+        self.retry_at = retry_at
+        super().__init__(status_code, f"GitHub rate limit exceeded, retry in {max(0.0, retry_at - time.time()):.0f}s")
@@ -1,8 +1,13 @@
+from django.db import connection, transaction
+from django.db.models import Count, F, Q
 from django.utils.dateparse import parse_datetime
-from django.utils.timezone import make_aware, is_aware
+from django.utils.timezone import make_aware, is_aware, now
 
-from monitor.models import EventType, Event
+from monitor.models import EventType, Event, RepositoryPollState
+from monitor.services.github import metrics
+from monitor.services.github.aggregates import EventAggregateService
 from monitor.services.github.api import GitHubAPIClient
+from monitor.services.github.errors import GitHubAPIError
 
 
 class GitHubEventService:
@@ -12,36 +17,71 @@ class GitHubEventService:
 
     EventFetchResult = dict[str, int]  # Type allias for result of fetching events for a repository.
 
+    # Inserts a page of events, skipping rows that are already stored, and returns the inserted ones.
+    INSERT_SQL = """
+        INSERT INTO {table} (repo_id, event_type_id, created_at, gh_event_id)
+        VALUES {values}
+        ON CONFLICT DO NOTHING
+        RETURNING id, repo_id, event_type_id, created_at, gh_event_id
+    """
+
     @staticmethod
-    def fetch_events_for_repository(repo, page_limit, min_date, event_limit) -> EventFetchResult:
+    def fetch_events_for_repository(repo, page_limit, min_date, event_limit, client=None) -> EventFetchResult:
         """
         Fetch events from GitHub for a repository within given limits.
 
+        The first page is requested conditionally with the ETag stored in the repository poll state;
+        a 304 Not Modified means nothing changed since the last poll and the repository is skipped.
+        Paging stops at the first event id at or below the stored high-water mark.
+
+        When requests have to wait for the rate limit, repositories polled longest ago go first.
+
         Args:
             repo: Repository instance to fetch events for.
             page_limit (int): Maximum pages to fetch.
             min_date (datetime): Earliest datetime to accept events from.
             event_limit (int): Max number of events to store per (repo, event type).
+            client (GitHubAPIClient): API client to use (default: the shared client).
 
         Returns:
-            dict: Summary of fetching operation (events added, skipped, pages fetched).
+            dict: Summary of fetching operation (events added, skipped, pages fetched, not modified).
+
+        Raises:
+            GitHubAPIError: On an unexpected response status.
+            RateLimitExceeded: If the rate limit blocks requests for longer than the client waits.
         """
+        client = client or GitHubAPIClient.shared()
+        poll_state = RepositoryPollState.objects.get_or_create(repo=repo)[0]
+        priority = poll_state.last_polled_at.timestamp() if poll_state.last_polled_at else 0
         new_events_total, skipped_events_total, page = 0, 0, 1
+        first_page = None
 
         while page <= page_limit:
-            response = GitHubAPIClient.fetch_repo_events(repo.name, page)
+            response = client.fetch_repo_events(
+                repo.name, page, etag=poll_state.etag if page == 1 else None, priority=priority
+            )
 
+            if page == 1 and response.status_code == 304:
+                GitHubEventService._record_poll(poll_state, response, modified=False)
+                return GitHubEventService._observe_fetch(repo, {
+                    "new_events": 0,
+                    "skipped_events": 0,
+                    "pages_fetched": 1,
+                    "not_modified": 1,
+                })
             if response.status_code in {422, 404}:
                 break
             if response.status_code != 200:
-                raise Exception(f"GitHub API error ({response.status_code})")
+                raise GitHubAPIError(response.status_code)
 
             events_data = response.json()
+            if page == 1:
+                first_page = (response, events_data)
             if not events_data:
                 break
 
             should_stop, added, skipped = GitHubEventService._process_events(
-                events_data, repo, min_date, event_limit
+                events_data, repo, min_date, event_limit, high_water_mark=poll_state.last_event_id
             )
 
             new_events_total += added
@@ -52,55 +92,138 @@ class GitHubEventService:
 
             page += 1
 
-        return {
+        # Only remember the ETag once the whole fetch succeeded, so a failed run is retried in full
+        if first_page:
+            GitHubEventService._record_poll(poll_state, *first_page, modified=True)
+
+        return GitHubEventService._observe_fetch(repo, {
             "new_events": new_events_total,
             "skipped_events": skipped_events_total,
-            "pages_fetched": page
+            "pages_fetched": page,
+            "not_modified": 0,
+        })
+
+    @staticmethod
+    def _observe_fetch(repo, result: EventFetchResult) -> EventFetchResult:
+        """
+        Records a completed repository fetch in the ingest metrics and returns its result.
+        """
+        metrics.FETCH_PAGES.observe(result["pages_fetched"])
+        metrics.EVENTS_ADDED.inc(repo.name, amount=result["new_events"])
+        metrics.EVENTS_SKIPPED.inc(repo.name, amount=result["skipped_events"])
+        return result
+
+    @staticmethod
+    def _record_poll(poll_state, response, events_data=None, modified=True):
+        """
+        Stores the conditional-request state of a poll and bumps the 200/304 counters.
+        """
+        poll_interval = response.headers.get("X-Poll-Interval")
+        fields = {
+            "last_polled_at": now(),
+            "poll_interval": int(poll_interval) if poll_interval else poll_state.poll_interval,
         }
 
+        if modified:
+            fields["etag"] = response.headers.get("ETag", "")
+            fields["modified_count"] = F("modified_count") + 1
+            newest_id = max(filter(None, map(GitHubEventService._event_id, events_data or [])), default=None)
+            if newest_id and newest_id > (poll_state.last_event_id or 0):
+                fields["last_event_id"] = newest_id
+        else:
+            fields["not_modified_count"] = F("not_modified_count") + 1
+
+        RepositoryPollState.objects.filter(pk=poll_state.pk).update(**fields)
+
     @staticmethod
-    def _process_events(events_data, repo, min_date, event_limit):
+    def _process_events(events_data, repo, min_date, event_limit, high_water_mark=None):
         """
         Processes a batch of GitHub events.
 
+        Events arrive newest first, so once an event id at or below the repository's high-water mark
+        (the largest GitHub event id already stored) is reached, the rest of the page and all later
+        pages are known and processing stops without any existence query. Without a mark (new
+        repositories, rows stored before event ids were recorded) the page is checked against
+        stored events with one set query.
+
+        The page is written with a fixed number of queries: one lookup (or insert) for event types,
+        one grouped count per page, one bulk insert and the EventAggregate update. Only the rows the
+        insert actually added are counted and aggregated; the others count as skipped.
+
         Args:
             events_data (list): List of raw event JSON objects.
             repo: Repository instance.
             min_date (datetime): Earliest allowed event date.
             event_limit (int): Max events per (repo, event type).
+            high_water_mark (int): Largest GitHub event id already stored for the repository.
 
         Returns:
             tuple: (should_stop, events_added, events_skipped) flags.
         """
-        added, skipped_existing = 0, 0
+        should_stop, skipped_existing = False, 0
+        parsed = []
 
-        for event_json in events_data:
+        for index, event_json in enumerate(events_data):
             if GitHubEventService._event_data_invalid(event_json):
                 continue
 
+            event_id = GitHubEventService._event_id(event_json)
+
+            if high_water_mark is not None and event_id is not None and event_id <= high_water_mark:
+                should_stop = True
+                skipped_existing += len(events_data) - index
+                break
+
             created_at = GitHubEventService._normalize_datetime(event_json["created_at"])
 
             if created_at < min_date:
-                return True, added, skipped_existing
+                should_stop = True
+                break
 
-            event_type_str = event_json["type"]
+            parsed.append((event_id, event_json["type"], created_at))
 
-            if GitHubEventService._event_exists(repo, event_type_str, created_at):
-                skipped_existing += 1
-                continue
+        new_events = []
+
+        with transaction.atomic():
+            if parsed:
+                event_types = GitHubEventService.get_or_create_event_types({name for _, name, _ in parsed})
+                counts = GitHubEventService._event_counts(repo, event_types.values(), min_date)
+                known_ids, known_keys = (
+                    (set(), set()) if high_water_mark is not None
+                    else GitHubEventService._existing_events(repo, parsed)
+                )
+
+                for event_id, event_type_str, created_at in parsed:
+                    if event_id in known_ids or (event_type_str, created_at) in known_keys:
+                        skipped_existing += 1
+                        continue
+
+                    event_type_obj = event_types[event_type_str]
+
+                    if counts.get(event_type_obj.pk, 0) >= event_limit:
+                        should_stop = True
+                        break
 
-            event_type_obj = GitHubEventService.get_or_create_event_type(event_type_str)
+                    new_events.append(
+                        Event(repo=repo, event_type=event_type_obj, created_at=created_at, gh_event_id=event_id)
+                    )
+                    if event_id is not None:
+                        known_ids.add(event_id)
+                    else:
+                        known_keys.add((event_type_str, created_at))
+                    counts[event_type_obj.pk] = counts.get(event_type_obj.pk, 0) + 1
 
-            if GitHubEventService.reached_event_limit(repo, event_type_obj, event_limit):
-                return True, added, skipped_existing
+            # Rows stored meanwhile, or by a run that failed before saving its high-water mark, are dropped
+            inserted = GitHubEventService.save_events(new_events)
+            EventAggregateService.apply_new_events(repo, inserted)
 
-            GitHubEventService.save_event(repo, event_type_obj, created_at)
-            added += 1
+        added = len(inserted)
+        skipped_existing += len(new_events) - added
 
         if added == 0 and skipped_existing == len(events_data):
-            return True, added, skipped_existing
+            should_stop = True
 
-        return False, added, skipped_existing
+        return should_stop, added, skipped_existing
 
     @staticmethod
     def _normalize_datetime(date_str):
@@ -109,13 +232,35 @@ class GitHubEventService:
         return make_aware(dt) if dt and not is_aware(dt) else dt
 
     @staticmethod
-    def _event_exists(repo, event_type_str, created_at):
-        """Checks if event already exists."""
-        return Event.objects.filter(
-            repo=repo,
-            event_type__event_type=event_type_str,
-            created_at=created_at
-        ).exists()
+    def _event_id(event_json):
+        """Returns the numeric GitHub event id, or None if it is missing."""
+        event_id = str(event_json.get("id", ""))
+        return int(event_id) if event_id.isdigit() else None
+
+    @staticmethod
+    def _existing_events(repo, parsed):
+        """
+        Returns the stored GitHub event ids and, for rows stored without an id,
+        the (event_type string, created_at) pairs matching a parsed page.
+        The page's time range bounds the lookup (and the partitions it touches).
+        """
+        ids = [event_id for event_id, _, _ in parsed if event_id is not None]
+        timestamps = [created_at for _, _, created_at in parsed]
+        known_ids, known_keys = set(), set()
+
+        rows = (
+            Event.objects
+            .filter(repo=repo, created_at__range=(min(timestamps), max(timestamps)))
+            .filter(Q(gh_event_id__in=ids) | Q(gh_event_id__isnull=True, created_at__in=timestamps))
+            .values_list("gh_event_id", "event_type__event_type", "created_at")
+        )
+        for event_id, event_type_str, created_at in rows:
+            if event_id is not None:
+                known_ids.add(event_id)
+            else:
+                known_keys.add((event_type_str, created_at))
+
+        return known_ids, known_keys
 
     @staticmethod
     def _event_data_invalid(event_json):
@@ -123,22 +268,51 @@ class GitHubEventService:
         return not event_json.get("type") or not event_json.get("created_at")
 
     @staticmethod
-    def get_or_create_event_type(event_type_str):
-        """Gets or creates an EventType instance by name."""
-        return EventType.objects.get_or_create(event_type=event_type_str)[0]
+    def get_or_create_event_types(event_type_strs):
+        """Gets or creates EventType instances by name. Returns a dict keyed by name."""
+        event_types = {et.event_type: et for et in EventType.objects.filter(event_type__in=event_type_strs)}
+        missing = set(event_type_strs) - event_types.keys()
+
+        if missing:
+            EventType.objects.bulk_create(
+                [EventType(event_type=name) for name in missing], ignore_conflicts=True
+            )
+            event_types.update(
+                (et.event_type, et) for et in EventType.objects.filter(event_type__in=missing)
+            )
+
+        return event_types
 
     @staticmethod
-    def save_event(repo, event_type_obj, created_at):
-        """Saves a new event to the database."""
-        Event.objects.create(
-            repo=repo,
-            event_type=event_type_obj,
-            created_at=created_at
-        )
+    def save_events(events):
+        """
+        Saves new events to the database with one INSERT, ignoring rows that already exist.
+
+        Returns:
+            list: The Event instances actually inserted, with their ids.
+        """
+        if not events:
+            return []
+
+        values = ", ".join(["(%s, %s, %s, %s)"] * len(events))
+        params = [
+            value for event in events
+            for value in (event.repo_id, event.event_type_id, event.created_at, event.gh_event_id)
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(GitHubEventService.INSERT_SQL.format(table=Event._meta.db_table, values=values), params)
+            return [
+                Event(id=pk, repo_id=repo_id, event_type_id=event_type_id, created_at=created_at, gh_event_id=gh_id)
+                for pk, repo_id, event_type_id, created_at, gh_id in cursor.fetchall()
+            ]
 
     @staticmethod
-    def reached_event_limit(repo, event_type_obj, limit):
-        """Checks if the event limit per type/repo is reached."""
-        return Event.objects.filter(
-            repo=repo, event_type=event_type_obj
-        ).count() >= limit
+    def _event_counts(repo, event_type_objs, min_date):
+        """Returns the number of stored events since min_date per event type id for a repository."""
+        return dict(
+            Event.objects
+            .filter(repo=repo, event_type__in=event_type_objs, created_at__gte=min_date)
+            .order_by()
+            .values_list("event_type")
+            .annotate(count=Count("*"))
+        )
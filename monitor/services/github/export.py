@@ -0,0 +1,128 @@
+import csv
+import json
+from datetime import timezone
+
+from django.db.models import Q
+
+from monitor.models import Event, EventType
+
+
+class EventExportService:
+    """
+    Streams the raw events of a repository in (created_at, id) order.
+
+    Rows are read page by page with keyset pagination, each page through a server-side cursor,
+    so memory stays flat for any number of rows and no query holds a snapshot for the whole
+    export. Every row carries its created_at and id, which together resume an export (`after`).
+
+    Under ASGI the export view pulls each chunk through DatabaseExecutor, so consecutive chunks
+    may run on different pool threads and connections; it passes server_side=False there, which
+    fetches every page whole and bounds memory by page_size instead.
+    """
+
+    FIELDS = ("id", "gh_event_id", "repository", "event_type", "created_at")
+
+    @staticmethod
+    def iter_events(repo, since=None, until=None, after=None, limit=None, page_size=10_000, chunk_size=2000,
+                    server_side=True):
+        """
+        Yields event rows of <repo> ordered by (created_at, id).
+
+        Args:
+            repo: Repository instance.
+            since (datetime): Only events created at or after this time.
+            until (datetime): Only events created before this time.
+            after (tuple): (created_at, id) of the last row already received.
+            limit (int): Max number of rows (None: all).
+            page_size (int): Rows per keyset page (one query each).
+            chunk_size (int): Rows fetched per round trip from the server-side cursor.
+            server_side (bool): Read pages through a server-side cursor. Without one each page is
+                fetched whole, so no query state outlives it and consecutive pages may be read on
+                different connections (memory then grows with page_size).
+
+        Yields:
+            tuple: (id, gh_event_id, repository name, event type, created_at) per event.
+        """
+        event_types = dict(EventType.objects.values_list("id", "event_type"))
+        events = Event.objects.filter(repo=repo).order_by("created_at", "id")
+        if since:
+            events = events.filter(created_at__gte=since)
+        if until:
+            events = events.filter(created_at__lt=until)
+        events = events.values_list("id", "gh_event_id", "event_type_id", "created_at")
+
+        remaining = limit
+        while remaining is None or remaining > 0:
+            page = events
+            if after:
+                # (created_at, id) > after, as a range on the leading index column
+                created_at, event_id = after
+                page = page.filter(
+                    Q(created_at__gte=created_at) & (Q(created_at__gt=created_at) | Q(id__gt=event_id))
+                )
+
+            size = page_size if remaining is None else min(page_size, remaining)
+            rows = 0
+
+            page = page[:size]
+            for event_id, gh_event_id, event_type_id, created_at in (
+                page.iterator(chunk_size=chunk_size) if server_side else list(page)
+            ):
+                rows += 1
+                after = (created_at, event_id)
+                yield event_id, gh_event_id, repo.name, event_types.get(event_type_id), created_at
+
+            if remaining is not None:
+                remaining -= rows
+            if rows < size:
+                break
+
+    @staticmethod
+    def format_time(value):
+        """UTC ISO 8601 with a 'Z' suffix, safe to pass back in a query string."""
+        return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+    @staticmethod
+    def to_ndjson(rows, lines_per_chunk=1000):
+        """Renders rows as newline-delimited JSON, several lines per chunk."""
+        chunk = []
+
+        for row in rows:
+            record = dict(zip(EventExportService.FIELDS, row))
+            record["created_at"] = EventExportService.format_time(record["created_at"])
+            chunk.append(json.dumps(record, separators=(",", ":")))
+
+            if len(chunk) >= lines_per_chunk:
+                yield "\n".join(chunk) + "\n"
+                chunk = []
+
+        if chunk:
+            yield "\n".join(chunk) + "\n"
+
+    @staticmethod
+    def to_csv(rows, lines_per_chunk=1000):
+        """Renders rows as CSV with a header line, several lines per chunk."""
+        buffer = _LineBuffer()
+        writer = csv.writer(buffer)
+        writer.writerow(EventExportService.FIELDS)
+
+        for row in rows:
+            writer.writerow((*row[:-1], EventExportService.format_time(row[-1])))
+            if len(buffer.lines) >= lines_per_chunk:
+                yield buffer.flush()
+
+        yield buffer.flush()
+
+
+class _LineBuffer:
+    """File-like sink for csv.writer that hands out the written lines in chunks."""
+
+    def __init__(self):
+        self.lines = []
+
+    def write(self, value):
+        self.lines.append(value)
+
+    def flush(self):
+        chunk, self.lines = "".join(self.lines), []
+        return chunk
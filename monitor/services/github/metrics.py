@@ -0,0 +1,283 @@
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+
+
+class _Metric:
+    """
+    Base of the process-local metrics, in the Prometheus text exposition format.
+
+    Updates never take a lock: every thread writes its own shard (a dict keyed by the tuple of
+    label values, only ever touched by that thread), and a scrape sums the shards. Shards of
+    finished threads are folded into a retired total at scrape time, so counters never go
+    backwards and per-request threads (e.g. runserver's) do not pile up.
+
+    Each process has its own registry: the web server's /metrics covers the stats API, the
+    polling daemon serves its ingest metrics on --metrics-port.
+    """
+
+    type = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._local = threading.local()
+        self._shards = []  # (thread, shard)
+        self._retired = {}
+        self._lock = threading.Lock()  # taken once per thread and per scrape, never per update
+        REGISTRY.append(self)
+
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+            return shard
+
+    def _merged(self):
+        """Returns {label values: value} summed over all shards."""
+        with self._lock:
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    self._add(self._retired, shard)
+            self._shards = live
+
+            merged = {}
+            self._add(merged, self._retired)
+            for _, shard in live:
+                self._add(merged, shard.copy())
+            return merged
+
+    def _add(self, total, shard):
+        """Adds the values of <shard> to <total>."""
+        raise NotImplementedError
+
+    def _label_text(self, values, extra=""):
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labels, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def collect(self):
+        """Yields the exposition lines of this metric."""
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.type}"
+        yield from self._samples()
+
+    def _samples(self):
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """A monotonically increasing count, optionally per label values."""
+
+    type = "counter"
+
+    def inc(self, *labels, amount=1):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def _add(self, total, shard):
+        for labels, value in shard.items():
+            total[labels] = total.get(labels, 0) + value
+
+    def _samples(self):
+        for labels, value in sorted(self._merged().items()):
+            yield f"{self.name}{self._label_text(labels)} {_number(value)}"
+
+
+class Histogram(_Metric):
+    """
+    Observations counted into fixed buckets (upper bounds, inclusive), plus their sum and count.
+    A shard holds one list per label values: a count per bucket, the +Inf bucket, then the sum.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labels):
+        shard = self._shard()
+        counts = shard.get(labels)
+        if counts is None:
+            counts = shard[labels] = [0] * (len(self.buckets) + 2)
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def _add(self, total, shard):
+        for labels, counts in shard.items():
+            summed = total.setdefault(labels, [0] * (len(self.buckets) + 2))
+            for index, value in enumerate(list(counts)):
+                summed[index] += value
+
+    def _samples(self):
+        for labels, counts in sorted(self._merged().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts[:-1]):
+                cumulative += count
+                le = 'le="%s"' % (bound if bound == "+Inf" else _number(bound))
+                yield f"{self.name}_bucket{self._label_text(labels, le)} {cumulative}"
+            yield f"{self.name}_sum{self._label_text(labels)} {_number(counts[-1])}"
+            yield f"{self.name}_count{self._label_text(labels)} {cumulative}"
+
+
+class Gauge(_Metric):
+    """
+    A value read at scrape time from <callback>, which returns {label values: value}. With
+    cumulative=True the value only ever grows and is exposed as a counter.
+    """
+
+    type = "gauge"
+
+    def __init__(self, name, documentation, callback, labels=(), cumulative=False):
+        super().__init__(name, documentation, labels)
+        self.callback = callback
+        if cumulative:
+            self.type = "counter"
+
+    def _merged(self):
+        return self.callback()
+
+    def _samples(self):
+        for labels, value in sorted(self._merged().items()):
+            if value is not None:
+                yield f"{self.name}{self._label_text(labels)} {_number(value)}"
+
+
+class QueryCounter:
+    """
+    Database execute wrapper counting queries and the time spent in them:
+
+        with connection.execute_wrapper(counter := QueryCounter()):
+            ...
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render():
+    """Returns every registered metric in the Prometheus text format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.collect())
+    return "\n".join(lines) + "\n"
+
+
+def serve(port, host="0.0.0.0"):
+    """
+    Serves render() at /metrics on <port> from a daemon thread, for processes without a web server.
+
+    Returns:
+        ThreadingHTTPServer: The server (call shutdown() to stop it).
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+_quota_client = None
+
+
+def track_quota(client):
+    """Exports the rate-limit telemetry of <client> (see RateLimitScheduler.snapshot) as gauges."""
+    global _quota_client
+    _quota_client = client
+
+
+def _quota(field):
+    def read():
+        return {(): _quota_client.quota()[field]} if _quota_client else {}
+    return read
+
+
+REGISTRY = []
+
+# Ingest
+GITHUB_REQUEST_SECONDS = Histogram(
+    "github_request_duration_seconds", "GitHub API request latency by response status.", ("status",)
+)
+FETCH_PAGES = Histogram(
+    "monitor_fetch_pages", "Event pages requested per repository fetch.", buckets=COUNT_BUCKETS
+)
+EVENTS_ADDED = Counter("monitor_events_added_total", "Events stored, per repository.", ("repo",))
+EVENTS_SKIPPED = Counter(
+    "monitor_events_skipped_total", "Fetched events not stored (known, too old or over the limit), per repository.",
+    ("repo",),
+)
+for _field, _name, _documentation, _cumulative in (
+    ("limit", "limit", "GitHub rate limit per window.", False),
+    ("remaining", "remaining", "Requests left in the current GitHub rate-limit window.", False),
+    ("reset_in_seconds", "reset_in_seconds", "Seconds until the GitHub rate limit resets.", False),
+    ("blocked_for_seconds", "blocked_for_seconds", "Seconds until the scheduler hands out the next slot.", False),
+    ("waiting", "waiting", "Requests waiting for a rate-limit slot.", False),
+    ("delayed_requests", "delayed_requests_total", "Requests the scheduler held back.", True),
+    ("waited_seconds", "waited_seconds_total", "Seconds requests waited for a rate-limit slot.", True),
+    ("rate_limited_responses", "responses_total", "403/429 rate-limit answers received.", True),
+):
+    Gauge(f"github_rate_limit_{_name}", _documentation, _quota(_field), cumulative=_cumulative)
+
+# Stats API
+STATS_REQUEST_SECONDS = Histogram(
+    "monitor_stats_request_duration_seconds", "Stats API request latency.", ("endpoint",)
+)
+STATS_DB_QUERIES = Histogram(
+    "monitor_stats_db_queries", "Database queries per stats API request.", ("endpoint",), buckets=COUNT_BUCKETS
+)
+STATS_DB_SECONDS = Histogram(
+    "monitor_stats_db_duration_seconds", "Time spent in database queries per stats API request.", ("endpoint",)
+)
+STATS_GROUPS = Histogram(
+    "monitor_stats_groups", "(repository, event type) groups per computed stats payload.", buckets=SIZE_BUCKETS
+)
+STATS_CACHE = Counter(
+    "monitor_stats_cache_requests_total", "Stats cache lookups by result (hit or miss).", ("result",)
+)
@@ -0,0 +1,116 @@
+from django.conf import settings
+
+from monitor.migrations import _partitioning
+from monitor.models import Event
+
+
+class EventPartitionService:
+    """
+    Manages the optional range-partitioned layout of the Event table (PostgreSQL declarative
+    partitioning on created_at, one partition per day or week).
+
+    Converting keeps the existing table as the first partition (everything before the first
+    interval boundary), so no rows are copied. Its widened keys are built concurrently beforehand,
+    so under the lock it is only scanned to validate the bound. Later partitions are created as
+    standalone tables and attached, which only takes a light lock on the parent; a DEFAULT
+    partition catches events outside the pre-created range. Expired partitions are dropped by
+    EventRetentionService.
+
+    Primary and unique keys of a partitioned table must include the partition key, so they become
+    (id, created_at) and (gh_event_id, created_at); a GitHub event id always comes with the same
+    created_at, so deduplication is unchanged.
+
+    The DDL lives in monitor.migrations._partitioning, which migrations also run and which must
+    therefore not change; this class applies it to the live Event table and settings.
+    """
+
+    INTERVALS = _partitioning.INTERVALS
+
+    @staticmethod
+    def table():
+        return Event._meta.db_table
+
+    @staticmethod
+    def default_partition():
+        return _partitioning.default_partition(EventPartitionService.table())
+
+    @staticmethod
+    def is_partitioned(cursor=None):
+        """Checks whether the Event table is currently partitioned."""
+        return _partitioning.is_partitioned(EventPartitionService.table(), cursor)
+
+    @staticmethod
+    def interval_start(moment, interval):
+        """Returns the UTC start of the day (or ISO week) containing <moment>."""
+        return _partitioning.interval_start(moment, interval)
+
+    @staticmethod
+    def partitions(cursor=None):
+        """
+        Returns the range partitions of the Event table ordered by bound.
+
+        Returns:
+            list: (name, lower, upper) tuples; lower is None for the partition holding all
+            history before conversion. The DEFAULT partition is not included.
+        """
+        return _partitioning.partitions(EventPartitionService.table(), cursor)
+
+    @staticmethod
+    def convert(interval=None, ahead=None):
+        """
+        Converts the plain Event table into a partitioned one and pre-creates partitions
+        (default: EVENT_PARTITION_INTERVAL, EVENT_PARTITIONS_AHEAD days ahead).
+
+        Runs in one transaction holding an exclusive lock on the table. Existing indexes are
+        reused, and so are the unique indexes of the widened primary/unique keys, built without
+        blocking writes before the lock is taken. Inside an outer transaction (where indexes
+        cannot be built concurrently) the keys are built under the lock instead.
+        """
+        return _partitioning.convert(
+            EventPartitionService.table(),
+            interval or settings.EVENT_PARTITION_INTERVAL,
+            settings.EVENT_PARTITIONS_AHEAD if ahead is None else ahead,
+        )
+
+    @staticmethod
+    def create_partitions(interval=None, ahead=None):
+        """
+        Pre-creates partitions up to <ahead> days from now (default: EVENT_PARTITIONS_AHEAD).
+
+        Each partition is created as a standalone table, filled with any matching rows from the
+        DEFAULT partition and attached.
+
+        Returns:
+            list: Names of the partitions created.
+        """
+        return _partitioning.create_partitions(
+            EventPartitionService.table(),
+            interval or settings.EVENT_PARTITION_INTERVAL or "day",
+            settings.EVENT_PARTITIONS_AHEAD if ahead is None else ahead,
+        )
+
+    @staticmethod
+    def create_index(name, definition):
+        """
+        Builds an index on Event without blocking writes; must run outside a transaction.
+        On a partitioned table every partition's index is built concurrently and attached.
+        """
+        _partitioning.create_index(EventPartitionService.table(), name, definition)
+
+    @staticmethod
+    def drop_index(name):
+        """Drops an index created by create_index() (concurrently on a plain table)."""
+        _partitioning.drop_index(EventPartitionService.table(), name)
+
+    @staticmethod
+    def expired_partitions(cutoff):
+        """Returns the names of partitions whose rows are all older than <cutoff>."""
+        return [name for name, _, upper in EventPartitionService.partitions() if upper <= cutoff]
+
+    @staticmethod
+    def unpartition(model=Event, schema_editor=None):
+        """
+        Copies the partitioned Event table back into a plain table built from <model>
+        (the historical model when called from a migration).
+        """
+        _partitioning.unpartition(model, schema_editor)
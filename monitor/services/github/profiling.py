@@ -0,0 +1,121 @@
+import heapq
+import itertools
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+
+from monitor.services.github.metrics import QueryCounter
+
+# Profiles recording in the current context, for work handed to other threads (see record_active)
+_active = ContextVar("query_profiles", default=())
+
+
+class QueryProfile(QueryCounter):
+    """
+    Database execute wrapper recording query count, total query time and the <slowest> slowest
+    statements. One profile may be installed on the connections of several threads at once.
+    """
+
+    def __init__(self, slowest=5):
+        super().__init__()
+        self.keep = slowest
+        self._slowest = []  # min-heap of (seconds, ticket, sql)
+        self._tickets = itertools.count()
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.count += 1
+                self.seconds += elapsed
+                entry = (elapsed, next(self._tickets), sql)
+                if len(self._slowest) < self.keep:
+                    heapq.heappush(self._slowest, entry)
+                elif self.keep:
+                    heapq.heappushpop(self._slowest, entry)
+
+    @contextmanager
+    def record(self):
+        """
+        Installs the profile on every database connection of the current thread, and on those
+        of the threads that DatabaseExecutor runs work of the enclosed block on.
+        """
+        token = _active.set((*_active.get(), self))
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(self))
+                yield self
+        finally:
+            _active.reset(token)
+
+    def slowest(self):
+        """Returns [(milliseconds, sql)] of the slowest statements, slowest first."""
+        with self._lock:
+            return [(seconds * 1000, sql) for seconds, _, sql in sorted(self._slowest, reverse=True)]
+
+    def summary(self):
+        """Returns the profile as a dict: queries, db_ms and the slowest statements."""
+        return {
+            "queries": self.count,
+            "db_ms": round(self.seconds * 1000, 2),
+            "slowest": [{"ms": round(ms, 2), "sql": sql} for ms, sql in self.slowest()],
+        }
+
+    def server_timing(self, total_seconds=None):
+        """
+        Formats the profile as a Server-Timing header value: total time, database time and count,
+        then one entry per slow statement (shown by the browser's network panel).
+        """
+        entries = []
+        if total_seconds is not None:
+            entries.append(f"total;dur={total_seconds * 1000:.2f}")
+        entries.append(f'db;dur={self.seconds * 1000:.2f};desc="{self.count} queries"')
+        for index, (ms, sql) in enumerate(self.slowest(), 1):
+            description = " ".join(sql.split())[:100].replace("\\", "\\\\").replace('"', '\\"')
+            entries.append(f'sql-{index};dur={ms:.2f};desc="{description}"')
+        return ", ".join(entries)
+
+
+@contextmanager
+def record_active():
+    """
+    Installs the profiles recording in the caller's context on the current thread's connections,
+    for a thread that runs work on behalf of the caller (context variables travel with
+    sync_to_async, execute wrappers do not).
+    """
+    with ExitStack() as stack:
+        for profile in _active.get():
+            for connection in connections.all():
+                if profile not in connection.execute_wrappers:
+                    stack.enter_context(connection.execute_wrapper(profile))
+        yield
+
+
+@contextmanager
+def assert_max_queries(limit, label="Block"):
+    """
+    Fails with an AssertionError if the enclosed block issues more than <limit> queries,
+    naming the slowest statements:
+
+        with assert_max_queries(3, "/api/stats/"):
+            client.get("/api/stats/")
+
+    Queries of the current thread and of DatabaseExecutor calls made for the block are counted.
+    """
+    profile = QueryProfile()
+    with profile.record():
+        yield profile
+
+    if profile.count > limit:
+        statements = "\n".join(f"  {ms:.2f} ms: {' '.join(sql.split())}" for ms, sql in profile.slowest())
+        raise AssertionError(
+            f"{label} issued {profile.count} queries, the budget is {limit}. Slowest:\n{statements}"
+        )
@@ -0,0 +1,198 @@
+import heapq
+import itertools
+import threading
+import time
+
+from monitor.services.github.errors import RateLimitExceeded
+
+
+class RateLimitScheduler:
+    """
+    Hands out request slots for one GitHub token, shared by every thread (or task) of a client.
+
+    It tracks the quota GitHub reports in X-RateLimit-Limit/-Remaining/-Used/-Reset and schedules
+    requests against it:
+    - While more than <burst> calls are left above <reserve>, requests go out immediately.
+    - Below that, requests are spaced evenly so the rest of the quota lasts until the reset.
+    - With only <reserve> calls left, or after a 403/429 rate-limit answer, nothing goes out
+      until the reset (or Retry-After) time, and then right away.
+
+    Waiting requests are served lowest priority first. Callers pass the time a repository was
+    last polled, so the repository that has gone longest without fresh data gets the next slot.
+    A wait longer than <max_wait> seconds raises RateLimitExceeded instead of blocking.
+    """
+
+    SECONDARY_BACKOFF = 60  # seconds; doubled per secondary limit answered without Retry-After
+    MAX_SECONDARY_BACKOFF = 900
+
+    def __init__(self, reserve=0, burst=100, max_wait=60, clock=time.time):
+        self.reserve = reserve
+        self.burst = burst
+        self.max_wait = max_wait
+        self.clock = clock
+
+        # Quota as last reported by GitHub, minus the slots handed out since
+        self.limit = None
+        self.remaining = None
+        self.used = None
+        self.reset = None
+        self.blocked_until = 0.0
+
+        # Telemetry
+        self.requests = 0
+        self.delayed_requests = 0
+        self.waited_seconds = 0.0
+        self.rate_limited_responses = 0
+
+        self._next_slot = 0.0
+        self._secondary_backoff = self.SECONDARY_BACKOFF
+        self._waiters = []  # heap of (priority, ticket)
+        self._tickets = itertools.count()
+        self._condition = threading.Condition()
+
+    def acquire(self, priority=0):
+        """
+        Blocks until this caller may send a request (the lowest priority waiter goes first).
+
+        Raises:
+            RateLimitExceeded: If the next slot is more than max_wait seconds away.
+        """
+        with self._condition:
+            waiter = (priority, next(self._tickets))
+            heapq.heappush(self._waiters, waiter)
+            started = self.clock()
+            waited = False
+
+            try:
+                while True:
+                    now = self.clock()
+                    if self._waiters[0] != waiter:
+                        self._condition.wait()
+                        waited = True
+                        continue
+
+                    ready_at = self._ready_at(now)
+                    if ready_at <= now:
+                        break
+                    if ready_at - now > self.max_wait:
+                        raise RateLimitExceeded(ready_at)
+                    self._condition.wait(ready_at - now)
+                    waited = True
+            finally:
+                self._waiters.remove(waiter)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+
+            self._take_slot(now, now - started if waited else 0)
+
+    def reserve_slot(self):
+        """
+        Takes the next slot without blocking, for asyncio callers.
+
+        Returns:
+            float: Seconds to wait before sending the request.
+
+        Raises:
+            RateLimitExceeded: If the slot is more than max_wait seconds away.
+        """
+        with self._condition:
+            now = self.clock()
+            ready_at = max(now, self._ready_at(now))
+            if ready_at - now > self.max_wait:
+                raise RateLimitExceeded(ready_at)
+
+            self._take_slot(ready_at, ready_at - now)
+            return ready_at - now
+
+    def update(self, status_code, headers, message=""):
+        """
+        Records the quota reported by a response and detects rate-limit answers.
+
+        Args:
+            status_code (int): HTTP status of the response.
+            headers: Response headers (case-insensitive mapping).
+            message (str): Response body of a 403/429, to tell a secondary rate limit from a forbidden resource.
+
+        Returns:
+            float: Epoch time after which the request may be retried if it was rate limited, else None.
+        """
+        with self._condition:
+            now = self.clock()
+            remaining, reset = headers.get("X-RateLimit-Remaining"), headers.get("X-RateLimit-Reset")
+
+            if remaining is not None and reset is not None:
+                self.remaining, self.reset = int(remaining), int(reset)
+                limit, used = headers.get("X-RateLimit-Limit"), headers.get("X-RateLimit-Used")
+                if limit is not None:
+                    self.limit = int(limit)
+                self.used = int(used) if used is not None else self.limit and self.limit - self.remaining
+
+            retry_at = self._retry_at(status_code, headers, message, now, primary=remaining is not None)
+
+            if retry_at is None:
+                self._secondary_backoff = self.SECONDARY_BACKOFF
+            else:
+                self.rate_limited_responses += 1
+                self.blocked_until = max(self.blocked_until, retry_at)
+                self._condition.notify_all()
+
+            return retry_at
+
+    def _retry_at(self, status_code, headers, message, now, primary):
+        if status_code not in (403, 429):
+            return None
+
+        retry_after = headers.get("Retry-After")
+        if retry_after is not None:
+            return now + float(retry_after)
+        if primary and self.remaining == 0 and self.reset:
+            return float(self.reset)
+        if status_code == 429 or "rate limit" in message.lower():
+            # Secondary limit without a Retry-After: back off as GitHub recommends
+            retry_at = now + self._secondary_backoff
+            self._secondary_backoff = min(self.MAX_SECONDARY_BACKOFF, self._secondary_backoff * 2)
+            return retry_at
+
+        return None  # a plain 403 Forbidden
+
+    def _ready_at(self, now):
+        """Earliest time the next request may go out."""
+        ready_at = max(self.blocked_until, self._next_slot)
+
+        if self.remaining is not None and self.remaining <= self.reserve and self.reset and self.reset > now:
+            ready_at = max(ready_at, float(self.reset))
+        return ready_at
+
+    def _take_slot(self, at, waited):
+        self.requests += 1
+        if waited > 0:
+            self.delayed_requests += 1
+            self.waited_seconds += waited
+
+        if self.remaining is None:
+            return
+
+        self.remaining -= 1
+        available = self.remaining - self.reserve
+        if 0 < available < self.burst and self.reset and self.reset > at:
+            # Spread what is left of the quota evenly over the time until the reset
+            self._next_slot = at + (self.reset - at) / available
+
+    def snapshot(self):
+        """
+        Returns quota telemetry: GitHub's numbers and how the scheduler has been holding requests back.
+        """
+        with self._condition:
+            now = self.clock()
+            return {
+                "limit": self.limit,
+                "remaining": self.remaining,
+                "used": self.used,
+                "reset_in_seconds": round(max(0.0, self.reset - now), 1) if self.reset else None,
+                "blocked_for_seconds": round(max(0.0, self._ready_at(now) - now), 1),
+                "waiting": len(self._waiters),
+                "requests": self.requests,
+                "delayed_requests": self.delayed_requests,
+                "waited_seconds": round(self.waited_seconds, 3),
+                "rate_limited_responses": self.rate_limited_responses,
+            }
@@ -0,0 +1,142 @@
+import re
+
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils.text import slugify
+
+from monitor.models import Repository
+from monitor.services.github.api import GitHubAPIClient
+from monitor.services.github.cache import StatsCache
+from monitor.services.github.errors import GitHubAPIError
+
+NAME_RE = re.compile(r"(?:https?://github\.com/)?([A-Za-z0-9-]+/[A-Za-z0-9._-]+?)(?:\.git)?/?")
+
+
+class RepositoryImportService:
+    """
+    Adds repositories in bulk: names are resolved to GitHub ids with one GraphQL query per batch
+    (instead of one REST call per repository) and written with a single bulk insert.
+    """
+
+    @staticmethod
+    def parse_names(lines):
+        """
+        Extracts "owner/name" from lines of a repository list. Blank lines and "#" comments are skipped;
+        GitHub URLs are accepted too.
+
+        Returns:
+            tuple: (names in file order without duplicates, lines that are not repository names).
+        """
+        names, invalid = {}, []
+
+        for line in lines:
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+
+            match = NAME_RE.fullmatch(line)
+            if match:
+                names.setdefault(match.group(1).lower(), match.group(1))
+            else:
+                invalid.append(line)
+
+        return list(names.values()), invalid
+
+    @staticmethod
+    def resolve_ids(names, client, batch_size=50):
+        """
+        Looks up GitHub ids with aliased `repository` fields, <batch_size> repositories per GraphQL query.
+
+        Returns:
+            tuple: ({lowercased requested name: (canonical "owner/name", GitHub id)}, names that were not found).
+        """
+        resolved, missing = {}, []
+
+        for start in range(0, len(names), batch_size):
+            batch = names[start:start + batch_size]
+            fields, variables, declarations = [], {}, []
+
+            for index, name in enumerate(batch):
+                variables[f"o{index}"], variables[f"n{index}"] = name.split("/", 1)
+                declarations.append(f"$o{index}: String!, $n{index}: String!")
+                fields.append(f"r{index}: repository(owner: $o{index}, name: $n{index}) {{ databaseId nameWithOwner }}")
+
+            query = f"query ({', '.join(declarations)}) {{ {' '.join(fields)} }}"
+            response = client.graphql(query, variables)
+            if response.status_code != 200:
+                raise GitHubAPIError(response.status_code)
+
+            data = response.json().get("data") or {}
+            for index, name in enumerate(batch):
+                repo = data.get(f"r{index}")
+                if repo and repo.get("databaseId"):
+                    resolved[name.lower()] = (repo["nameWithOwner"], repo["databaseId"])
+                else:
+                    missing.append(name)
+
+        return resolved, missing
+
+    @staticmethod
+    def import_repositories(names, activate=False, client=None, batch_size=50):
+        """
+        Creates the repositories of <names> that do not exist yet and, with <activate>, activates all of them.
+
+        Everything happens in one transaction: if the activation would exceed MAX_ACTIVE_REPOSITORIES,
+        nothing is imported (django.db.IntegrityError).
+
+        Returns:
+            dict: created, existing and activated counts, the names GitHub did not know (unresolved)
+            and the number of repositories skipped because their slug is taken (conflicts).
+        """
+        client = client or GitHubAPIClient()
+        existing = RepositoryImportService._stored(names=names)
+        resolved, unresolved = RepositoryImportService.resolve_ids(
+            [name for name in names if name.lower() not in existing], client, batch_size
+        )
+
+        with transaction.atomic():
+            # Renamed repositories resolve to a stored name or id
+            existing.update(RepositoryImportService._stored(
+                names=[name for name, _ in resolved.values()], gh_repo_ids=[gh_id for _, gh_id in resolved.values()]
+            ))
+            new = [
+                (name, gh_repo_id) for name, gh_repo_id in resolved.values()
+                if name.lower() not in existing and gh_repo_id not in existing
+            ]
+
+            Repository.objects.bulk_create(
+                [Repository(name=name, slug=slugify(name), gh_repo_id=gh_repo_id, active=activate)
+                 for name, gh_repo_id in new],
+                ignore_conflicts=True,  # a slug taken by another repository
+            )
+            created = Repository.objects.filter(gh_repo_id__in=[gh_repo_id for _, gh_repo_id in new]).count()
+
+            activated = 0
+            if activate:
+                # One statement, so the active-repository cap trigger counts once
+                activated = Repository.objects.filter(pk__in=set(existing.values()), active=False).update(active=True)
+
+            if created or activated:
+                StatsCache.bump()
+
+        return {
+            "created": created,
+            "existing": len(set(existing.values())),
+            "activated": activated + (created if activate else 0),
+            "unresolved": unresolved,
+            "conflicts": len(new) - created,
+        }
+
+    @staticmethod
+    def _stored(names=(), gh_repo_ids=()):
+        """Returns {lowercased name: pk, GitHub id: pk} of stored repositories matching either."""
+        stored = {}
+        rows = (
+            Repository.objects.annotate(lower_name=Lower("name"))
+            .filter(Q(lower_name__in=[name.lower() for name in names]) | Q(gh_repo_id__in=gh_repo_ids))
+            .values_list("pk", "lower_name", "gh_repo_id")
+        )
+        for pk, lower_name, gh_repo_id in rows:
+            stored[lower_name] = stored[gh_repo_id] = pk
+        return stored
@@ -0,0 +1,201 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.timezone import now
+
+from monitor.models import Event, EventAggregate, EventDailyRollup
+from monitor.services.github.cache import StatsCache
+from monitor.services.github.partitions import EventPartitionService
+
+
+class EventRetentionService:
+    """
+    Deletes expired Event rows in bounded batches, optionally folding them into daily rollups first.
+
+    Every batch is one short statement in its own transaction: it locks at most <batch_size> rows
+    (skipping rows locked by concurrent writers), writes the rollups, adjusts the EventAggregate
+    counters and deletes the rows. When Event is partitioned, partitions that expired as a whole
+    are dropped instead of deleted row by row.
+    """
+
+    # Folds the rows of <source> into daily rollups and decrements the group counters.
+    FOLD_SQL = """
+        per_day AS (
+            SELECT repo_id, event_type_id, (created_at AT TIME ZONE 'UTC')::date AS day,
+                   COUNT(*) AS n, MIN(created_at) AS first_at, MAX(created_at) AS last_at
+            FROM {source}
+            GROUP BY 1, 2, 3
+        ),
+        rolled_up AS (
+            INSERT INTO {rollup_table} (repo_id, event_type_id, day, event_count, first_event_at, last_event_at)
+            SELECT repo_id, event_type_id, day, n, first_at, last_at
+            FROM per_day
+            WHERE %(rollup)s
+            ON CONFLICT (repo_id, event_type_id, day) DO UPDATE SET
+                event_count = {rollup_table}.event_count + EXCLUDED.event_count,
+                first_event_at = LEAST({rollup_table}.first_event_at, EXCLUDED.first_event_at),
+                last_event_at = GREATEST({rollup_table}.last_event_at, EXCLUDED.last_event_at)
+            RETURNING 1
+        ),
+        counted AS (
+            UPDATE {aggregate_table} a
+            SET event_count = GREATEST(a.event_count - g.n, 0)
+            FROM (SELECT repo_id, event_type_id, SUM(n) AS n FROM per_day GROUP BY 1, 2) g
+            WHERE a.repo_id = g.repo_id AND a.event_type_id = g.event_type_id
+            RETURNING 1
+        )
+    """
+
+    PRUNE_SQL = """
+        WITH doomed AS (
+            SELECT id FROM {event_table}
+            WHERE created_at < %(cutoff)s
+            LIMIT %(batch_size)s
+            FOR UPDATE SKIP LOCKED
+        ),
+        deleted AS (
+            DELETE FROM {event_table} e
+            USING doomed d
+            WHERE e.id = d.id
+            RETURNING e.repo_id, e.event_type_id, e.created_at
+        ),
+        {fold}
+        SELECT (SELECT COUNT(*) FROM deleted), (SELECT COUNT(*) FROM rolled_up)
+    """
+
+    # A whole expired partition is folded with one scan, then detached and dropped in O(1).
+    DROP_PARTITION_SQL = """
+        WITH {fold}
+        SELECT (SELECT COALESCE(SUM(n), 0) FROM per_day), (SELECT COUNT(*) FROM rolled_up)
+    """
+
+    # Groups pruned down to nothing no longer exist in Event.
+    DROP_EMPTY_SQL = """
+        DELETE FROM {aggregate_table} WHERE event_count = 0
+    """
+
+    # Pruned groups start at a later event now; each lookup is one probe of the (repo, type, created_at) index.
+    FIX_FIRST_EVENT_SQL = """
+        UPDATE {aggregate_table} a
+        SET first_event_at = (
+            SELECT MIN(e.created_at) FROM {event_table} e
+            WHERE e.repo_id = a.repo_id AND e.event_type_id = a.event_type_id
+        )
+        WHERE a.first_event_at < %(cutoff)s
+    """
+
+    @staticmethod
+    def prune(days=None, batch_size=5000, rollup=True, max_batches=None, log=None):
+        """
+        Deletes events older than <days> days (default: EVENT_RETENTION_DAYS).
+
+        The retention period cannot be shorter than the stats window (EVENT_DAYS_LIMIT): the
+        aggregates' windows are not adjusted for pruned rows.
+
+        Args:
+            days (int): Retention period in days.
+            batch_size (int): Max rows deleted per batch/transaction.
+            rollup (bool): Fold deleted rows into EventDailyRollup before deleting them.
+            max_batches (int): Stop after this many batches (None: until nothing is left).
+            log (callable): Receives one line per batch.
+
+        Returns:
+            dict: Rows pruned, batches run and total seconds spent.
+
+        Raises:
+            ValueError: If <days> is shorter than EVENT_DAYS_LIMIT.
+        """
+        days = days or settings.EVENT_RETENTION_DAYS
+        if days < settings.EVENT_DAYS_LIMIT:
+            raise ValueError(
+                f"Retention period of {days} days is shorter than the {settings.EVENT_DAYS_LIMIT}-day stats window"
+            )
+        cutoff = now() - timedelta(days=days)
+        tables = {
+            "event_table": Event._meta.db_table,
+            "rollup_table": EventDailyRollup._meta.db_table,
+            "aggregate_table": EventAggregate._meta.db_table,
+        }
+        params = {"cutoff": cutoff, "batch_size": batch_size, "rollup": rollup}
+        batches, started = 0, time.perf_counter()
+        pruned = EventRetentionService.drop_expired_partitions(cutoff, rollup, log)
+
+        # Rows outside whole expired partitions (or in a plain table) go in batches
+        prune_sql = EventRetentionService.PRUNE_SQL.format(
+            fold=EventRetentionService.FOLD_SQL.format(source="deleted", **tables), **tables
+        )
+
+        with connection.cursor() as cursor:
+            while max_batches is None or batches < max_batches:
+                batch_started = time.perf_counter()
+                cursor.execute(prune_sql, params)
+                deleted, rollups = cursor.fetchone()
+
+                if not deleted:
+                    break
+
+                pruned += deleted
+                batches += 1
+                if log:
+                    log(
+                        f"✓ batch {batches}: {deleted} rows pruned ({rollups} rollup rows) "
+                        f"in {time.perf_counter() - batch_started:.3f}s"
+                    )
+
+            if pruned:
+                cursor.execute(EventRetentionService.DROP_EMPTY_SQL.format(**tables))
+                cursor.execute(EventRetentionService.FIX_FIRST_EVENT_SQL.format(**tables), params)
+                StatsCache.bump()
+
+        return {"pruned": pruned, "batches": batches, "seconds": time.perf_counter() - started}
+
+    @staticmethod
+    def drop_expired_partitions(cutoff, rollup=True, log=None):
+        """
+        Drops every Event partition whose rows are all older than <cutoff> (no-op for a plain table).
+
+        Returns:
+            int: Number of rows pruned.
+        """
+        pruned = 0
+
+        for partition in EventPartitionService.expired_partitions(cutoff):
+            started = time.perf_counter()
+            deleted, rollups = EventRetentionService.drop_partition(partition, rollup)
+
+            pruned += deleted
+            if log:
+                log(
+                    f"✓ partition {partition} dropped: {deleted} rows pruned ({rollups} rollup rows) "
+                    f"in {time.perf_counter() - started:.3f}s"
+                )
+
+        return pruned
+
+    @staticmethod
+    def drop_partition(partition, rollup=True):
+        """
+        Folds an expired Event partition into the rollups and counters, then drops it.
+
+        Returns:
+            tuple: (rows pruned, rollup rows written).
+        """
+        tables = {
+            "rollup_table": EventDailyRollup._meta.db_table,
+            "aggregate_table": EventAggregate._meta.db_table,
+        }
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                EventRetentionService.DROP_PARTITION_SQL.format(
+                    fold=EventRetentionService.FOLD_SQL.format(source=partition, **tables)
+                ),
+                {"rollup": rollup},
+            )
+            deleted, rollups = cursor.fetchone()
+            cursor.execute(f"ALTER TABLE {Event._meta.db_table} DETACH PARTITION {partition}")
+            cursor.execute(f"DROP TABLE {partition}")
+
+        return int(deleted), rollups
@@ -0,0 +1,330 @@
+import math
+import struct
+import time
+from contextlib import contextmanager, nullcontext
+
+import numpy as np
+from django.db import connection, transaction
+from django.db.models import Min
+from django.utils.text import slugify
+from django.utils.timezone import now
+
+from monitor.models import Event, EventType, Repository
+from monitor.services.github.aggregates import EventAggregateService
+from monitor.services.github.partitions import EventPartitionService
+
+
+class _CopyStream:
+    """File-like object over an iterable of byte strings, as read by cursor.copy_expert."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = memoryview(b"")
+
+    def read(self, size=-1):
+        while not len(self._buffer):
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return b""
+            self._buffer = memoryview(chunk)
+
+        size = len(self._buffer) if size is None or size < 0 else size
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data.tobytes()
+
+
+class SyntheticEventService:
+    """
+    Generates large, reproducible event datasets for benchmarks and local development.
+
+    Event times are bursty like GitHub's: each (repository, event type) group's events arrive in
+    bursts of about <burst_size> events (a push, then its CI, review and comment events) about
+    <burst_gap> seconds apart. Burst starts follow a daily cycle peaking in the (UTC) afternoon,
+    with quieter weekends.
+
+    Rows are generated with numpy, oldest first, one time slice of about CHUNK_ROWS rows at a time,
+    and streamed into PostgreSQL with a binary COPY: no model instances, no per-row INSERT
+    and flat memory for any dataset size. Loads of at least half the table's size also skip the
+    per-row index and foreign key maintenance (see deferred_indexes).
+    """
+
+    CHUNK_ROWS = 500_000
+    EVENT_TYPES = (
+        "PushEvent", "PullRequestEvent", "IssueCommentEvent", "IssuesEvent", "WatchEvent",
+        "PullRequestReviewEvent", "PullRequestReviewCommentEvent", "CreateEvent", "DeleteEvent", "ForkEvent",
+        "ReleaseEvent", "CommitCommentEvent", "GollumEvent", "MemberEvent", "PublicEvent",
+    )
+    PEAK_HOUR = 15  # UTC
+    DAILY_SWING = 0.6  # Night activity is (1 - swing) / (1 + swing) of the peak's
+    WEEKEND_FACTOR = 0.5
+
+    # PostgreSQL binary COPY: header, then per row the field count and (length, value) per field
+    COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+    COPY_TRAILER = struct.pack("!h", -1)
+    COPY_ROW = np.dtype([
+        ("fields", ">i2"),
+        ("repo_id_size", ">i4"), ("repo_id", ">i8"),
+        ("event_type_id_size", ">i4"), ("event_type_id", ">i8"),
+        ("created_at_size", ">i4"), ("created_at", ">i8"),
+        ("gh_event_id_size", ">i4"), ("gh_event_id", ">i8"),
+    ])
+    PG_EPOCH_US = 946_684_800 * 1_000_000  # 2000-01-01 UTC, the origin of binary timestamps
+
+    @staticmethod
+    def event_type_names(count):
+        """Returns <count> event type names: GitHub's own first, then SyntheticEvent<i>."""
+        names = list(SyntheticEventService.EVENT_TYPES[:count])
+        names += [f"SyntheticEvent{i}" for i in range(count - len(names))]
+        return names
+
+    @staticmethod
+    def _activity_times(uniform, start, end):
+        """
+        Maps uniform samples in [0, 1) to times (µs since the Unix epoch) in [start, end),
+        distributed by the daily and weekly activity cycle.
+        """
+        grid = np.linspace(start, end, max(2, int((end - start) // 600_000_000) + 1))  # 10 minute steps
+        hours = grid / 3_600_000_000 % 24
+        weekdays = (grid // 86_400_000_000 + 3) % 7  # 1970-01-01 was a Thursday, Monday is 0
+        intensity = 1 + SyntheticEventService.DAILY_SWING * np.cos(
+            2 * np.pi * (hours - SyntheticEventService.PEAK_HOUR) / 24
+        )
+        intensity *= np.where(weekdays >= 5, SyntheticEventService.WEEKEND_FACTOR, 1.0)
+        cdf = np.concatenate(([0.0], np.cumsum((intensity[1:] + intensity[:-1]) / 2)))
+        return np.interp(uniform, cdf / cdf[-1], grid)
+
+    @staticmethod
+    def generate(groups, events_per_group, days, end=None, burst_size=20, burst_gap=60, seed=0, first_id=1):
+        """
+        Generates <events_per_group> events for each (repo_id, event_type_id) of <groups>,
+        over the <days> days before <end> (default: now).
+
+        Every group gets exactly <events_per_group> events. gh_event_id grows with created_at,
+        as on GitHub, starting at <first_id>. The same arguments produce the same rows.
+
+        Yields:
+            tuple: Arrays (repo_id, event_type_id, created_at in µs since the Unix epoch, gh_event_id)
+            per time slice, oldest slice first, each sorted by created_at.
+        """
+        rng = np.random.default_rng(seed)
+        groups = np.asarray(groups, dtype=np.int64).reshape(-1, 2)
+        end = end or now()
+        end_us = int(end.timestamp()) * 1_000_000 + end.microsecond
+        start_us = end_us - int(days * 86_400_000_000)
+
+        slices = max(1, math.ceil(len(groups) * events_per_group / SyntheticEventService.CHUNK_ROWS))
+        # Each group's events are split over the slices, so every slice can be generated and sorted on its own
+        counts = rng.multinomial(events_per_group, np.full(slices, 1 / slices), size=len(groups))
+        bounds = np.linspace(start_us, end_us, slices + 1).astype(np.int64)
+        next_id = first_id
+
+        for index in range(slices):
+            low, high = bounds[index], bounds[index + 1]
+            sizes = counts[:, index]
+            group_of = np.repeat(np.arange(len(groups)), sizes)
+
+            # Bursts of the slice, numbered group by group
+            bursts = np.maximum(1, np.rint(sizes / burst_size)).astype(np.int64)
+            first_burst = np.concatenate(([0], np.cumsum(bursts)[:-1]))
+            burst_starts = SyntheticEventService._activity_times(rng.random(bursts.sum()), low, high)
+            burst_lengths = rng.exponential(burst_size * burst_gap * 1_000_000, bursts.sum())
+
+            # Each event joins one of its group's bursts, at a uniform offset within it
+            burst_of = first_burst[group_of] + (rng.random(len(group_of)) * bursts[group_of]).astype(np.int64)
+            created = burst_starts[burst_of] + rng.random(len(group_of)) * burst_lengths[burst_of]
+            created = (low + (created - low) % (high - low)).astype(np.int64)  # bursts running past the slice wrap
+
+            order = np.argsort(created, kind="stable")
+            group_of = group_of[order]
+            yield (
+                groups[group_of, 0],
+                groups[group_of, 1],
+                created[order],
+                np.arange(next_id, next_id + len(order), dtype=np.int64),
+            )
+            next_id += len(order)
+
+    @staticmethod
+    def _copy_chunks(slices):
+        """Encodes generated slices as PostgreSQL binary COPY data."""
+        yield SyntheticEventService.COPY_HEADER
+        for repo_ids, event_type_ids, created, gh_event_ids in slices:
+            rows = np.empty(len(repo_ids), dtype=SyntheticEventService.COPY_ROW)
+            rows["fields"] = 4
+            for field, values in (
+                ("repo_id", repo_ids),
+                ("event_type_id", event_type_ids),
+                ("created_at", created - SyntheticEventService.PG_EPOCH_US),
+                ("gh_event_id", gh_event_ids),
+            ):
+                rows[f"{field}_size"] = 8
+                rows[field] = values
+            yield rows.tobytes()
+        yield SyntheticEventService.COPY_TRAILER
+
+    @staticmethod
+    def copy_events(slices):
+        """
+        Streams generated slices (see generate) into the Event table with one binary COPY.
+
+        Returns:
+            int: Number of rows written.
+        """
+        written = 0
+
+        def counted():
+            nonlocal written
+            for repo_ids, *columns in slices:
+                written += len(repo_ids)
+                yield repo_ids, *columns
+
+        sql = (
+            f"COPY {Event._meta.db_table} (repo_id, event_type_id, created_at, gh_event_id) "
+            "FROM STDIN WITH (FORMAT binary)"
+        )
+        with connection.cursor() as cursor:
+            cursor.copy_expert(sql, _CopyStream(SyntheticEventService._copy_chunks(counted())), 1 << 20)
+        return written
+
+    @staticmethod
+    @contextmanager
+    def deferred_indexes():
+        """
+        Drops the Event table's indexes, keys and foreign keys for the enclosed block and recreates
+        them at its end, as PostgreSQL recommends for bulk loads: one sort per index and one
+        validating join per foreign key instead of per-row index updates and trigger checks.
+
+        Must run inside a transaction, which holds an exclusive lock on the table until it ends;
+        on error the rollback restores everything.
+        """
+        table = Event._meta.db_table
+        with connection.cursor() as cursor:
+            # Foreign keys first, so they are dropped before and added after the keys
+            cursor.execute(
+                "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+                "WHERE conrelid = %s::regclass AND contype IN ('p', 'u', 'f') ORDER BY contype = 'f' DESC, conname",
+                [table],
+            )
+            constraints = cursor.fetchall()
+            cursor.execute(
+                "SELECT indexrelid::regclass::text, pg_get_indexdef(indexrelid) FROM pg_index i "
+                "WHERE indrelid = %s::regclass "
+                "AND NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conindid = i.indexrelid)",
+                [table],
+            )
+            indexes = cursor.fetchall()
+
+            for name, _ in constraints:
+                cursor.execute(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"')
+            for name, _ in indexes:
+                cursor.execute(f"DROP INDEX {name}")
+
+        yield
+
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL maintenance_work_mem = '256MB'")
+            for name, definition in reversed(constraints):
+                cursor.execute(f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition}')
+            for _, definition in indexes:
+                cursor.execute(definition)
+
+    @staticmethod
+    def repositories(count, prefix="synthetic"):
+        """
+        Returns <count> repositories named <prefix>/repo-<i>, creating the missing ones (inactive)
+        with negative GitHub ids below any in use.
+        """
+        names = [f"{prefix}/repo-{i}" for i in range(count)]
+        existing = Repository.objects.in_bulk(names, field_name="name")
+        lowest = min(Repository.objects.aggregate(lowest=Min("gh_repo_id"))["lowest"] or 0, 0)
+
+        missing = [name for name in names if name not in existing]
+        created = Repository.objects.bulk_create([
+            Repository(name=name, slug=slugify(name), gh_repo_id=lowest - i, active=False)
+            for i, name in enumerate(missing, 1)
+        ])
+        existing.update((repo.name, repo) for repo in created)
+        return [existing[name] for name in names]
+
+    @staticmethod
+    def clear(prefix="synthetic"):
+        """
+        Deletes the <prefix>/ repositories and all their rows. Events are removed with one
+        DELETE instead of through the ORM's cascade, which would load every event first.
+
+        Returns:
+            int: Number of events deleted.
+        """
+        repos = Repository.objects.filter(name__startswith=f"{prefix}/")
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {Event._meta.db_table} WHERE repo_id = ANY(%s)",
+                    [list(repos.values_list("pk", flat=True))],
+                )
+                deleted = cursor.rowcount
+            repos.delete()
+        return deleted
+
+    @staticmethod
+    def load(repos, event_types, events_per_group, days, prefix="synthetic", activate=False,
+             burst_size=20, burst_gap=60, seed=0, defer_indexes=None):
+        """
+        Adds <events_per_group> bursty events over the last <days> days for each of <event_types>
+        event types in each of <repos> <prefix>/repo-<i> repositories, then refreshes the planner
+        statistics and the event aggregates (which also invalidates the stats cache). Like the
+        repositories, the events get negative GitHub ids below any in use, so events fetched from
+        GitHub later never collide with them.
+
+        With <activate>, the repositories are activated (subject to MAX_ACTIVE_REPOSITORIES,
+        django.db.IntegrityError when over it, and nothing is loaded).
+
+        <defer_indexes> (default: when the load is at least half the size of the table, which is
+        not partitioned) rebuilds the indexes after the COPY instead of maintaining them row by row,
+        locking the table for the whole load.
+
+        Returns:
+            dict: events, groups, seconds (COPY and index rebuild), events_per_second and indexes_deferred.
+        """
+        total = repos * event_types * events_per_group
+        if defer_indexes is None:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_stat_get_live_tuples(%s::regclass)", [Event._meta.db_table])
+                defer_indexes = total * 2 >= cursor.fetchone()[0] and not EventPartitionService.is_partitioned()
+
+        with transaction.atomic():
+            repo_objs = SyntheticEventService.repositories(repos, prefix)
+            if activate:
+                Repository.objects.filter(pk__in=[repo.pk for repo in repo_objs]).update(active=True)
+
+            type_objs = [
+                EventType.objects.get_or_create(event_type=name)[0]
+                for name in SyntheticEventService.event_type_names(event_types)
+            ]
+            groups = [(repo.pk, event_type.pk) for repo in repo_objs for event_type in type_objs]
+            # Negative ids below any in use, so real (positive) GitHub event ids can never collide with them
+            lowest = min(Event.objects.aggregate(lowest=Min("gh_event_id"))["lowest"] or 0, 0)
+            first_id = lowest - total
+
+            started = time.perf_counter()
+            with SyntheticEventService.deferred_indexes() if defer_indexes else nullcontext():
+                written = SyntheticEventService.copy_events(
+                    SyntheticEventService.generate(
+                        groups, events_per_group, days, burst_size=burst_size, burst_gap=burst_gap,
+                        seed=seed, first_id=first_id,
+                    )
+                )
+            elapsed = time.perf_counter() - started
+
+        # Plan against the loaded rows, not the statistics of an emptier table
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Event._meta.db_table}")
+        EventAggregateService.rebuild()
+
+        return {
+            "events": written,
+            "groups": len(groups),
+            "seconds": round(elapsed, 3),
+            "events_per_second": round(written / elapsed) if elapsed else None,
+            "indexes_deferred": defer_indexes,
+        }
@@ -0,0 +1,116 @@
+import math
+import re
+from datetime import datetime, timedelta, timezone
+
+from django.db import connection
+from django.utils.timezone import now
+
+from monitor.models import Event, EventType
+
+
+class ActivitySeriesService:
+    """
+    Builds per-event-type activity series of a repository: event count and mean interval per time bucket.
+
+    Buckets are aggregated in PostgreSQL (date_bin, a date_trunc to any bucket size, and GROUP BY),
+    so only one row per non-empty (event type, bucket) leaves the database.
+    The series are columnar and sparse: per event type, the indexes of the non-empty buckets and
+    one array per value, with bucket i starting at start + i * bucket_seconds.
+    """
+
+    BUCKET_RE = re.compile(r"(\d+)([mhdw])")
+    BUCKET_UNITS = {"m": 60, "h": 3600, "d": 86_400, "w": 604_800}
+    MAX_BUCKETS = 10_000
+    # Bucket boundaries are aligned to midnight UTC (weeks start on Monday)
+    ORIGIN = datetime(2000, 1, 3, tzinfo=timezone.utc)
+
+    # Grouped on integer and timestamp keys; epochs are only computed for the (fewer) bucket rows
+    SERIES_SQL = """
+        SELECT event_type_id, EXTRACT(EPOCH FROM bucket_start)::bigint, event_count, EXTRACT(EPOCH FROM span)::float8
+        FROM (
+            SELECT e.event_type_id, date_bin(%(bucket)s, e.created_at, %(origin)s) AS bucket_start,
+                   COUNT(*) AS event_count, MAX(e.created_at) - MIN(e.created_at) AS span
+            FROM {event_table} e
+            WHERE e.repo_id = %(repo_id)s AND e.created_at >= %(start)s AND e.created_at < %(end)s
+            GROUP BY e.event_type_id, bucket_start
+        ) buckets
+        ORDER BY event_type_id, bucket_start
+    """
+
+    @staticmethod
+    def parse_bucket(bucket):
+        """
+        Parses a bucket size such as "15m", "1h", "1d" or "1w".
+
+        Returns:
+            timedelta: The bucket size.
+
+        Raises:
+            ValueError: If the size is malformed or empty.
+        """
+        match = ActivitySeriesService.BUCKET_RE.fullmatch(bucket.strip())
+        if not match or not int(match.group(1)):
+            raise ValueError(f"Invalid bucket: {bucket} (expected e.g. 15m, 1h, 1d or 1w)")
+        return timedelta(seconds=int(match.group(1)) * ActivitySeriesService.BUCKET_UNITS[match.group(2)])
+
+    @staticmethod
+    def get_series(repo, bucket, days, end=None):
+        """
+        Aggregates the events of the last <days> days of <repo> into <bucket>-sized buckets.
+
+        The first bucket starts at the bucket boundary at or before end - days, the last one
+        contains <end> (default: now). The mean interval of a bucket only spans the intervals
+        between its own events (span / (count - 1)), None for buckets with a single event.
+
+        Returns:
+            dict: repository, repository_slug, bucket_seconds, start (ISO 8601), buckets
+            (number of buckets) and series: {event type: {"bucket_index": [...],
+            "event_count": [...], "average_interval_seconds": [...]}}.
+
+        Raises:
+            ValueError: If the range holds more than MAX_BUCKETS buckets.
+        """
+        end = end or now()
+        origin = ActivitySeriesService.ORIGIN
+        start = origin + (end - timedelta(days=days) - origin) // bucket * bucket
+        buckets = math.ceil((end - start) / bucket) or 1
+        if buckets > ActivitySeriesService.MAX_BUCKETS:
+            raise ValueError(
+                f"{buckets} buckets requested, at most {ActivitySeriesService.MAX_BUCKETS} are allowed; "
+                "use a larger bucket or fewer days."
+            )
+
+        sql = ActivitySeriesService.SERIES_SQL.format(event_table=Event._meta.db_table)
+        params = {
+            "bucket": bucket,
+            "origin": origin,
+            "start": start,
+            "end": end,
+            "repo_id": repo.pk,
+        }
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+
+        event_types = dict(EventType.objects.values_list("id", "event_type"))
+        start_epoch, bucket_seconds = int(start.timestamp()), int(bucket.total_seconds())
+        series = {}
+
+        for event_type_id, bucket_start, event_count, span in rows:
+            columns = series.setdefault(
+                event_types[event_type_id], {"bucket_index": [], "event_count": [], "average_interval_seconds": []}
+            )
+            columns["bucket_index"].append((bucket_start - start_epoch) // bucket_seconds)
+            columns["event_count"].append(event_count)
+            columns["average_interval_seconds"].append(
+                round(span / (event_count - 1), 3) if event_count > 1 else None
+            )
+
+        return {
+            "repository": repo.name,
+            "repository_slug": repo.slug,
+            "bucket_seconds": bucket_seconds,
+            "start": start.isoformat(),
+            "buckets": buckets,
+            "series": dict(sorted(series.items())),
+        }
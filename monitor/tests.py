@@ -1,3 +1,587 @@
-from django.test import TestCase
+import io
+import json
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Count, Sum
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils.timezone import now
+
+from monitor.benchmarks.github_stub import GitHubStubServer
+from monitor.benchmarks.repositories import STATS_QUERY_BUDGET
+from monitor.benchmarks.stats import lift_active_cap
+from monitor.executor import DatabaseExecutor
+from monitor.models import Event, EventAggregate, EventDailyRollup, EventType, Repository, RepositoryPollState
+from monitor.services.github.aggregates import EventAggregateService
+from monitor.services.github.analysis import Analyzer
+from monitor.services.github.api import GitHubAPIClient
+from monitor.services.github.cache import StatsCache
+from monitor.services.github.daemon import PollingDaemon
+from monitor.services.github.errors import RateLimitExceeded
+from monitor.services.github.events import GitHubEventService
+from monitor.services.github.export import EventExportService
+from monitor.services.github.partitions import EventPartitionService
+from monitor.services.github.profiling import assert_max_queries
+from monitor.services.github.ratelimit import RateLimitScheduler
+from monitor.services.github.retention import EventRetentionService
+from monitor.services.github.synthetic import SyntheticEventService
+from monitor.views import EventExportAPIView
+
+
+class FakeClock:
+    """Epoch time that only moves when the test advances it."""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def wait_until(condition, timeout=5):
+    """Polls <condition> until it is true; fails the test after <timeout> seconds."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.005)
+
+
+def ingest(repo, pages):
+    """Stores pages of raw GitHub events through the ingest path."""
+    for page in pages:
+        GitHubEventService._process_events(page, repo, now() - timedelta(days=90), 10_000)
+
+
+def stub_events(repo):
+    """Four event types, one event every seven hours over the last 60 days (none at a day boundary), newest first."""
+    return GitHubStubServer(events_per_repo=205, event_spacing=timedelta(hours=7)).events_for(repo.name)
+
+
+class EventQueryPlanTests(TransactionTestCase):
+    """
+    The analyzer and ingest queries read Event through its covering indexes only. Outside a test
+    transaction, so that VACUUM marks the pages all-visible as autovacuum does in production.
+    Sequential and bitmap scans are disabled: the test table is too small for the planner to prefer an index.
+    """
+
+    def setUp(self):
+        SyntheticEventService.load(2, 3, 200, 7, prefix="plans", activate=True, defer_indexes=False)
+        self.repo = Repository.objects.filter(name__startswith="plans/").first()
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"VACUUM ANALYZE {Event._meta.db_table}")
+            cursor.execute("SET enable_seqscan = off")
+            cursor.execute("SET enable_bitmapscan = off")
+
+    def tearDown(self):
+        with connection.cursor() as cursor:
+            cursor.execute("RESET enable_seqscan")
+            cursor.execute("RESET enable_bitmapscan")
+
+    def event_scans(self, sql):
+        """Returns the (node type, index name) of every scan of Event in the plan of <sql>."""
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+
+        scans, nodes = [], [plan[0]["Plan"]]
+        while nodes:
+            node = nodes.pop()
+            nodes.extend(node.get("Plans", ()))
+            if node.get("Relation Name") == Event._meta.db_table:
+                scans.append((node["Node Type"], node.get("Index Name")))
+        return scans
+
+    def assertIndexOnly(self, call, index):
+        """Runs <call> and checks that each of its queries reads Event only with an Index Only Scan on <index>."""
+        with CaptureQueriesContext(connection) as queries:
+            call()
+
+        plans = [self.event_scans(query["sql"]) for query in queries if Event._meta.db_table in query["sql"]]
+        self.assertTrue(plans)
+        for scans in plans:
+            self.assertTrue(scans)
+            self.assertEqual(set(scans), {("Index Only Scan", index)})
+
+    def test_analyzer_queries(self):
+        analyzer = Analyzer(use_aggregates=False)
+        for repo in (None, self.repo):
+            with self.subTest(repo=repo):
+                self.assertIndexOnly(lambda: analyzer._query_windowed(repo), "event_repo_type_created_idx")
+                self.assertIndexOnly(lambda: analyzer.fetch_epochs(repo), "event_repo_type_created_idx")
+
+    def test_ingest_queries(self):
+        event_types = EventType.objects.filter(event__repo=self.repo).distinct()
+        self.assertIndexOnly(
+            lambda: GitHubEventService._event_counts(self.repo, list(event_types), now() - timedelta(days=7)),
+            "event_repo_type_created_idx",
+        )
+
+        events = Event.objects.filter(repo=self.repo).select_related("event_type")[:20]
+        parsed = [(event.gh_event_id, event.event_type.event_type, event.created_at) for event in events]
+        self.assertIndexOnly(
+            lambda: GitHubEventService._existing_events(self.repo, parsed), "event_repo_created_cover_idx"
+        )
+
+
+class RateLimitSchedulerTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.scheduler = RateLimitScheduler(reserve=5, burst=100, max_wait=600, clock=self.clock)
+        self.threads = []
+
+    def tearDown(self):
+        self.advance(3600)
+        for thread in self.threads:
+            thread.join(5)
+
+    def quota(self, remaining, reset_in=100, status_code=200, message="", **headers):
+        """Feeds the scheduler a response reporting <remaining> calls until a reset <reset_in> seconds away."""
+        return self.scheduler.update(status_code, {
+            "X-RateLimit-Limit": "5000",
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(int(self.clock.now + reset_in)),
+            **headers,
+        }, message)
+
+    def advance(self, seconds):
+        """Moves the clock forward and wakes the waiting callers, as the passing time would."""
+        with self.scheduler._condition:
+            self.clock.now += seconds
+            self.scheduler._condition.notify_all()
+
+    def acquire_in_thread(self, priority=0, done=None):
+        """Starts a caller blocked in acquire(); appends <priority> to <done> once it gets its slot."""
+        def acquire():
+            self.scheduler.acquire(priority)
+            if done is not None:
+                done.append(priority)
+
+        thread = threading.Thread(target=acquire, daemon=True)
+        thread.start()
+        self.threads.append(thread)
+        return thread
+
+    def test_no_pacing_above_burst(self):
+        self.quota(remaining=1000)
+        self.assertEqual([self.scheduler.reserve_slot() for _ in range(10)], [0.0] * 10)
+        self.assertEqual(self.scheduler.remaining, 990)
+
+    def test_paces_below_burst(self):
+        self.quota(remaining=15, reset_in=100)
+        self.assertEqual(self.scheduler.reserve_slot(), 0)
+
+        # 14 calls left, 9 of them above the reserve: one every 100 / 9 seconds until the reset
+        self.assertAlmostEqual(self.scheduler.reserve_slot(), 100 / 9)
+        self.assertAlmostEqual(self.scheduler.reserve_slot(), 100 / 9 + (100 - 100 / 9) / 8)
+        self.assertEqual(self.scheduler.delayed_requests, 2)
+
+    def test_blocks_at_reserve_until_reset(self):
+        self.quota(remaining=5, reset_in=300)
+        thread = self.acquire_in_thread()
+
+        wait_until(lambda: self.scheduler.snapshot()["waiting"] == 1)
+        self.advance(299)
+        thread.join(0.05)
+        self.assertTrue(thread.is_alive())
+
+        self.advance(1)
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(self.scheduler.delayed_requests, 1)
+        self.assertEqual(self.scheduler.waited_seconds, 300)
+
+    def test_raises_beyond_max_wait(self):
+        self.quota(remaining=5, reset_in=3600)
+        with self.assertRaises(RateLimitExceeded) as raised:
+            self.scheduler.acquire()
+        self.assertEqual(raised.exception.retry_at, self.clock.now + 3600)
+        self.assertEqual(self.scheduler.snapshot()["waiting"], 0)
+
+    def test_retry_after(self):
+        self.assertEqual(self.scheduler.update(429, {"Retry-After": "30"}), self.clock.now + 30)
+        self.assertEqual(self.scheduler.reserve_slot(), 30)
+        self.assertEqual(self.scheduler.rate_limited_responses, 1)
+
+    def test_secondary_limit_backoff(self):
+        message = "You have exceeded a secondary rate limit."
+        backoffs = [self.scheduler.update(403, {}, message) - self.clock.now for _ in range(6)]
+        self.assertEqual(backoffs, [60, 120, 240, 480, 900, 900])
+
+        # A successful answer resets the backoff
+        self.scheduler.update(200, {})
+        self.assertEqual(self.scheduler.update(403, {}, message), self.clock.now + 60)
+
+    def test_plain_forbidden_is_not_rate_limited(self):
+        self.assertIsNone(self.quota(remaining=4000, status_code=403, message="Resource not accessible"))
+        self.assertEqual(self.scheduler.reserve_slot(), 0)
+        self.assertEqual(self.scheduler.rate_limited_responses, 0)
+
+    def test_primary_limit_forbidden(self):
+        reset = self.clock.now + 1200
+        retry_at = self.quota(remaining=0, reset_in=1200, status_code=403, message="API rate limit exceeded")
+        self.assertEqual(retry_at, reset)
+        self.assertEqual(self.scheduler.blocked_until, reset)
+
+    def test_acquire_serves_lowest_priority_first(self):
+        self.quota(remaining=15, reset_in=100)
+        self.scheduler.acquire()  # the following slots are paced 100 / 9 seconds apart
+
+        done = []
+        for priority in (3, 1, 2):
+            self.acquire_in_thread(priority, done)
+            wait_until(lambda: self.scheduler.snapshot()["waiting"] == len(self.threads))
+
+        for served in range(1, 4):
+            self.advance(20)
+            wait_until(lambda: len(done) == served)
+        self.assertEqual(done, [1, 2, 3])
+
+
+class GitHubAPIClientRateLimitTests(SimpleTestCase):
+    def test_raises_rate_limit_exceeded(self):
+        with GitHubStubServer(events_per_repo=10, rate_limit=1) as stub:
+            client = GitHubAPIClient(base_url=stub.url, rate_limit_reserve=0, rate_limit_max_wait=5)
+            self.assertEqual(client.fetch_repo_events("octo/repo").status_code, 200)
+            self.assertEqual(client.rate_limit_remaining, 0)
+
+            # The quota is used up: the client does not send anything until the reset, an hour away
+            with self.assertRaises(RateLimitExceeded) as raised:
+                client.fetch_repo_events("octo/repo")
+            self.assertAlmostEqual(raised.exception.retry_at, stub.rate_limit_reset)
+            self.assertEqual(stub.requests, 1)
+
+            # A second client is not aware of the quota: GitHub answers 403 and it gives up
+            other = GitHubAPIClient(base_url=stub.url, rate_limit_max_wait=5)
+            with self.assertRaises(RateLimitExceeded):
+                other.fetch_repo_events("octo/repo")
+            self.assertEqual((stub.requests, stub.rate_limited), (2, 1))
+            self.assertEqual(other.quota()["rate_limited_responses"], 1)
+
+            client.close()
+            other.close()
+
+
+class StatsQueryBudgetTests(TestCase):
+    """The stats API issues at most STATS_QUERY_BUDGET queries per request, whatever the number of repositories."""
+
+    EVENT_TYPES = 4
+
+    def setUp(self):
+        lift_active_cap()
+        self.enterContext(DatabaseExecutor.inline())  # the views must see the test transaction
+
+    def assertWithinBudget(self, repos):
+        SyntheticEventService.load(repos, self.EVENT_TYPES, 30, 7, prefix="budget", activate=True, defer_indexes=False)
+        slug = Repository.objects.filter(name__startswith="budget/").values_list("slug", flat=True).first()
+
+        for use_aggregates in (True, False):
+            for url, groups in (
+                ("/api/stats/", repos * self.EVENT_TYPES),
+                ("/api/stats/?metrics=median,p90,rate", repos * self.EVENT_TYPES),
+                ("/api/stats/?windows=1d,7d", repos * self.EVENT_TYPES),
+                (f"/api/stats/{slug}/", self.EVENT_TYPES),
+            ):
+                with self.subTest(url=url, use_aggregates=use_aggregates):
+                    StatsCache._bump()  # computed, not served from the cache
+                    with override_settings(STATS_FROM_AGGREGATES=use_aggregates):
+                        with assert_max_queries(STATS_QUERY_BUDGET, url):
+                            response = self.client.get(url)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(len(response.json()), groups)
+
+    def test_one_repository(self):
+        self.assertWithinBudget(1)
+
+    def test_many_repositories(self):
+        self.assertWithinBudget(25)
+
+
+class ConcurrentFetchTests(TransactionTestCase):
+    """fetch_github_events stores the same events whether it fetches sequentially, in threads or on asyncio."""
+
+    REPOS = 4
+    PAGES = 3
+
+    def setUp(self):
+        self.stub = self.enterContext(GitHubStubServer(latency=0.1, events_per_repo=self.PAGES * 100))
+        self.enterContext(override_settings(GITHUB_API_URL=self.stub.url))
+        for i in range(self.REPOS):
+            Repository.objects.create(name=f"fetch/repo-{i}", gh_repo_id=-(i + 1), active=True)
+
+    def fetch(self, concurrency, use_async=False):
+        """
+        Fetches every active repository from scratch.
+
+        Returns:
+            tuple: (stored events, stub requests, most stub requests in flight at once).
+        """
+        Event.objects.all().delete()
+        RepositoryPollState.objects.all().delete()
+        requests_before, self.stub.peak_in_flight = self.stub.requests, 0
+
+        call_command("fetch_github_events", concurrency=concurrency, use_async=use_async, stdout=io.StringIO())
+
+        stored = set(Event.objects.values_list("repo__name", "gh_event_id", "event_type__event_type", "created_at"))
+        return stored, self.stub.requests - requests_before, self.stub.peak_in_flight
+
+    def test_concurrent_fetch_matches_sequential(self):
+        sequential, sequential_requests, peak = self.fetch(1)
+        self.assertEqual(len(sequential), self.REPOS * self.PAGES * 100)
+        self.assertEqual(peak, 1)
+
+        for use_async in (False, True):
+            with self.subTest(use_async=use_async):
+                stored, requests, peak = self.fetch(self.REPOS, use_async)
+                self.assertEqual(stored, sequential)
+                self.assertEqual(requests, sequential_requests)
+                # Each request is held for the stub's latency, so the repositories' requests overlap
+                self.assertGreater(peak, 1)
+                self.assertLessEqual(peak, self.REPOS)
+
+
+class RecordingDaemon(PollingDaemon):
+    """Records when each repository is polled; sleeping advances the fake clock instead of waiting."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.polled = []
+
+    def _poll(self, repo):
+        self.polled.append((self.clock(), repo.name))
+        super()._poll(repo)
+
+    def _sleep(self, seconds):
+        self.clock.now += max(0, seconds)
+
+
+class PollingDaemonTests(TestCase):
+    def setUp(self):
+        # The daemon closes stale connections between polls, which would end the test transaction
+        self.enterContext(mock.patch("monitor.services.github.daemon.close_old_connections"))
+        self.stub = self.enterContext(GitHubStubServer(events_per_repo=50, poll_interval=60))
+        self.client = GitHubAPIClient(base_url=self.stub.url)
+        self.addCleanup(self.client.close)
+        self.daemon = RecordingDaemon(
+            client=self.client, min_interval=60, max_interval=900, log=lambda message: None, clock=FakeClock(0),
+        )
+        self.repos = [
+            Repository.objects.create(name=f"daemon/repo-{name}", gh_repo_id=-(i + 1), active=True)
+            for i, name in enumerate("ab")
+        ]
+
+    def test_adaptive_intervals(self):
+        # New events halve the interval (never below X-Poll-Interval), quiet polls (304) grow it by half
+        self.daemon.run(max_polls=6)
+        self.stub.publish("daemon/repo-a", 5)
+        self.daemon.run(max_polls=10)
+
+        self.assertEqual(self.daemon.polled, [
+            (0, "daemon/repo-a"), (0, "daemon/repo-b"),
+            (60, "daemon/repo-a"), (60, "daemon/repo-b"),
+            (150, "daemon/repo-a"), (150, "daemon/repo-b"),
+            (285, "daemon/repo-a"), (285, "daemon/repo-b"),
+            (352.5, "daemon/repo-a"), (453.75, "daemon/repo-a"),
+        ])
+        self.assertEqual(Event.objects.filter(repo=self.repos[0]).count(), 55)
+        self.assertEqual(self.stub.requests, 10)
+
+    def test_reactivated_repository_is_scheduled_once(self):
+        Repository.objects.filter(pk=self.repos[1].pk).update(active=False)
+        self.daemon.run(max_polls=1)
+
+        # Deactivated and reactivated while its next poll (at 60s) is still queued
+        Repository.objects.filter(pk=self.repos[0].pk).update(active=False)
+        self.daemon.refresh_repositories()
+        Repository.objects.filter(pk=self.repos[0].pk).update(active=True)
+        self.daemon.refresh_repositories()
+
+        self.daemon.run(max_polls=4)
+        self.assertEqual(self.daemon.polled, [
+            (0, "daemon/repo-a"), (0, "daemon/repo-a"), (90, "daemon/repo-a"), (225, "daemon/repo-a"),
+        ])
+
+
+class EventAggregateTests(TestCase):
+    """The aggregates maintained by ingest and retention match a recomputation from Event (check_event_aggregates)."""
+
+    def setUp(self):
+        self.repo = Repository.objects.create(name="octo/aggregates", gh_repo_id=-1)
+        self.events = stub_events(self.repo)
+
+    def test_ingest_and_prune_keep_aggregates_consistent(self):
+        pages = [self.events[start:start + 100] for start in range(0, len(self.events), 100)]
+        # Out of order, with an overlapping page whose known events are skipped
+        ingest(self.repo, [pages[2], pages[0], self.events[50:150], pages[1]])
+        self.assertEqual(Event.objects.filter(repo=self.repo).count(), 205)
+        self.assertEqual(EventAggregateService.diff(), [])
+
+        EventRetentionService.prune(days=30, batch_size=50)
+        self.assertEqual(Event.objects.filter(repo=self.repo).count(), 103)
+        self.assertEqual(EventAggregateService.diff(), [])
+
+
+class EventRetentionTests(TestCase):
+    """Pruning folds expired events into daily rollups and keeps the aggregates exact."""
+
+    def setUp(self):
+        self.repo = Repository.objects.create(name="octo/retention", gh_repo_id=-1)
+        self.events = stub_events(self.repo)
+
+    def ingest(self):
+        events = self.events
+        ingest(self.repo, [events[start:start + 100] for start in range(0, len(events), 100)])
+        self.cutoff = now() - timedelta(days=30)
+        self.expired = dict(
+            Event.objects.filter(created_at__lt=self.cutoff).order_by().values_list("event_type").annotate(n=Count("*"))
+        )
+
+    def assertPruned(self, result, rollup=True):
+        self.assertEqual(result["pruned"], sum(self.expired.values()))
+        self.assertFalse(Event.objects.filter(created_at__lt=self.cutoff).exists())
+        self.assertEqual(Event.objects.count(), 103)
+
+        # Rollups hold exactly the pruned events, per group and day
+        rollups = EventDailyRollup.objects.filter(repo=self.repo)
+        totals = dict(rollups.order_by().values_list("event_type").annotate(n=Sum("event_count")))
+        self.assertEqual(totals, self.expired if rollup else {})
+        for rollup_row in rollups:
+            self.assertEqual(rollup_row.first_event_at.date(), rollup_row.day)
+            self.assertLess(rollup_row.last_event_at, self.cutoff)
+
+        # Counters are decremented and the groups start at their oldest remaining event
+        for aggregate in EventAggregate.objects.filter(repo=self.repo):
+            remaining = Event.objects.filter(repo=self.repo, event_type=aggregate.event_type_id)
+            self.assertEqual(aggregate.event_count, remaining.count())
+            self.assertEqual(aggregate.first_event_at, remaining.order_by("created_at").first().created_at)
+        self.assertEqual(EventAggregateService.diff(), [])
+
+    def test_prune_in_batches(self):
+        self.ingest()
+        result = EventRetentionService.prune(days=30, batch_size=25)
+        self.assertPruned(result)
+        self.assertEqual(result["batches"], 5)  # 102 rows, 25 per batch
+
+    def test_prune_without_rollup(self):
+        self.ingest()
+        self.assertPruned(EventRetentionService.prune(days=30, rollup=False), rollup=False)
+
+    def test_prune_stops_after_max_batches(self):
+        self.ingest()
+        result = EventRetentionService.prune(days=30, batch_size=25, max_batches=2)
+        self.assertEqual((result["pruned"], result["batches"]), (50, 2))
+        self.assertEqual(EventAggregateService.diff(), [])
+
+    def test_prune_drops_expired_partitions(self):
+        # Partitioned by day as of 60 days ago: history before that, then one partition per day
+        with mock.patch("monitor.migrations._partitioning.now", return_value=now() - timedelta(days=60)):
+            EventPartitionService.convert("day", ahead=70)
+        self.ingest()
+        partitions = len(EventPartitionService.partitions())
+        with connection.cursor() as cursor:
+            # Run the deferred foreign key checks of the ingested rows, which would block DROP TABLE
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+        result = EventRetentionService.prune(days=30, batch_size=25)
+        self.assertPruned(result)
+        self.assertEqual(result["batches"], 1)  # the rows of the partially expired day
+        self.assertEqual(len(EventPartitionService.partitions()), partitions - 30)
+
+    def test_rejects_retention_within_stats_window(self):
+        with self.assertRaises(ValueError):
+            EventRetentionService.prune(days=3)
+        with self.assertRaises(CommandError):
+            call_command("prune_events", days=3, stdout=io.StringIO())
+
+
+class RepositoryAdminTests(TestCase):
+    """Changing repositories in the admin invalidates the cached stats."""
+
+    def setUp(self):
+        self.client.force_login(get_user_model().objects.create_superuser("admin", "admin@example.com", "admin"))
+        self.repos = [Repository.objects.create(name=f"octo/admin-{i}", gh_repo_id=-(i + 1)) for i in range(2)]
+
+    def test_bulk_delete_bumps_stats_cache(self):
+        version, _ = StatsCache.version()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/admin/monitor/repository/", {
+                "action": "delete_selected", "_selected_action": [repo.pk for repo in self.repos], "post": "yes",
+            })
+
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Repository.objects.exists())
+        self.assertGreater(StatsCache.version()[0], version)
+
+
+class EventExportTests(TestCase):
+    """Exports stream every event once in (created_at, id) order and resume after any row."""
+
+    def setUp(self):
+        self.repo = Repository.objects.create(name="octo/export", gh_repo_id=-1)
+        push = EventType.objects.create(event_type="PushEvent")
+        start = now() - timedelta(days=1)
+        # Three events per timestamp, so pages split ties and the id breaks them
+        Event.objects.bulk_create(
+            Event(repo=self.repo, event_type=push, created_at=start + timedelta(minutes=i // 3), gh_event_id=i)
+            for i in range(25)
+        )
+        events = Event.objects.filter(repo=self.repo).order_by("created_at", "id")
+        self.expected = list(events.values_list("id", flat=True))
+
+    def export(self, response):
+        return [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+
+    def assertResumes(self, rows, resume):
+        self.assertEqual([row["id"] for row in rows], self.expected)
+        keys = [(row["created_at"], row["id"]) for row in rows]
+        self.assertEqual(keys, sorted(set(keys)))
+
+        middle = rows[len(rows) // 2]
+        rest = resume(f"{middle['created_at']},{middle['id']}")
+        self.assertEqual([row["id"] for row in rest], self.expected[len(rows) // 2 + 1:])
+
+    def test_keyset_pages(self):
+        for server_side in (True, False):
+            with self.subTest(server_side=server_side):
+                rows = list(EventExportService.iter_events(
+                    self.repo, page_size=4, chunk_size=2, server_side=server_side
+                ))
+                self.assertEqual([row[0] for row in rows], self.expected)
+
+                after = rows[10][4], rows[10][0]
+                rest = EventExportService.iter_events(self.repo, after=after, page_size=4, server_side=server_side)
+                self.assertEqual([row[0] for row in rest], self.expected[11:])
+
+    def test_wsgi_reads_through_server_side_cursor(self):
+        with mock.patch.object(EventExportService, "iter_events", wraps=EventExportService.iter_events) as iter_events:
+            rows = self.export(self.client.get("/api/events/", {"repo": self.repo.slug}))
+
+        self.assertNotIn("server_side", iter_events.call_args.kwargs)
+        self.assertResumes(rows, lambda after: self.export(
+            self.client.get("/api/events/", {"repo": self.repo.slug, "after": after})
+        ))
+
+    def test_asgi_reads_whole_pages(self):
+        @async_to_sync
+        async def export(**params):
+            # Read the way the ASGI handler does, one chunk at a time through DatabaseExecutor
+            response = await self.async_client.get("/api/events/", {"repo": self.repo.slug, **params})
+            return [json.loads(line) for line in b"".join([chunk async for chunk in response]).decode().splitlines()]
+
+        self.enterContext(DatabaseExecutor.inline())
+        self.enterContext(mock.patch.object(EventExportAPIView, "pooled_page_size", 4))
+        with mock.patch.object(EventExportService, "iter_events", wraps=EventExportService.iter_events) as iter_events:
+            rows = export()
+
+        self.assertIs(iter_events.call_args.kwargs["server_side"], False)
+        self.assertResumes(rows, lambda after: export(after=after))
@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import StatsAPIView, RepoStatsAPIView
+from .views import StatsAPIView, RepoStatsAPIView, RepoTimeseriesAPIView, EventExportAPIView
 
 urlpatterns = [
     path("stats/", StatsAPIView.as_view(), name="stats"),
     path("stats/<slug:slug>/", RepoStatsAPIView.as_view()),
+    path("stats/<slug:slug>/timeseries/", RepoTimeseriesAPIView.as_view(), name="timeseries"),
+    path("events/", EventExportAPIView.as_view(), name="events"),
 ]
@@ -1,16 +1,198 @@
+from datetime import datetime, time, timezone
+from inspect import isawaitable
+from time import perf_counter
+
 from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import DatabaseError, connection
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import http_date
+from django.views import View
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from monitor.executor import DatabaseExecutor, PooledStreamingHttpResponse
 from monitor.models import Repository
+from monitor.renderers import CSVRenderer, NDJSONRenderer
 from monitor.services.github.analysis import Analyzer
+from monitor.services.github.cache import StatsCache
+from monitor.services.github import metrics
+from monitor.services.github.export import EventExportService
+from monitor.services.github.timeseries import ActivitySeriesService
+
+
+def stats_params(request):
+    """
+    Parses the query parameters shared by the stats endpoints.
 
+    Returns:
+        dict: days, limit, metrics, rate_window, rate_step and windows.
 
-class StatsAPIView(APIView):
+    Raises:
+        ValueError: With a message for the client if a parameter is invalid.
     """
-    GET /api/stats/?days=7&limit=500
+    try:
+        days = int(request.GET.get("days", settings.EVENT_DAYS_LIMIT))
+        limit = int(request.GET.get("limit", settings.EVENT_FETCH_LIMIT))
+    except ValueError:
+        raise ValueError("Parameters 'days' and 'limit' must be integers.") from None
+
+    metrics = Analyzer.parse_metrics(request.GET.get("metrics", ""))
+
+    try:
+        rate_window = float(request.GET.get("rate_window", 24))
+        rate_step = float(request.GET.get("rate_step", rate_window / 4))
+    except ValueError:
+        rate_window = rate_step = 0
+    if rate_window <= 0 or rate_step <= 0:
+        raise ValueError("Parameters 'rate_window' and 'rate_step' must be positive numbers of hours.")
+
+    windows = tuple(label for label, _ in Analyzer.parse_windows(request.GET.get("windows", "")))
+
+    return {
+        "days": days, "limit": limit, "metrics": metrics, "rate_window": rate_window, "rate_step": rate_step,
+        "windows": windows,
+    }
+
+
+def parse_time(value, name):
+    """
+    Parses an ISO 8601 datetime or date query parameter; naive values are taken as UTC.
+
+    Raises:
+        ValueError: With a message for the client if the value is not a date or datetime.
+    """
+    try:
+        moment = parse_datetime(value)
+        if moment is None and (day := parse_date(value)) is not None:
+            moment = datetime.combine(day, time.min)
+    except ValueError:
+        moment = None
+    if moment is None:
+        raise ValueError(f"Parameter '{name}' must be an ISO 8601 date or datetime.")
+
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def export_params(request):
+    """
+    Parses the query parameters of the event export.
+
+    Returns:
+        dict: since, until, after and limit (None when not given).
+
+    Raises:
+        ValueError: With a message for the client if a parameter is invalid.
+    """
+    params = {
+        name: parse_time(request.GET[name], name) if name in request.GET else None
+        for name in ("since", "until")
+    }
+
+    params["after"] = None
+    if "after" in request.GET:
+        created_at, _, event_id = request.GET["after"].rpartition(",")
+        try:
+            params["after"] = (parse_time(created_at, "after"), int(event_id))
+        except ValueError:
+            raise ValueError("Parameter 'after' must be '<created_at>,<id>' of the last received event.") from None
+
+    params["limit"] = None
+    if "limit" in request.GET:
+        try:
+            params["limit"] = int(request.GET["limit"])
+        except ValueError:
+            params["limit"] = 0
+        if params["limit"] <= 0:
+            raise ValueError("Parameter 'limit' must be a positive integer.")
+
+    return params
+
+
+def cached_stats_response(request, slug, params, compute, variant=None, endpoint=None):
+    """
+    Serves stats through StatsCache with ETag/Last-Modified validators,
+    answering 304 Not Modified when the client's copy is still current.
+
+    Latency and the database queries it took are recorded in the stats metrics.
+    """
+    if variant is None:
+        variant = ",".join(params["metrics"])
+        if "rate" in params["metrics"]:
+            variant += f":{params['rate_window']:g}h/{params['rate_step']:g}h"
+        if params["windows"]:
+            variant += f":windows={','.join(params['windows'])}"
+
+    endpoint = endpoint or ("repo" if slug else "all")
+    started = perf_counter()
+    with connection.execute_wrapper(queries := metrics.QueryCounter()):
+        entry = StatsCache.get_or_compute(slug, params["days"], params["limit"], compute, variant=variant)
+
+    metrics.STATS_REQUEST_SECONDS.observe(perf_counter() - started, endpoint)
+    metrics.STATS_DB_QUERIES.observe(queries.count, endpoint)
+    metrics.STATS_DB_SECONDS.observe(queries.seconds, endpoint)
+
+    response = get_conditional_response(request, etag=entry.etag, last_modified=entry.last_modified)
+    if response is None:
+        response = Response(entry.stats, status=status.HTTP_200_OK)
+
+    response["ETag"] = entry.etag
+    response["Last-Modified"] = http_date(entry.last_modified)
+    return response
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView with coroutine handlers. Under ASGI a request then holds no thread while it waits:
+    handlers hand their blocking work to DatabaseExecutor.run. Under WSGI (runserver) Django
+    runs the view in an event loop of its own per request.
+
+    The views are public and use no authentication, which would read the session from the
+    database inside the event loop.
+    """
+
+    authentication_classes = ()
+
+    async def dispatch(self, request, *args, **kwargs):
+        """APIView.dispatch, awaiting the handler."""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            self.initial(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if isawaitable(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        response = self.finalize_response(request, response, *args, **kwargs)
+        if hasattr(response, "render"):
+            # Django renders deferred responses on its single shared sync thread; render here instead
+            response.render()
+            response = HttpResponse(response.content, status=response.status_code, headers=dict(response.items()))
+
+        self.response = response
+        return response
+
+
+class StatsAPIView(AsyncAPIView):
+    """
+    GET /api/stats/?days=7&limit=500&metrics=median,p90
 
     Returns aggregated statistics per (repository, event_type).
 
@@ -22,30 +204,44 @@ class StatsAPIView(APIView):
     - human_readable_interval: formatted average interval (e.g. "3 hours, 20 minutes")
     - event_count: number of events used
 
+    Opt-in fields (only computed when requested in `metrics`):
+    - median, p90, p99, min, max: <name>_interval_seconds and human_readable_<name>_interval
+    - cv: interval_cv, the coefficient of variation (stddev / mean) of the intervals; high values mean bursts
+    - rate: events_per_hour in sliding <rate_window>-hour sub-windows, oldest first; the newest ends now
+      and each earlier one <rate_step> hours before the next
+
+    With `windows`, each row instead carries "windows": {label: {average_interval_seconds,
+    human_readable_interval, event_count and the requested metrics}} for every window, all derived
+    from one read of the widest window.
+
     Query params:
     - days (optional): rolling window in days (default: 7)
     - limit (optional): max events per (repo, type) to consider (default: 500)
+    - metrics (optional): comma-separated extra statistics (median, p90, p99, min, max, cv, rate)
+    - rate_window (optional): sub-window size in hours for the rate metric (default: 24)
+    - rate_step (optional): hours between the ends of consecutive rate sub-windows (default: rate_window / 4)
+    - windows (optional): comma-separated windows computed side by side, e.g. 1d,7d,30d (units h, d, w);
+      replaces days, limit applies per window
+
+    Responses are cached until new events are ingested and carry ETag/Last-Modified headers.
     """
 
     @staticmethod
-    def get(request):
+    async def get(request):
         try:
-            days = int(request.GET.get("days", settings.EVENT_DAYS_LIMIT))
-            limit = int(request.GET.get("limit", settings.EVENT_FETCH_LIMIT))
-        except ValueError:
-            return Response(
-                {"error": "Parameters 'days' and 'limit' must be integers."},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+            params = stats_params(request)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
-        analyzer = Analyzer(days=days, limit=limit)
-        stats = analyzer.get_stats()
-        return Response(stats, status=status.HTTP_200_OK)
+        return await DatabaseExecutor.run(
+            cached_stats_response, request, None, params,
+            lambda: Analyzer(**params).get_stats(),
+        )
 
 
-class RepoStatsAPIView(APIView):
+class RepoStatsAPIView(AsyncAPIView):
     """
-    GET /api/stats/<slug>/?days=7&limit=500
+    GET /api/stats/<slug>/?days=7&limit=500&metrics=median,p90
 
     Returns the same stats as StatsAPIView, but scoped to a single repository.
 
@@ -55,20 +251,156 @@ class RepoStatsAPIView(APIView):
     Query params:
     - days (optional): rolling window in days (default: 7)
     - limit (optional): max events per event type to consider (default: 500)
+    - metrics (optional): comma-separated extra statistics, as for /api/stats/
+    - rate_window (optional): sub-window size in hours for the rate metric (default: 24)
+    - rate_step (optional): hours between the ends of consecutive rate sub-windows (default: rate_window / 4)
+    - windows (optional): comma-separated windows computed side by side, as for /api/stats/
+
+    Responses are cached until new events are ingested and carry ETag/Last-Modified headers.
+    """
+
+    @staticmethod
+    async def get(request, slug):
+        try:
+            params = stats_params(request)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return await DatabaseExecutor.run(
+            cached_stats_response, request, slug, params,
+            lambda: Analyzer(**params).get_stats(repo=get_object_or_404(Repository, slug=slug)),
+        )
+
+
+class RepoTimeseriesAPIView(AsyncAPIView):
+    """
+    GET /api/stats/<slug>/timeseries/?bucket=1h&days=30
+
+    Returns the activity of one repository per time bucket and event type, aggregated in the database.
+
+    Response fields:
+    - repository, repository_slug: as for /api/stats/
+    - bucket_seconds: bucket size in seconds
+    - start: start of the first bucket (UTC, ISO 8601); bucket i starts at start + i * bucket_seconds
+    - buckets: number of buckets in the range
+    - series: per event type, columnar arrays over its non-empty buckets:
+      bucket_index, event_count and average_interval_seconds (mean interval between the
+      bucket's own events, null for a single event)
+
+    Query params:
+    - bucket (optional): bucket size, e.g. 15m, 1h, 1d or 1w (default: 1h); aligned to midnight UTC
+    - days (optional): range in days, ending now (default: 7)
+
+    Responses are cached until new events are ingested and carry ETag/Last-Modified headers.
     """
 
     @staticmethod
-    def get(request, slug):
+    async def get(request, slug):
         try:
             days = int(request.GET.get("days", settings.EVENT_DAYS_LIMIT))
-            limit = int(request.GET.get("limit", settings.EVENT_FETCH_LIMIT))
         except ValueError:
+            days = 0
+        if days <= 0:
             return Response(
-                {"error": "Parameters 'days' and 'limit' must be integers."},
-                status=status.HTTP_400_BAD_REQUEST
+                {"error": "Parameter 'days' must be a positive integer."}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            bucket = ActivitySeriesService.parse_bucket(request.GET.get("bucket", "1h"))
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        def compute():
+            repo = get_object_or_404(Repository, slug=slug)
+            return ActivitySeriesService.get_series(repo, bucket, days)
+
+        try:
+            return await DatabaseExecutor.run(
+                cached_stats_response, request, slug, {"days": days, "limit": 0}, compute,
+                variant=f"timeseries:{int(bucket.total_seconds())}s", endpoint="timeseries",
             )
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class EventExportAPIView(APIView):
+    """
+    GET /api/events/?repo=<slug>&since=2025-01-01&format=csv
 
-        repo = get_object_or_404(Repository, slug=slug)
-        analyzer = Analyzer(days=days, limit=limit)
-        stats = analyzer.get_stats(repo=repo)
-        return Response(stats, status=status.HTTP_200_OK)
+    Streams the raw events of one repository, oldest first, as NDJSON (default) or CSV.
+    Rows are read in keyset pages, so exports of any size run in bounded memory. Under WSGI each
+    page is read through a server-side cursor; under ASGI each chunk is produced on a
+    DatabaseExecutor thread as the client reads it, so pages of `pooled_page_size` are fetched whole.
+
+    Row fields:
+    - id: event id, together with created_at the resume position
+    - gh_event_id: GitHub event id
+    - repository: full name (e.g. "tiangolo/fastapi")
+    - event_type: GitHub event type
+    - created_at: UTC timestamp (ISO 8601)
+
+    Query params:
+    - repo (required): slug of the repository
+    - since (optional): only events created at or after this date/datetime
+    - until (optional): only events created before this date/datetime
+    - after (optional): "<created_at>,<id>" of the last received row, to resume an export
+    - limit (optional): max number of rows
+    - format (optional): "ndjson" or "csv"; the Accept header works as well
+    """
+
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+    pooled_page_size = 2000
+
+    def get(self, request):
+        if "repo" not in request.GET:
+            return Response({"error": "Parameter 'repo' is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            params = export_params(request)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        repo = get_object_or_404(Repository, slug=request.GET["repo"])
+        if isinstance(request._request, ASGIRequest):
+            # Whole pages without a server-side cursor: every chunk may be read on another pool thread
+            rows = EventExportService.iter_events(repo, **params, page_size=self.pooled_page_size, server_side=False)
+        else:
+            rows = EventExportService.iter_events(repo, **params)
+
+        renderer = request.accepted_renderer
+        content = EventExportService.to_csv(rows) if renderer.format == "csv" else EventExportService.to_ndjson(rows)
+
+        response = PooledStreamingHttpResponse(content, content_type=f"{renderer.media_type}; charset=utf-8")
+        if renderer.format == "csv":
+            response["Content-Disposition"] = f'attachment; filename="{repo.slug}-events.csv"'
+        return response
+
+
+class MetricsView(View):
+    """
+    GET /metrics
+
+    Process metrics in the Prometheus text format: stats API latency, database queries and time per
+    stats request, stats group counts and cache hits/misses, plus ingest metrics of fetches run in
+    this process. The polling daemon serves its own metrics (see monitor_daemon --metrics-port).
+    """
+
+    @staticmethod
+    def get(request):
+        return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+class HealthView(View):
+    """
+    GET /health
+
+    Health check for load balancers and container orchestration: 200 {"status": "ok"} when a
+    query through the database pool succeeds, 503 {"status": "unavailable"} otherwise.
+    """
+
+    async def get(self, request):
+        try:
+            await DatabaseExecutor.run(DatabaseExecutor.ping)
+        except DatabaseError:
+            return JsonResponse({"status": "unavailable", "database": "error"}, status=503)
+        return JsonResponse({"status": "ok", "database": "ok"})